@@ -4,21 +4,28 @@ Agent module.
 Provides components for running the ERC3 agent loop.
 """
 from .state import AgentTurnState
-from .parsing import extract_json, OpenAIUsage
+from .parsing import extract_json, OpenAIUsage, IncrementalActionParser
 from .loop_detection import LoopDetector
-from .runner import run_agent
+from .runner import run_agent, run_agent_async
 from .llm_invoker import LLMInvoker
 from .message_builder import MessageBuilder
 from .action_processor import ActionProcessor, ActionResult
+from .streaming import EarlyReadDispatcher
+from .token_counter import TokenCounter, get_token_counter
 
 __all__ = [
     'AgentTurnState',
     'extract_json',
     'OpenAIUsage',
+    'IncrementalActionParser',
     'LoopDetector',
     'run_agent',
+    'run_agent_async',
     'LLMInvoker',
     'MessageBuilder',
     'ActionProcessor',
     'ActionResult',
+    'EarlyReadDispatcher',
+    'TokenCounter',
+    'get_token_counter',
 ]
@@ -5,6 +5,7 @@ Handles validation, parsing, and execution of agent actions.
 """
 
 import json
+import time
 from typing import List, Tuple, Optional, Set, Any
 from dataclasses import dataclass
 
@@ -18,8 +19,14 @@ from tools.registry import ParseError
 from tools.patches import SafeReq_UpdateEmployeeInfo
 from stats import SessionStats, FailureLogger
 from handlers import get_executor, WikiManager, SecurityManager
+from handlers.api import (
+    OrgSnapshot, SpeculativePrefetcher, compute_env_fingerprint, is_cacheable_read,
+)
+from handlers.middleware.guards import READ_GUARDED_TOOLS, READ_GUARD_TURNS
 from utils import CLI_RED, CLI_GREEN, CLI_YELLOW, CLI_BLUE, CLI_CLR
 
+import config
+
 from .state import AgentTurnState
 
 
@@ -106,6 +113,11 @@ class ActionProcessor:
             erc_client, wiki_manager, security_manager, task=task
         )
 
+        # Warms the cache with predicted follow-up GETs while the LLM thinks
+        self.speculator = None
+        if config.SPECULATIVE_PREFETCH_ENABLED and hasattr(erc_client, 'prefetch'):
+            self.speculator = SpeculativePrefetcher(erc_client)
+
     def validate_actions(
         self,
         action_queue: List[dict],
@@ -229,11 +241,17 @@ class ActionProcessor:
         stop_execution = False
         had_errors = False
         task_done = False
+        prefetched_until = -1
 
         for idx, action_dict in enumerate(action_queue):
             if stop_execution:
                 break
 
+            # AICODE-NOTE: Warm the API cache for a run of read-only actions starting
+            # here, so their HTTP round-trips overlap. Execution below stays sequential.
+            if idx > prefetched_until:
+                prefetched_until = self._prefetch_read_run(action_queue, idx, state)
+
             print(f"\n  {CLI_BLUE}Parsing action {idx+1}:{CLI_CLR} {json.dumps(action_dict)}")
 
             parse_ctx = state.create_context()
@@ -325,6 +343,10 @@ class ActionProcessor:
             results.extend(ctx.results)
             state.sync_from_context(ctx)
 
+            if isinstance(action_model, client.Req_WhoAmI):
+                self._maybe_set_env_fingerprint()
+                self._maybe_build_org_snapshot(state)
+
             # Log context results
             if self.failure_logger and ctx.results:
                 action_name = action_dict.get('tool', action_model.__class__.__name__)
@@ -351,6 +373,8 @@ class ActionProcessor:
             api_result = ctx.shared.get('_last_api_result')
             if api_result:
                 self._capture_locations(api_result, state)
+                if self.speculator:
+                    self.speculator.observe(action_model, api_result)
 
             if ctx.stop_execution:
                 stop_execution = True
@@ -378,6 +402,14 @@ class ActionProcessor:
             results.append("\n".join(summary_lines))
             state.member_projects_batch.clear()
 
+        # AICODE-NOTE: Runs in the background during the next LLM call.
+        # Pointless once the task is done.
+        if self.speculator and not task_done:
+            launched = self.speculator.launch()
+            if launched:
+                print(f"  {CLI_BLUE}[speculative] Prefetching {launched} likely follow-up read(s) "
+                      f"({self.speculator.remaining} left in budget){CLI_CLR}")
+
         return ActionResult(
             results=results,
             task_done=task_done,
@@ -387,6 +419,161 @@ class ActionProcessor:
             malformed_mutation_tools=[]
         )
 
+    def _prefetch_read_run(
+        self,
+        action_queue: List[dict],
+        start: int,
+        state: AgentTurnState
+    ) -> int:
+        """
+        Concurrently pre-dispatch a run of consecutive read-only actions.
+
+        Batch turns (10-30 projects_get/employees_get) otherwise cost one
+        sequential HTTP round-trip per action. The run is parsed with a scratch
+        context and its requests are fetched on a bounded thread pool into the
+        task's CachingErcClient. The regular sequential loop then executes every
+        action as before (middleware, enrichers, state sync in original order),
+        with dispatches served from cache - so results text is identical to
+        sequential execution.
+
+        The run stops at the first action that is not a cacheable read
+        (mutation, respond, wiki, who_am_i, parse error), so reads after a
+        mutation are never fetched before it, and at the first read a guard
+        might block (see parse_read_action), so blocked requests never reach
+        the API.
+
+        Args:
+            action_queue: Full (merged) action queue
+            start: Index of the first action of the run
+            state: Current agent turn state
+
+        Returns:
+            Index of the last action covered by the run (start if nothing was prefetched)
+        """
+        if not config.PARALLEL_READ_ACTIONS or not hasattr(self.erc_client, 'prefetch'):
+            return start
+
+        requests = []
+        for action_dict in action_queue[start:]:
+            model = self.parse_read_action(action_dict, state, earlier=requests)
+            if model is None:
+                break
+            requests.append(model)
+
+        if len(requests) < 2:
+            return start
+
+        started = time.time()
+        fetched = self.erc_client.prefetch(requests, max_workers=config.PARALLEL_READ_WORKERS)
+        print(f"  {CLI_BLUE}Prefetched {fetched}/{len(requests)} read action(s) concurrently "
+              f"in {time.time() - started:.2f}s{CLI_CLR}")
+        return start + len(requests) - 1
+
+    def parse_read_action(
+        self,
+        action_dict: dict,
+        state: AgentTurnState,
+        earlier: Optional[List[Any]] = None
+    ) -> Optional[Any]:
+        """
+        Parse an action with a scratch context if it is a cacheable read.
+
+        Used to dispatch reads ahead of sequential execution (read runs,
+        streamed actions). Nothing is recorded in state.
+
+        Args:
+            action_dict: Raw action
+            state: Current agent turn state
+            earlier: Requests dispatched ahead earlier in the same run; a
+                search/list among them may leave pagination pending by the
+                time this action executes
+
+        Returns:
+            Request model, or None for mutations, respond, wiki, who_am_i,
+            reads a middleware might block, and anything that fails to parse
+        """
+        after_listing = any(
+            type(req).__name__.startswith(('Req_Search', 'Req_List')) for req in earlier or ()
+        )
+        if self._read_may_be_blocked(action_dict.get('tool', ''), state, after_listing):
+            return None
+        task_text = getattr(self.task, 'task', '') or getattr(self.task, 'task_text', '') or str(self.task)
+        scratch_ctx = state.create_context()
+        if hasattr(scratch_ctx, 'shared'):
+            scratch_ctx.shared['task_text'] = task_text
+        try:
+            model = parse_action(action_dict, context=scratch_ctx)
+        except Exception:
+            return None
+        if isinstance(model, ParseError) or not model or not is_cacheable_read(model):
+            return None
+        return model
+
+    def _read_may_be_blocked(self, tool_name: str, state: AgentTurnState, after_listing: bool) -> bool:
+        """
+        Whether middleware could stop this read in the sequential pass.
+
+        Conservative: guest users are blocked from nearly all reads, and the
+        pagination/timeout guards only act on READ_GUARDED_TOOLS while
+        pagination is (or may become) pending or few turns are left.
+        """
+        if self.security_manager and self.security_manager.is_public:
+            return True
+        if tool_name not in READ_GUARDED_TOOLS:
+            return False
+        remaining_turns = state.max_turns - state.current_turn - 1
+        return after_listing or bool(state.pending_pagination) or remaining_turns <= READ_GUARD_TURNS
+
+    def _maybe_set_env_fingerprint(self) -> None:
+        """
+        Fingerprint the task's environment once, right after who_am_i, so the
+        client can share immutable reference data with other tasks.
+        """
+        if not config.SHARED_REFERENCE_CACHE_ENABLED:
+            return
+        if not hasattr(self.erc_client, 'env_fingerprint') or self.erc_client.env_fingerprint:
+            return
+        sm = self.security_manager
+        if not sm or sm.is_public:
+            return
+
+        fingerprint = compute_env_fingerprint(self.erc_client, self.wiki_manager.current_sha1)
+        if fingerprint:
+            self.erc_client.env_fingerprint = fingerprint
+            print(f"  {CLI_BLUE}[shared-cache] Environment fingerprint {fingerprint[:8]}{CLI_CLR}")
+
+    def _maybe_build_org_snapshot(self, state: AgentTurnState) -> None:
+        """
+        Build the whole-company OrgSnapshot once, right after who_am_i.
+
+        Skipped for guests (they can't list internal data anyway), when
+        disabled in config, or if a snapshot already exists. Failures are
+        non-fatal: consumers fall back to per-call API lookups.
+        """
+        if not config.ORG_SNAPSHOT_ENABLED or state.org_snapshot is not None:
+            return
+        sm = self.security_manager
+        if not sm or sm.is_public or not sm.current_user:
+            return
+
+        try:
+            snapshot = OrgSnapshot.build(self.erc_client)
+        except Exception as e:
+            print(f"  {CLI_YELLOW}[org-snapshot] Build failed, using API lookups: {e}{CLI_CLR}")
+            return
+
+        # AICODE-NOTE: Mutations patch the snapshot lazily via the cache's
+        # listener hook. Without a CachingErcClient there is no hook, so the
+        # snapshot would go stale after the first write - don't use it then.
+        if hasattr(self.erc_client, 'add_mutation_listener'):
+            self.erc_client.add_mutation_listener(snapshot.on_mutation)
+        else:
+            print(f"  {CLI_YELLOW}[org-snapshot] No mutation hook on client, snapshot disabled{CLI_CLR}")
+            return
+
+        state.org_snapshot = snapshot
+        print(f"  {CLI_BLUE}[org-snapshot] {snapshot.summary()}{CLI_CLR}")
+
     def _capture_locations(self, api_result: Any, state: AgentTurnState):
         """Capture locations from API results for LocationExclusionGuard."""
         # Check employees
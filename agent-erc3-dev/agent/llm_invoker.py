@@ -4,16 +4,20 @@ LLM invocation and response handling.
 Handles calling the LLM, parsing responses, and tracking usage.
 """
 
+import asyncio
 import time
-from typing import Optional, Tuple, List, Any
+from typing import Dict, Optional, Tuple, List, Any
 
 from langchain_core.messages import BaseMessage
 
 from erc3 import TaskInfo, ERC3
 from stats import SessionStats
-from utils import CLI_RED, CLI_CLR
+from utils import CLI_RED, CLI_YELLOW, CLI_CLR
+
+import config
 
 from .parsing import OpenAIUsage
+from .token_counter import get_token_counter
 
 
 class LLMInvoker:
@@ -22,6 +26,7 @@ class LLMInvoker:
 
     Responsibilities:
     - Invoke LLM with messages
+    - Measure the prompt before sending (size check, token attribution)
     - Extract and track token usage
     - Log LLM calls to ERC3 API
     - Handle errors gracefully
@@ -56,13 +61,18 @@ class LLMInvoker:
 
     def invoke(
         self,
-        messages: List[BaseMessage]
+        messages: List[BaseMessage],
+        stream_listener: Any = None,
+        priority: float = 0.0
     ) -> Tuple[Optional[str], Optional[OpenAIUsage]]:
         """
         Invoke the LLM with messages.
 
         Args:
             messages: List of conversation messages
+            stream_listener: If given, the completion is streamed into it
+                (on_delta/on_reset, see llm_provider.GonkaChatModel)
+            priority: Head start (seconds) in the backend's rate-limit queue
 
         Returns:
             Tuple of (raw_content, usage) or (None, None) on failure
@@ -70,47 +80,124 @@ class LLMInvoker:
         started = time.time()
 
         try:
-            result = self.llm.generate([messages])
-            generation = result.generations[0][0]
-            llm_output = result.llm_output or {}
+            prompt_mix = self._measure_prompt(messages)
+            result = self.llm.generate([messages], **self._generate_kwargs(stream_listener, priority))
+            return self._process_result(messages, result, started, prompt_mix)
+
+        except Exception as e:
+            print(f"{CLI_RED}LLM call failed: {e}{CLI_CLR}")
+            return None, None
+
+    async def ainvoke(
+        self,
+        messages: List[BaseMessage],
+        stream_listener: Any = None,
+        priority: float = 0.0
+    ) -> Tuple[Optional[str], Optional[OpenAIUsage]]:
+        """
+        Async variant of invoke() for run_agent_async.
 
-            raw_content = generation.text
-            usage = llm_output.get("token_usage", {})
+        The generation is awaited (LLM backends implement _agenerate);
+        stats and the blocking ERC3 log_llm call run in a worker thread.
+        """
+        started = time.time()
 
-            # Fallback if usage is missing
-            if not usage or usage.get("completion_tokens", 0) == 0:
-                usage = self._estimate_usage(messages, raw_content)
+        try:
+            prompt_mix = await asyncio.to_thread(self._measure_prompt, messages)
+            result = await self.llm.agenerate([messages], **self._generate_kwargs(stream_listener, priority))
+            return await asyncio.to_thread(self._process_result, messages, result, started, prompt_mix)
 
-            usage_obj = OpenAIUsage(
-                prompt_tokens=usage.get("prompt_tokens", 0),
-                completion_tokens=usage.get("completion_tokens", 0),
-                total_tokens=usage.get("total_tokens", 0)
-            )
+        except Exception as e:
+            print(f"{CLI_RED}LLM call failed: {e}{CLI_CLR}")
+            return None, None
+
+    @staticmethod
+    def _generate_kwargs(stream_listener: Any, priority: float) -> dict:
+        kwargs = {}
+        if stream_listener is not None:
+            kwargs['stream_listener'] = stream_listener
+        if priority:
+            kwargs['llm_priority'] = priority
+        return kwargs
+
+    @staticmethod
+    def _measure_prompt(messages: List[BaseMessage]) -> Dict[str, int]:
+        """
+        Count prompt tokens by category before sending; warn when oversized.
+
+        Returns:
+            Tokens per category (see token_counter.CATEGORIES)
+        """
+        counter = get_token_counter()
+        prompt_mix = counter.attribute(messages)
+        prompt_tokens = counter.count_messages(messages)
+        if prompt_tokens > config.CONTEXT_PROMPT_WARN_TOKENS:
+            top = max(prompt_mix, key=prompt_mix.get)
+            print(f"{CLI_YELLOW}⚠ Prompt is ~{prompt_tokens:,} tokens "
+                  f"(largest part: {top} {prompt_mix[top]:,}){CLI_CLR}")
+        return prompt_mix
+
+    def _process_result(
+        self,
+        messages: List[BaseMessage],
+        result: Any,
+        started: float,
+        prompt_mix: Optional[Dict[str, int]] = None
+    ) -> Tuple[str, OpenAIUsage]:
+        """
+        Extract content and usage, track stats and log the call to ERC3.
 
-            # Track stats
-            if self.stats:
-                self.stats.add_llm_usage(
-                    self.cost_model_id,
-                    usage_obj,
-                    task_id=self.task.task_id
-                )
+        Args:
+            messages: Input messages (for usage estimation)
+            result: LangChain LLMResult
+            started: Timestamp the call started at
+            prompt_mix: Prompt tokens per category from _measure_prompt
 
-            # Log to ERC3
-            self.api.log_llm(
+        Returns:
+            Tuple of (raw_content, usage)
+        """
+        generation = result.generations[0][0]
+        llm_output = result.llm_output or {}
+
+        raw_content = generation.text
+        usage = llm_output.get("token_usage", {})
+
+        # Fallback if usage is missing
+        if not usage or usage.get("completion_tokens", 0) == 0:
+            usage = self._estimate_usage(messages, raw_content)
+
+        usage_obj = OpenAIUsage(
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            completion_tokens=usage.get("completion_tokens", 0),
+            total_tokens=usage.get("total_tokens", 0),
+            cached_prompt_tokens=usage.get("cached_prompt_tokens", 0)
+        )
+
+        # Track stats
+        if self.stats:
+            queue_wait = llm_output.get("queue_wait_sec", 0.0)
+            self.stats.add_llm_usage(
+                self.cost_model_id,
+                usage_obj,
                 task_id=self.task.task_id,
-                completion=raw_content,
-                model=self.model_name,
-                duration_sec=time.time() - started,
-                prompt_tokens=usage.get("prompt_tokens", 0),
-                completion_tokens=usage.get("completion_tokens", 0),
-                cached_prompt_tokens=0
+                queue_wait_sec=queue_wait,
+                latency_sec=time.time() - started - queue_wait,
+                same_node=llm_output.get("same_node"),
+                prompt_mix=prompt_mix
             )
 
-            return raw_content, usage_obj
+        # Log to ERC3
+        self.api.log_llm(
+            task_id=self.task.task_id,
+            completion=raw_content,
+            model=self.model_name,
+            duration_sec=time.time() - started,
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            completion_tokens=usage.get("completion_tokens", 0),
+            cached_prompt_tokens=usage_obj.cached_prompt_tokens
+        )
 
-        except Exception as e:
-            print(f"{CLI_RED}LLM call failed: {e}{CLI_CLR}")
-            return None, None
+        return raw_content, usage_obj
 
     def _estimate_usage(
         self,
@@ -118,17 +205,18 @@ class LLMInvoker:
         raw_content: str
     ) -> dict:
         """
-        Estimate token usage when not provided by LLM.
+        Count token usage locally when not provided by LLM.
 
         Args:
             messages: Input messages
             raw_content: LLM response content
 
         Returns:
-            Dict with estimated token counts
+            Dict with token counts (exact when the tokenizer is available)
         """
-        est_completion = len(raw_content) // 4
-        est_prompt = sum(len(m.content) for m in messages) // 4
+        counter = get_token_counter()
+        est_completion = counter.count(raw_content)
+        est_prompt = counter.count_messages(messages)
         return {
             "prompt_tokens": est_prompt,
             "completion_tokens": est_completion,
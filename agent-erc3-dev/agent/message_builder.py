@@ -1,10 +1,12 @@
 """
 Message construction for agent conversation.
 
-Handles building system messages, error messages, and feedback messages.
+Handles building system messages, error messages, and feedback messages,
+and compaction of old turns into a digest when the context grows too large.
 """
 
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
+import json
 import re
 
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, BaseMessage
@@ -12,6 +14,12 @@ from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, Base
 import config
 from prompts import SGR_SYSTEM_PROMPT
 from handlers import WikiManager
+from utils import CLI_CYAN, CLI_CLR
+
+from .parsing import extract_json
+from .token_counter import get_token_counter
+
+DIGEST_HEADER = "[CONTEXT DIGEST]"
 
 
 # Error message templates
@@ -112,6 +120,8 @@ class MessageBuilder:
             wiki_manager: WikiManager for context summary
         """
         self.wiki_manager = wiki_manager
+        # One line per turn folded into the digest so far (kept across compactions)
+        self._digest_turns: List[str] = []
 
     def build_initial_messages(self, task_text: str) -> List[BaseMessage]:
         """
@@ -320,3 +330,131 @@ The malformed actions were NOT executed. Please retry."""
                 )
 
         return HumanMessage(content=f"{turn_header}[EXECUTION LOG]\n{feedback}")
+
+    # ------------------------------------------------------------------
+    # Context compaction
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def estimate_tokens(messages: List[BaseMessage]) -> int:
+        """Prompt size in tokens (see token_counter)."""
+        return get_token_counter().count_messages(messages)
+
+    def compact_history(self, messages: List[BaseMessage], state: Any) -> int:
+        """
+        Fold old turns into one digest message when the context is over budget.
+
+        Keeps the system prompt and the task message verbatim, and the last
+        config.CONTEXT_KEEP_RECENT_TURNS turns (assistant reply + feedback)
+        verbatim. Everything in between - including an earlier digest - is
+        replaced by a single [CONTEXT DIGEST] message: what the agent found
+        (entity IDs, pagination status, mutations done, per-turn actions),
+        built from AgentTurnState and the old turns, capped at
+        config.CONTEXT_DIGEST_MAX_TOKENS.
+
+        AICODE-NOTE: Compaction only runs once the prompt exceeds
+        config.CONTEXT_TOKEN_BUDGET, and then in one block. Between
+        compactions the history is append-only, so backend prefix caches
+        (see GonkaChatModel node affinity) keep hitting.
+
+        Args:
+            messages: Conversation, modified in place
+            state: AgentTurnState of the task
+
+        Returns:
+            Estimated tokens removed (0 if nothing was compacted)
+        """
+        if not config.CONTEXT_COMPACTION_ENABLED or len(messages) <= 2:
+            return 0
+        before = self.estimate_tokens(messages)
+        if before <= config.CONTEXT_TOKEN_BUDGET:
+            return 0
+
+        ai_positions = [i for i, m in enumerate(messages) if i >= 2 and isinstance(m, AIMessage)]
+        keep = config.CONTEXT_KEEP_RECENT_TURNS
+        if len(ai_positions) <= keep:
+            return 0
+        cut = ai_positions[-keep] if keep > 0 else len(messages)
+
+        self._fold_turns(messages[2:cut])
+        digest = HumanMessage(content=self._build_digest(state))
+        messages[2:cut] = [digest]
+
+        removed = before - self.estimate_tokens(messages)
+        print(f"{CLI_CYAN}[context] Compacted {len(ai_positions) - keep} old turn(s) into a digest: "
+              f"~{before} -> ~{before - removed} tokens{CLI_CLR}")
+        return removed
+
+    def _fold_turns(self, old: List[BaseMessage]) -> None:
+        """Summarize old assistant replies and their feedback into digest lines."""
+        for msg in old:
+            content = msg.content if isinstance(msg.content, str) else ""
+            if content.startswith(DIGEST_HEADER):
+                continue  # Its lines are already in _digest_turns
+            if isinstance(msg, AIMessage):
+                self._digest_turns.append(f"- you: {self._summarize_reply(content)}")
+            elif "[EXECUTION LOG]" in content:
+                log = content.split("[EXECUTION LOG]", 1)[1]
+                results = [r.strip() for r in log.split("\n---\n") if r.strip()]
+                firsts = "; ".join(r.splitlines()[0][:160] for r in results[:6])
+                more = f" (+{len(results) - 6} more)" if len(results) > 6 else ""
+                self._digest_turns.append(f"  results: {firsts}{more}")
+            elif content.startswith("[SYSTEM ERROR]") or content.startswith("⚠️ [SYSTEM ERROR]"):
+                self._digest_turns.append(f"  system: {content.splitlines()[0][:120]}")
+
+    @staticmethod
+    def _summarize_reply(content: str) -> str:
+        """Tools and args of an assistant reply, compact."""
+        try:
+            data = extract_json(content)
+        except Exception:
+            return content[:200].replace("\n", " ")
+        actions = []
+        for action in data.get("action_queue") or []:
+            if not isinstance(action, dict):
+                continue
+            args = json.dumps(action.get("args", {}), ensure_ascii=False, separators=(",", ":"))
+            actions.append(f"{action.get('tool', '?')}({args[:120]})")
+        return ", ".join(actions) or "(no actions)"
+
+    def _build_digest(self, state: Any) -> str:
+        """Digest text: state facts first, then per-turn lines (oldest trimmed first)."""
+        facts: List[str] = []
+
+        def ids_by_kind(entities: List[Dict]) -> Dict[str, List[str]]:
+            grouped: Dict[str, List[str]] = {}
+            for entity in entities:
+                ids = grouped.setdefault(entity.get("kind", "?"), [])
+                if entity.get("id") and entity["id"] not in ids:
+                    ids.append(entity["id"])
+            return grouped
+
+        for label, entities in (("Fetched", state.fetched_entities),
+                                ("Referenced in searches", state.search_entities),
+                                ("Changed (mutations done)", state.mutation_entities)):
+            for kind, ids in ids_by_kind(entities).items():
+                facts.append(f"{label} {kind}s: {', '.join(ids[:40])}"
+                             + (f" (+{len(ids) - 40} more)" if len(ids) > 40 else ""))
+        if state.accumulated_project_ids:
+            facts.append(f"Projects found by searches: {', '.join(state.accumulated_project_ids[:40])}")
+        for action, info in state.pending_pagination.items():
+            facts.append(f"Pagination NOT finished for {action}: next_offset={info.get('next_offset')}, "
+                         f"{info.get('current_count', '?')} items so far")
+        if state.action_counts:
+            counts = ", ".join(f"{name}x{count}" for name, count in sorted(state.action_counts.items()))
+            facts.append(f"Actions executed so far: {counts}")
+
+        header = (f"{DIGEST_HEADER} Older turns were condensed to save context. Facts below come from "
+                  f"tool results you already received; re-fetch if you need exact details.")
+        body = "\n".join(f"- {f}" for f in facts)
+        turns = list(self._digest_turns)
+        budget_chars = config.CONTEXT_DIGEST_MAX_TOKENS * 4
+
+        def render() -> str:
+            return f"{header}\n\n## Known facts\n{body}\n\n## Earlier turns\n" + "\n".join(turns)
+
+        text = render()
+        while len(text) > budget_chars and turns:
+            turns.pop(0)
+            text = render()
+        return text[:budget_chars]
@@ -9,7 +9,7 @@ Provides robust JSON extraction from LLM responses, handling:
 """
 import json
 import re
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from dataclasses import dataclass
 
 
@@ -488,10 +488,13 @@ class OpenAIUsage:
 
     Mimics the OpenAI usage object structure expected by erc3 SDK.
     """
-    def __init__(self, prompt_tokens: int = 0, completion_tokens: int = 0, total_tokens: int = 0):
+    def __init__(self, prompt_tokens: int = 0, completion_tokens: int = 0, total_tokens: int = 0,
+                 cached_prompt_tokens: int = 0):
         self.prompt_tokens = prompt_tokens
         self.completion_tokens = completion_tokens
         self.total_tokens = total_tokens
+        # Part of prompt_tokens served from the backend's prefix cache (not in model_dump)
+        self.cached_prompt_tokens = cached_prompt_tokens
 
     def model_dump(self, mode: str = 'python', include=None, exclude=None,
                    by_alias: bool = False, exclude_unset: bool = False,
@@ -557,3 +560,103 @@ def parse_llm_response(raw_content: str) -> ParseResult:
         success=True,
         data=parsed
     )
+
+
+class IncrementalActionParser:
+    """
+    Extract completed action_queue elements from a streamed LLM response.
+
+    feed() takes text deltas and returns the actions that became complete
+    with this delta. A small JSON scanner (string/escape aware) tracks
+    nesting inside the first top-level object; once the "action_queue"
+    array opens, every element object that closes is json-decoded.
+
+    This is only an early signal: elements that fail to decode are skipped,
+    and the final text still goes through parse_llm_response(), including
+    _detect_corruption and _detect_truncated_action_queue.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Forget everything (e.g. the backend retried the request)."""
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = -1
+        # Last string closed directly inside the top-level object (key or value)
+        self._last_key: Optional[str] = None
+        # Nesting depth of the action_queue array once it is open
+        self._aq_depth: Optional[int] = None
+        self._elem_start = -1
+        self._done = False
+        self.actions: List[Dict[str, Any]] = []
+
+    @property
+    def done(self) -> bool:
+        """True once the action_queue array has closed."""
+        return self._done
+
+    def feed(self, delta: str) -> List[Dict[str, Any]]:
+        """
+        Append a text delta.
+
+        Returns:
+            Action dicts completed by this delta, in stream order
+        """
+        self._text += delta
+        text = self._text
+        completed = []
+
+        while self._pos < len(text) and not self._done:
+            i = self._pos
+            ch = text[i]
+            self._pos += 1
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_key = text[self._string_start + 1:i]
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+            elif ch in '{[':
+                self._depth += 1
+                if self._aq_depth is None:
+                    if ch == '[' and self._depth == 2 and self._last_key == 'action_queue':
+                        self._aq_depth = 2
+                elif ch == '{' and self._depth == self._aq_depth + 1:
+                    self._elem_start = i
+            elif ch in '}]':
+                if self._aq_depth is not None:
+                    if ch == '}' and self._depth == self._aq_depth + 1 and self._elem_start >= 0:
+                        action = self._decode(text[self._elem_start:i + 1])
+                        if action is not None:
+                            self.actions.append(action)
+                            completed.append(action)
+                        self._elem_start = -1
+                    elif ch == ']' and self._depth == self._aq_depth:
+                        self._done = True
+                self._depth -= 1
+
+        return completed
+
+    @staticmethod
+    def _decode(fragment: str) -> Optional[Dict[str, Any]]:
+        try:
+            action = json.loads(fragment)
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(action, dict) or 'tool' not in action:
+            return None
+        return action
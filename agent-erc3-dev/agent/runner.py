@@ -4,8 +4,10 @@ Agent execution loop.
 Main entry point for running the ERC3 agent on a task.
 """
 
+import asyncio
 import json
-from typing import Optional
+import time
+from typing import Any, Optional
 
 from langchain_core.messages import AIMessage
 
@@ -14,6 +16,7 @@ from erc3 import TaskInfo, ERC3
 from llm_provider import get_llm
 from stats import SessionStats, FailureLogger
 from handlers import WikiManager, SecurityManager
+from handlers.api import CachingErcClient
 from utils import CLI_GREEN, CLI_YELLOW, CLI_BLUE, CLI_CYAN, CLI_CLR
 
 from .state import AgentTurnState
@@ -22,6 +25,7 @@ from .loop_detection import LoopDetector
 from .llm_invoker import LLMInvoker
 from .message_builder import MessageBuilder
 from .action_processor import ActionProcessor
+from .streaming import EarlyReadDispatcher
 
 import config
 
@@ -51,76 +55,232 @@ def run_agent(
         wiki_manager: Wiki manager instance (creates new if None)
         backend: LLM backend ("gonka", "openrouter", etc.)
     """
-    # Set defaults
-    if max_turns is None:
-        max_turns = config.MAX_TURNS_PER_TASK
-
-    # Initialize components
-    llm = get_llm(model_name, backend=backend)
-    erc_client = api.get_erc_dev_client(task)
-    cost_model_id = pricing_model or model_name
-
-    # Initialize managers
-    if wiki_manager:
-        wiki_manager.set_api(erc_client)
-    else:
-        wiki_manager = WikiManager(erc_client)
-
-    security_manager = SecurityManager()
-    loop_detector = LoopDetector()
-
-    # Initialize helpers
-    llm_invoker = LLMInvoker(llm, api, task, model_name, cost_model_id, stats)
-    message_builder = MessageBuilder(wiki_manager)
-    action_processor = ActionProcessor(
-        erc_client, wiki_manager, security_manager,
-        task, stats, failure_logger
+    session = _AgentSession(
+        model_name, api, task, stats, pricing_model, max_turns,
+        failure_logger, wiki_manager, backend
     )
 
-    # Initialize conversation
-    messages = message_builder.build_initial_messages(task.task_text)
+    # Main agent loop
+    for turn in range(session.max_turns):
+        if not session.begin_turn(turn):
+            break
 
-    # Initialize turn state
-    state = AgentTurnState(
-        security_manager=security_manager,
-        task=task,
-        api=erc_client,
-        max_turns=max_turns,
-    )
+        # Invoke LLM
+        listener = session.stream_listener()
+        raw_content, usage = session.llm_invoker.invoke(
+            session.messages, stream_listener=listener, priority=session.llm_priority(turn)
+        )
+        if listener:
+            listener.finish()
+        if raw_content is None:
+            break
 
-    # AICODE-NOTE: t016 FIX - Parse baseline employee name from task text for salary comparisons
-    # Pattern: "salary higher than [Name]" or "salary greater than [Name]"
-    import re
-    salary_pattern = r'salary\s+(?:higher|greater|more)\s+than\s+([A-Z][a-zà-ÿ]+(?:\s+[A-Z][a-zà-ÿ]+)+)'
-    match = re.search(salary_pattern, task.task_text, re.IGNORECASE)
-    if match:
-        baseline_name = match.group(1).strip()
-        state.salary_comparison_baseline_name = baseline_name
-        print(f"{CLI_YELLOW}[t016] Detected salary comparison baseline: {baseline_name}{CLI_CLR}")
+        valid_actions = session.handle_response(raw_content, turn)
+        if valid_actions is None:
+            continue
 
-    task_done = False
-    who_am_i_called = False
+        # Execute actions
+        result = session.action_processor.process(
+            valid_actions, session.state, session.who_am_i_called
+        )
+        session.apply_result(result, turn)
 
-    # Log task info at start
-    print(f"{CLI_BLUE}=== Task: {task.task_id} ==={CLI_CLR}")
-    print(f"{CLI_CYAN}[Question]:{CLI_CLR} {task.task_text}")
+    session.finish()
 
-    # Main agent loop
-    for turn in range(max_turns):
-        if task_done:
-            print(f"{CLI_GREEN}Task marked done. Ending agent loop.{CLI_CLR}")
-            break
 
-        # Update turn in state for budget awareness
-        state.current_turn = turn
+async def run_agent_async(
+    model_name: str,
+    api: ERC3,
+    task: TaskInfo,
+    stats: SessionStats = None,
+    pricing_model: str = None,
+    max_turns: int = None,
+    failure_logger: FailureLogger = None,
+    wiki_manager: WikiManager = None,
+    backend: str = "gonka"
+):
+    """
+    Asyncio counterpart of run_agent() - same arguments, same turn logic.
+
+    The LLM call is awaited (LLMInvoker.ainvoke). With OpenRouter a task
+    waiting on the model costs a coroutine, not a thread; with Gonka only the
+    rate-limit waits are on the loop and the signed HTTP call occupies a
+    default-executor thread (see parallel.async_executor). Setup and action
+    processing (ERC3 SDK calls, middleware, enrichers) are synchronous and
+    run in the loop's default executor via asyncio.to_thread.
+
+    AICODE-NOTE: asyncio.to_thread copies contextvars, which is how the
+    per-task output capture (parallel.output) and the ACSC clock offset
+    follow the task into worker threads.
+    """
+    session = await asyncio.to_thread(
+        _AgentSession,
+        model_name, api, task, stats, pricing_model, max_turns,
+        failure_logger, wiki_manager, backend
+    )
 
-        print(f"\n{CLI_BLUE}=== Turn {turn + 1}/{max_turns} ==={CLI_CLR}")
+    for turn in range(session.max_turns):
+        if not session.begin_turn(turn):
+            break
 
-        # Invoke LLM
-        raw_content, usage = llm_invoker.invoke(messages)
+        listener = session.stream_listener()
+        raw_content, usage = await session.llm_invoker.ainvoke(
+            session.messages, stream_listener=listener, priority=session.llm_priority(turn)
+        )
+        if listener:
+            listener.finish()
         if raw_content is None:
             break
 
+        valid_actions = session.handle_response(raw_content, turn)
+        if valid_actions is None:
+            continue
+
+        result = await asyncio.to_thread(
+            session.action_processor.process,
+            valid_actions, session.state, session.who_am_i_called
+        )
+        session.apply_result(result, turn)
+
+    session.finish()
+
+
+class _AgentSession:
+    """
+    Per-task agent components and turn bookkeeping.
+
+    Shared by run_agent and run_agent_async; the two differ only in how
+    the LLM call and action execution are awaited.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        api: ERC3,
+        task: TaskInfo,
+        stats: Optional[SessionStats],
+        pricing_model: Optional[str],
+        max_turns: Optional[int],
+        failure_logger: Optional[FailureLogger],
+        wiki_manager: Optional[WikiManager],
+        backend: str,
+    ):
+        # Set defaults
+        if max_turns is None:
+            max_turns = config.MAX_TURNS_PER_TASK
+        self.max_turns = max_turns
+        self.task = task
+        self.stats = stats
+        self.failure_logger = failure_logger
+        self.started_at = time.time()
+
+        # Initialize components
+        llm = get_llm(model_name, backend=backend, affinity_key=task.task_id)
+        erc_client = api.get_erc_dev_client(task)
+        # AICODE-NOTE: Wrap dev client with a task-scoped read cache. Guards, enrichers
+        # and update strategies re-fetch the same employees/projects many times per turn.
+        if config.API_CACHE_ENABLED:
+            erc_client = CachingErcClient(erc_client)
+        self.erc_client = erc_client
+        cost_model_id = pricing_model or model_name
+
+        # Initialize managers
+        if wiki_manager:
+            wiki_manager.set_api(erc_client)
+        else:
+            wiki_manager = WikiManager(erc_client)
+
+        security_manager = SecurityManager()
+        self.loop_detector = LoopDetector()
+
+        # Initialize helpers
+        self.llm_invoker = LLMInvoker(llm, api, task, model_name, cost_model_id, stats)
+        self.message_builder = MessageBuilder(wiki_manager)
+        self.action_processor = ActionProcessor(
+            erc_client, wiki_manager, security_manager,
+            task, stats, failure_logger
+        )
+
+        # Initialize conversation
+        self.messages = self.message_builder.build_initial_messages(task.task_text)
+
+        # Initialize turn state
+        self.state = AgentTurnState(
+            security_manager=security_manager,
+            task=task,
+            api=erc_client,
+            max_turns=max_turns,
+        )
+
+        # AICODE-NOTE: t016 FIX - Parse baseline employee name from task text for salary comparisons
+        # Pattern: "salary higher than [Name]" or "salary greater than [Name]"
+        import re
+        salary_pattern = r'salary\s+(?:higher|greater|more)\s+than\s+([A-Z][a-zà-ÿ]+(?:\s+[A-Z][a-zà-ÿ]+)+)'
+        match = re.search(salary_pattern, task.task_text, re.IGNORECASE)
+        if match:
+            baseline_name = match.group(1).strip()
+            self.state.salary_comparison_baseline_name = baseline_name
+            print(f"{CLI_YELLOW}[t016] Detected salary comparison baseline: {baseline_name}{CLI_CLR}")
+
+        self.task_done = False
+        self.who_am_i_called = False
+
+        # Log task info at start
+        print(f"{CLI_BLUE}=== Task: {task.task_id} ==={CLI_CLR}")
+        print(f"{CLI_CYAN}[Question]:{CLI_CLR} {task.task_text}")
+
+    def begin_turn(self, turn: int) -> bool:
+        """Start a turn. Returns False when the task is already done."""
+        if self.task_done:
+            print(f"{CLI_GREEN}Task marked done. Ending agent loop.{CLI_CLR}")
+            return False
+
+        # Update turn in state for budget awareness
+        self.state.current_turn = turn
+
+        print(f"\n{CLI_BLUE}=== Turn {turn + 1}/{self.max_turns} ==={CLI_CLR}")
+        # Keep the prompt under budget on long tasks (no-op below it)
+        self.message_builder.compact_history(self.messages, self.state)
+        return True
+
+    def llm_priority(self, turn: int) -> float:
+        """
+        Head start (seconds) for this turn's LLM request in the rate-limit queues.
+
+        Grows with progress through the turn budget and with time already
+        spent, so tasks close to done are not stuck behind fresh ones and
+        the session's last tasks finish sooner.
+        """
+        progress = max(turn / self.max_turns if self.max_turns else 0.0,
+                       (time.time() - self.started_at) / config.LLM_PRIORITY_ELAPSED_REF_SEC)
+        return config.LLM_PRIORITY_MAX_BOOST_SEC * min(1.0, progress)
+
+    def stream_listener(self) -> Optional[EarlyReadDispatcher]:
+        """
+        Listener for this turn's streamed completion, or None to not stream.
+
+        Early reads need the task cache to be useful and are held back until
+        who_am_i, so a guest's reads are never issued ahead of the agent.
+        """
+        if not config.LLM_STREAMING or not self.who_am_i_called:
+            return None
+        if not isinstance(self.erc_client, CachingErcClient):
+            return None
+        return EarlyReadDispatcher(self.action_processor, self.state)
+
+    def handle_response(self, raw_content: str, turn: int) -> Optional[list]:
+        """
+        Parse and validate one LLM response.
+
+        Returns:
+            Actions to execute, or None if the turn ends here (feedback
+            for the model has already been appended to messages)
+        """
+        messages = self.messages
+        message_builder = self.message_builder
+        task = self.task
+        max_turns = self.max_turns
+
         print(f"{CLI_CYAN}[Raw Response]:{CLI_CLR}")
         print(raw_content)
         print()
@@ -139,12 +299,12 @@ def run_agent(
                     print(f"{CLI_YELLOW}Corruption detected in action_queue{CLI_CLR}")
                 messages.append(message_builder.build_corrupted_json_message(parse_result.error))
                 # Don't add AIMessage for corrupted response to avoid confusion
-                continue
+                return None
             else:
                 # Fallback to old behavior for other parse errors
                 messages.append(AIMessage(content=raw_content))
                 messages.append(message_builder.build_json_error_message())
-                continue
+                return None
 
         parsed = parse_result.data
 
@@ -155,23 +315,23 @@ def run_agent(
         is_final = parsed.get("is_final", False)
 
         # Save thoughts for criteria guards
-        state.last_thoughts = thoughts
+        self.state.last_thoughts = thoughts
 
         _print_turn_info(thoughts, plan, action_queue, is_final)
 
         # Validate actions
         valid_actions, malformed_count, malformed_mutation_tools = \
-            action_processor.validate_actions(action_queue, state)
+            self.action_processor.validate_actions(action_queue, self.state)
 
         if malformed_count > 0:
             messages.append(message_builder.build_malformed_actions_message(
                 malformed_count, malformed_mutation_tools
             ))
             if not valid_actions:
-                continue
+                return None
 
-        if failure_logger:
-            failure_logger.log_llm_turn(task.task_id, turn + 1, raw_content, valid_actions)
+        if self.failure_logger:
+            self.failure_logger.log_llm_turn(task.task_id, turn + 1, raw_content, valid_actions)
 
         messages.append(AIMessage(content=raw_content))
 
@@ -179,7 +339,7 @@ def run_agent(
         if is_final and not valid_actions:
             print(f"{CLI_YELLOW}is_final=true but no respond tool{CLI_CLR}")
             messages.append(message_builder.build_is_final_error_message())
-            continue
+            return None
 
         # AICODE-NOTE: t012 FIX - Check for empty action_queue without is_final
         # Agent is stuck if it returns no actions but claims task is not done.
@@ -192,29 +352,48 @@ def run_agent(
                 current_turn=turn,
                 max_turns=max_turns
             ))
-            continue
+            return None
 
         # Loop detection
-        if loop_detector.record_and_check(valid_actions):
+        if self.loop_detector.record_and_check(valid_actions):
             print(f"{CLI_YELLOW}LOOP DETECTED{CLI_CLR}")
             messages.append(message_builder.build_loop_detected_message())
-            loop_detector.clear()
-            continue
+            self.loop_detector.clear()
+            return None
 
-        # Execute actions
-        result = action_processor.process(valid_actions, state, who_am_i_called)
+        return valid_actions
 
-        task_done = result.task_done
-        who_am_i_called = result.who_am_i_called
+    def apply_result(self, result: Any, turn: int):
+        """Record an ActionResult and feed results back to the model."""
+        self.task_done = result.task_done
+        self.who_am_i_called = result.who_am_i_called
 
         # Feed back results with turn budget info
-        messages.append(message_builder.build_results_message(
+        self.messages.append(self.message_builder.build_results_message(
             result.results,
             current_turn=turn,
-            max_turns=max_turns
+            max_turns=self.max_turns
         ))
 
-    print(f"\n{CLI_BLUE}=== Agent finished ==={CLI_CLR}")
+    def finish(self):
+        """Print the end-of-task summary and report cache usage."""
+        print(f"\n{CLI_BLUE}=== Agent finished ==={CLI_CLR}")
+
+        erc_client = self.erc_client
+        if self.action_processor.speculator:
+            # Let an in-flight speculative round land before counters are read
+            self.action_processor.speculator.join(timeout=10.0)
+        if isinstance(erc_client, CachingErcClient):
+            print(f"{CLI_CYAN}[API cache]:{CLI_CLR} {erc_client.summary()}")
+            if self.stats:
+                cache_stats = erc_client.get_stats()
+                self.stats.add_api_cache_usage(
+                    cache_stats['hits'], cache_stats['misses'], task_id=self.task.task_id,
+                    shared_hits=cache_stats['shared_hits'],
+                    speculated=cache_stats['speculated'],
+                    speculative_hits=cache_stats['speculative_hits'],
+                    coalesced=cache_stats['coalesced'],
+                )
 
 
 def _print_turn_info(thoughts: str, plan: list, action_queue: list, is_final: bool):
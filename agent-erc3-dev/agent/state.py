@@ -186,6 +186,10 @@ class AgentTurnState:
     # LLM response tracking (for criteria guards)
     last_thoughts: str = ""
 
+    # AICODE-NOTE: Whole-company OrgSnapshot built once after who_am_i
+    # (config.ORG_SNAPSHOT_ENABLED). None for guests or when disabled/failed.
+    org_snapshot: Optional[Any] = None
+
     # References (set per-action)
     task: Optional[Any] = None
     api: Optional[Any] = None
@@ -274,6 +278,8 @@ class AgentTurnState:
             'entity_locations': self.entity_locations,
             # AICODE-NOTE: t013 FIX v2 - Pass API reference for guards that need to fetch data
             '_api_ref': self.api,
+            # Org snapshot for indexed lookups (see handlers/api/snapshot.py)
+            '_org_snapshot': self.org_snapshot,
             # AICODE-NOTE: t012 FIX - Pass location search tracking for guard
             '_empty_location_search': self.empty_location_search,
             '_empty_location_search_original': self.empty_location_search_original,
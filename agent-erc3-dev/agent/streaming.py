@@ -0,0 +1,87 @@
+"""
+Early dispatch of read actions from a streamed LLM response.
+
+The model writes thoughts and plan first and the action_queue last, so
+most of a completion's wall time passes before the first action is known.
+With streaming, EarlyReadDispatcher sees each action_queue element the
+moment it is complete and starts its API read in the background. When the
+completion finishes, the turn is processed exactly as before (parse,
+validate, middleware, enrichers in order) and those reads hit the cache.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List
+
+from handlers.api import bind_thread_output, request_key
+from utils import CLI_BLUE, CLI_CLR
+
+import config
+
+from .parsing import IncrementalActionParser
+
+
+class EarlyReadDispatcher:
+    """
+    Stream listener (on_delta/on_reset) that pre-dispatches read actions.
+
+    Rules match ActionProcessor._prefetch_read_run: only cacheable reads
+    no middleware might block, and nothing after the first action that is
+    not one (a mutation, respond, wiki or who_am_i), so a read never runs
+    ahead of a write it follows in the queue.
+
+    AICODE-NOTE: Reads that are already in flight when the final text is
+    processed are coalesced by CachingErcClient (single-flight), so an
+    early read is never paid for twice. A backend retry (on_reset) restarts
+    parsing; reads already issued are harmless and stay cached.
+    """
+
+    def __init__(self, action_processor: Any, state: Any):
+        self._processor = action_processor
+        self._state = state
+        self._api = action_processor.erc_client
+        self._parser = IncrementalActionParser()
+        self._pool = ThreadPoolExecutor(
+            max_workers=config.PARALLEL_READ_WORKERS, thread_name_prefix="EarlyRead"
+        )
+        self._blocked = False
+        self._seen = set()
+        self.dispatched: List[Any] = []
+        self.first_dispatch_at = None
+
+    def on_delta(self, text: str) -> None:
+        for action_dict in self._parser.feed(text):
+            if self._blocked:
+                return
+            model = self._processor.parse_read_action(
+                action_dict, self._state, earlier=self.dispatched
+            )
+            if model is None:
+                self._blocked = True
+                return
+            key = request_key(model)
+            if key in self._seen:
+                continue  # Same action again after a backend retry
+            self._seen.add(key)
+            self.dispatched.append(model)
+            if self.first_dispatch_at is None:
+                self.first_dispatch_at = time.time()
+            self._pool.submit(bind_thread_output(self._fetch), model)
+
+    def on_reset(self) -> None:
+        self._parser.reset()
+        self._blocked = False
+
+    def _fetch(self, model: Any) -> None:
+        try:
+            self._api.dispatch(model)
+        except Exception:
+            pass  # Not cached; the regular dispatch surfaces the error
+
+    def finish(self) -> None:
+        """Report what was dispatched early; in-flight reads keep running."""
+        self._pool.shutdown(wait=False)
+        if self.dispatched:
+            lead = time.time() - self.first_dispatch_at
+            print(f"  {CLI_BLUE}[stream] {len(self.dispatched)} read action(s) dispatched "
+                  f"{lead:.1f}s before the completion finished{CLI_CLR}")
@@ -0,0 +1,129 @@
+"""
+Token counting with the served model's own tokenizer.
+
+Usage returned by the backend is the source of truth for billing, but it
+arrives only after the call and is sometimes missing. TokenCounter counts
+locally, before sending: prompt-size checks, compaction decisions, the
+fallback usage estimate, and per-category attribution of the prompt
+(system prompt vs. task vs. API results vs. hints vs. model replies).
+
+The Hugging Face tokenizer is loaded from local files only: config.TOKENIZER_PATH,
+or the HF cache for config.TOKENIZER_MODEL (transformers is already installed
+with sentence-transformers), so a count never waits on a hub download.
+Runners preload it before starting tasks; counts are cached per text. If it
+isn't available locally, a chars/4 estimate is used instead.
+"""
+
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage, SystemMessage
+
+import config
+from utils import CLI_YELLOW, CLI_CLR
+
+# <|im_start|>role\n ... <|im_end|>\n in the Qwen chat template
+MESSAGE_OVERHEAD_TOKENS = 5
+
+# Prompt categories reported by attribute()
+CATEGORIES = ("system", "task", "api_results", "hints", "assistant", "digest")
+
+
+class TokenCounter:
+    """
+    Thread-safe, lazily loaded token counter.
+
+    AICODE-NOTE: The conversation is resent every turn, so nearly every
+    message has been counted before; the per-text LRU cache makes a full
+    prompt count cost only the newly appended messages.
+    """
+
+    def __init__(self, model_name: Optional[str] = None):
+        self.model_name = model_name or config.TOKENIZER_PATH or config.TOKENIZER_MODEL
+        self._tokenizer = None
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._count_cached = lru_cache(maxsize=config.TOKEN_COUNT_CACHE_SIZE)(self._count)
+
+    def preload(self) -> None:
+        """Load the tokenizer now instead of on the first count."""
+        self._load()
+
+    def _load(self):
+        if self._loaded:
+            return self._tokenizer
+        with self._lock:
+            if self._loaded:
+                return self._tokenizer
+            if config.TOKENIZER_ENABLED:
+                try:
+                    from transformers import AutoTokenizer
+                    print(f"Initializing tokenizer ({self.model_name})...")
+                    self._tokenizer = AutoTokenizer.from_pretrained(self.model_name, local_files_only=True)
+                except Exception as e:
+                    print(f"{CLI_YELLOW}Tokenizer not available locally ({e}); "
+                          f"falling back to chars/4 token estimates{CLI_CLR}")
+            self._loaded = True
+            return self._tokenizer
+
+    def _count(self, text: str) -> int:
+        tokenizer = self._load()
+        if tokenizer is None:
+            return (len(text) + 3) // 4
+        return len(tokenizer.encode(text, add_special_tokens=False))
+
+    def count(self, text: str) -> int:
+        """Tokens in a piece of text."""
+        return self._count_cached(text) if text else 0
+
+    def count_messages(self, messages: List[BaseMessage]) -> int:
+        """Prompt tokens of a chat, including per-message template overhead."""
+        return sum(self.count(_text(m)) + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+    def attribute(self, messages: List[BaseMessage]) -> Dict[str, int]:
+        """
+        Split prompt tokens by where they came from.
+
+        Execution logs are split on their "\\n---\\n" separators: entries that
+        start with "Action" are API results, everything else (enricher and
+        guard hints, summaries, turn warnings) counts as hints.
+        """
+        mix = dict.fromkeys(CATEGORIES, 0)
+        for idx, msg in enumerate(messages):
+            text = _text(msg)
+            if isinstance(msg, SystemMessage):
+                mix["system"] += self.count(text)
+            elif isinstance(msg, AIMessage):
+                mix["assistant"] += self.count(text)
+            elif idx == 1:
+                mix["task"] += self.count(text)
+            elif text.startswith("[CONTEXT DIGEST]"):
+                mix["digest"] += self.count(text)
+            elif "[EXECUTION LOG]" in text:
+                header, log = text.split("[EXECUTION LOG]", 1)
+                mix["hints"] += self.count(header)
+                for entry in log.split("\n---\n"):
+                    category = "api_results" if entry.lstrip().startswith("Action") else "hints"
+                    mix[category] += self.count(entry)
+            else:
+                mix["hints"] += self.count(text)
+        return mix
+
+
+def _text(message: BaseMessage) -> str:
+    return message.content if isinstance(message.content, str) else str(message.content)
+
+
+_counter: Optional[TokenCounter] = None
+_counter_lock = threading.Lock()
+
+
+def get_token_counter() -> TokenCounter:
+    """Process-wide TokenCounter (the tokenizer is loaded once)."""
+    global _counter
+    if _counter is None:
+        with _counter_lock:
+            if _counter is None:
+                _counter = TokenCounter()
+    return _counter
@@ -54,6 +54,130 @@ DEFAULT_THREADS = 1
 # Retry attempts for LLM calls
 LLM_RETRY_ATTEMPTS = 3
 
+# Task-scoped read-through cache for ERC3 GET/search/list requests
+API_CACHE_ENABLED = True
+
+# Dispatch runs of consecutive read-only actions in one action_queue concurrently
+# (requires API_CACHE_ENABLED; middleware/enrichers still run in original order)
+PARALLEL_READ_ACTIONS = True
+PARALLEL_READ_WORKERS = 8
+
+# Concurrency width for handler-internal fan-out (per-hit GETs, per-employee project scans)
+API_FANOUT_WORKERS = 8
+
+# Wiki pages downloaded concurrently when a new wiki sha1 appears (WikiManager),
+# each retried up to WIKI_DOWNLOAD_RETRIES times with exponential backoff
+WIKI_DOWNLOAD_WORKERS = 8
+WIKI_DOWNLOAD_RETRIES = 3
+
+# Pages requested concurrently per round by handlers/api/paginator.py once the
+# first page reports more data: PAGINATION_WINDOW_START pages at first, doubling
+# while pages keep coming back full, up to PAGINATION_WINDOW (server page size
+# is 5, so most lists end within the first window)
+PAGINATION_WINDOW_START = 2
+PAGINATION_WINDOW = 16
+
+# Build a whole-company snapshot (all employees/projects/customers + details)
+# right after who_am_i, so enrichers and guards use indexed lookups.
+# Costs one GET per employee and project up front - off by default.
+ORG_SNAPSHOT_ENABLED = False
+
+# Share immutable reference data (customer directory, department list,
+# skill/will catalogues) across tasks in this process. Keyed by a per-task
+# environment fingerprint (wiki sha1 + first list pages) computed after who_am_i.
+SHARED_REFERENCE_CACHE_ENABLED = True
+
+# Between turns, prefetch the GETs the agent most likely issues next
+# (projects/employees/customers_get for the hits of this turn's searches)
+# on a background thread. Budget is per task, cap is per turn.
+SPECULATIVE_PREFETCH_ENABLED = True
+SPECULATIVE_PREFETCH_BUDGET = 40
+SPECULATIVE_PREFETCH_PER_TURN = 10
+
+# Stream LLM completions and start read-only actions (projects_get, employees_search, ...)
+# as soon as they are complete in the stream, before the completion finishes
+# (agent/streaming.py). Needs API_CACHE_ENABLED. Off by default: requires the
+# backend/nodes to support stream=True with stream_options.include_usage.
+LLM_STREAMING = False
+
+# Parallel mode on one asyncio event loop (parallel/async_executor.py) instead of
+# thread-per-task; also enabled by the -async CLI flag. -threads N then caps
+# concurrent tasks, and blocking work (ERC3 SDK, handlers, signed Gonka calls)
+# runs in a pool of ASYNC_BLOCKING_WORKERS threads. A Gonka LLM call holds its
+# thread for the whole request, so with the Gonka backend this pool, not
+# -threads, is the real cap on tasks waiting on the model (OpenRouter is async).
+ASYNC_AGENT_LOOP = False
+ASYNC_BLOCKING_WORKERS = 64
+
+# Priority in the Gonka rate-limit queues for parallel runs. A task's LLM request
+# is ordered as if it had queued up to LLM_PRIORITY_MAX_BOOST_SEC earlier, scaled
+# by how far the task is (turn / MAX_TURNS_PER_TASK) and how long it has been
+# running (relative to LLM_PRIORITY_ELAPSED_REF_SEC), so nearly finished tasks are
+# not held up behind new ones. The boost is bounded, so nothing starves. 0 = FIFO.
+LLM_PRIORITY_MAX_BOOST_SEC = 30.0
+LLM_PRIORITY_ELAPSED_REF_SEC = 600.0
+
+# Context compaction (MessageBuilder.compact_history). Once the prompt estimate
+# exceeds CONTEXT_TOKEN_BUDGET, turns older than the last CONTEXT_KEEP_RECENT_TURNS
+# are folded into one [CONTEXT DIGEST] message of at most CONTEXT_DIGEST_MAX_TOKENS.
+# The system prompt and the task stay verbatim. Off by default: old tool results
+# become one-line digests, which can change answers - validate on the task set first.
+CONTEXT_COMPACTION_ENABLED = False
+CONTEXT_TOKEN_BUDGET = 24000
+CONTEXT_KEEP_RECENT_TURNS = 3
+CONTEXT_DIGEST_MAX_TOKENS = 2500
+
+# Local token counting (agent/token_counter.py) with the Hugging Face tokenizer of
+# the served model; falls back to chars/4 when it can't be loaded. Used for the
+# compaction budget, pre-send prompt checks, prompt attribution in the stats
+# report and usage when the backend omits it. A warning is printed for prompts
+# over CONTEXT_PROMPT_WARN_TOKENS.
+# The tokenizer is never downloaded at run time: it is loaded from TOKENIZER_PATH
+# (a directory with tokenizer.json etc.) or, if None, from the local Hugging Face
+# cache for TOKENIZER_MODEL. Fetch it once with
+#   huggingface-cli download Qwen/Qwen3-235B-A22B-Instruct-2507 --include "tokenizer*"
+TOKENIZER_ENABLED = True
+TOKENIZER_MODEL = "Qwen/Qwen3-235B-A22B-Instruct-2507"
+TOKENIZER_PATH = None
+TOKEN_COUNT_CACHE_SIZE = 4096
+CONTEXT_PROMPT_WARN_TOKENS = 60000
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# TRANSPORT SETTINGS (transport.py)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Connection pool per session: distinct hosts kept, connections kept per host.
+# Maxsize should cover the widest concurrent fan-out from one thread
+# (PAGINATION_WINDOW / API_FANOUT_WORKERS), otherwise urllib3 discards
+# connections and reconnects.
+HTTP_POOL_CONNECTIONS = 10
+HTTP_POOL_MAXSIZE = 32
+
+# Default (connect, read) timeouts in seconds for calls that don't set one
+HTTP_CONNECT_TIMEOUT = 5.0
+HTTP_READ_TIMEOUT = 60.0
+
+# Send ERC3 client traffic over HTTP/2 via httpx (requires `httpx[http2]`).
+# Concurrent requests from one thread then share one multiplexed connection.
+HTTP2_ENABLED = False
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# GONKA NODE STATE (llm_provider.py)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Node stats, blacklist, clock offsets and topology are saved here on exit and
+# restored on the next start (empty string disables persistence)
+NODE_STATE_FILE = ".gonka_node_state.json"
+
+# Saved state older than this is ignored entirely
+NODE_STATE_TTL_SEC = 1800
+
+# A restored node list older than this is not trusted: startup then does the
+# blocking topology refresh and warmup as usual (stats/offsets still restored)
+NODE_STATE_TOPOLOGY_TTL_SEC = 600
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # LOGGING SETTINGS
@@ -10,12 +10,11 @@ This handler implements intelligent employee search that:
 import re
 import copy
 from typing import Any, Dict, List, Optional, Sequence, Tuple
-from erc3 import ApiException
 from erc3.erc3 import client
 from erc3.erc3.dtos import SkillFilter, ProjectTeamFilter
 from .base import ActionHandler
 from ..base import ToolContext
-from ..execution.pagination import handle_pagination_error
+from ..api import fan_out, get_org_snapshot, cached_reference, paginate
 from utils import CLI_BLUE, CLI_YELLOW, CLI_GREEN, CLI_CLR
 
 
@@ -31,6 +30,13 @@ class EmployeeSearchHandler(ActionHandler):
     may match "will_mentor_juniors").
     """
 
+    def __init__(self):
+        # AICODE-NOTE: Project team cache shared by all workload/enrichment paths for
+        # the whole task (handler lives as long as the task's ActionExecutor).
+        # Dropped whenever a mutation was recorded since it was filled.
+        self._project_team_cache: Dict[str, Sequence[Any]] = {}
+        self._team_cache_mutation_mark = 0
+
     def can_handle(self, ctx: ToolContext) -> bool:
         """Handle only employee search requests."""
         return isinstance(ctx.model, client.Req_SearchEmployees)
@@ -517,86 +523,109 @@ class EmployeeSearchHandler(ActionHandler):
                     return 0.0
         return 0.0
 
-    def _fetch_workload_for_candidates(self, ctx: ToolContext, emp_ids: List[str]) -> Dict[str, float]:
+    def _get_project_team_cache(self, ctx: ToolContext) -> Dict[str, Sequence[Any]]:
+        """Return the task-wide project team cache, dropping it if mutations happened since it was filled."""
+        mark = len(ctx.shared.get('mutation_entities') or [])
+        if mark != self._team_cache_mutation_mark:
+            self._project_team_cache.clear()
+            self._team_cache_mutation_mark = mark
+        return self._project_team_cache
+
+    def _search_member_project_ids(self, ctx: ToolContext, emp_id: str, include_archived: bool) -> List[str]:
         """
-        Fetch workload (sum of time_slice from projects) for a list of employee IDs.
+        Page through projects_search(team=emp_id) and collect project IDs.
 
-        AICODE-NOTE: Used for "least/most busy" queries where workload = sum of time_slice.
+        Employees are fanned out by _fetch_member_project_ids; pages of one
+        employee are fetched speculatively by paginate().
+        On failure, prints a warning and returns the IDs collected so far.
+        """
+        def _make_request(offset: int, limit: int) -> Any:
+            search_args = dict(
+                team=ProjectTeamFilter(employee_id=emp_id),
+                limit=limit,
+                offset=offset
+            )
+            if include_archived:
+                search_args['include_archived'] = True
+            return client.Req_SearchProjects(**search_args)
+
+        # AICODE-NOTE: The ERC3 API enforces a very small max `limit` (often 5).
+        # Using larger defaults (e.g., 50) triggers "page limit exceeded" and makes workload look like 0.
+        # If the API forbids pagination entirely, paginate() returns no data.
+        fetched = paginate(ctx.api, _make_request, 'projects', limit=5)
+        if fetched.error is not None:
+            print(f"  {CLI_YELLOW}⚠ Failed to fetch projects for {emp_id}: {fetched.error}{CLI_CLR}")
+
+        return [p.id for p in fetched.items if getattr(p, 'id', None)]
+
+    def _fetch_member_project_ids(self, ctx: ToolContext, emp_ids: List[str],
+                                  include_archived: bool) -> Dict[str, List[str]]:
+        """Fetch project IDs for several employees concurrently (emp_id -> [project_id, ...])."""
+        return fan_out(
+            lambda emp_id: self._search_member_project_ids(ctx, emp_id, include_archived),
+            emp_ids
+        )
 
-        Returns:
-            Dict mapping emp_id -> total time_slice (workload)
+    def _fetch_project_teams(self, ctx: ToolContext, proj_ids: List[str]) -> Dict[str, Sequence[Any]]:
         """
-        if not emp_ids:
-            return {}
+        Get project teams for project IDs, fetching cache misses concurrently.
 
-        print(f"  {CLI_BLUE}🔍 Fetching workload for {len(emp_ids)} tie-breaker candidates...{CLI_CLR}")
+        Projects that cannot be fetched map to an empty team for this call
+        but are not cached, so a later call retries them.
+        """
+        team_cache = self._get_project_team_cache(ctx)
+        missing = [pid for pid in dict.fromkeys(proj_ids) if pid not in team_cache]
 
-        workload = {}
-        project_team_cache: Dict[str, Sequence[Any]] = {}
+        def _fetch_team(proj_id: str) -> Optional[Sequence[Any]]:
+            try:
+                proj_detail = ctx.api.dispatch(client.Req_GetProject(id=proj_id))
+                return (proj_detail.project.team if (proj_detail and proj_detail.project) else []) or []
+            except Exception:
+                return None
 
-        for emp_id in emp_ids:
-            total_time_slice = 0.0
+        for proj_id, team in fan_out(_fetch_team, missing).items():
+            if team is not None:
+                team_cache[proj_id] = team
 
-            try:
-                proj_offset = 0
-                proj_limit = 5
-                seen_offsets = set()
+        return {pid: team_cache.get(pid, []) for pid in proj_ids}
 
-                while True:
-                    if proj_offset in seen_offsets:
-                        break
-                    seen_offsets.add(proj_offset)
-
-                    # AICODE-NOTE: t010 FIX - Include ALL projects for workload calculation.
-                    # Benchmark expects workload to include archived projects too.
-                    proj_search = client.Req_SearchProjects(
-                        team=ProjectTeamFilter(employee_id=emp_id),
-                        include_archived=True,
-                        limit=proj_limit,
-                        offset=proj_offset
-                    )
+    def _compute_workloads(self, ctx: ToolContext, emp_ids: List[str]) -> Dict[str, float]:
+        """
+        Compute workload (sum of time_slice across projects) for employees.
 
-                    try:
-                        proj_result = ctx.api.dispatch(proj_search)
-                    except ApiException as e:
-                        handled, retry_result = handle_pagination_error(e, proj_search, ctx.api)
-                        if handled:
-                            proj_result = retry_result
-                            if proj_result is None:
-                                break
-                            proj_limit = getattr(proj_search, 'limit', proj_limit) or proj_limit
-                        else:
-                            raise
+        Batched fetch stage: collect member project IDs for all employees
+        concurrently, then fetch all distinct project teams concurrently.
 
-                    if not proj_result or not getattr(proj_result, 'projects', None):
-                        break
+        AICODE-NOTE: t010 FIX - Include ALL projects for workload calculation.
+        Benchmark expects workload to include archived projects too.
+        """
+        member_projects = self._fetch_member_project_ids(ctx, emp_ids, include_archived=True)
+        all_proj_ids = [pid for pids in member_projects.values() for pid in pids]
+        teams = self._fetch_project_teams(ctx, all_proj_ids)
 
-                    for proj_brief in proj_result.projects:
-                        proj_id = getattr(proj_brief, 'id', None)
-                        if not proj_id:
-                            continue
-
-                        team = project_team_cache.get(proj_id)
-                        if team is None:
-                            try:
-                                proj_detail = ctx.api.dispatch(client.Req_GetProject(id=proj_id))
-                                team = proj_detail.project.team if (proj_detail and proj_detail.project) else []
-                                project_team_cache[proj_id] = team or []
-                            except Exception:
-                                project_team_cache[proj_id] = []
-                                continue
-
-                        total_time_slice += self._extract_time_slice_from_team(team, emp_id)
-
-                    next_proj_offset = getattr(proj_result, 'next_offset', -1)
-                    if next_proj_offset is None or next_proj_offset <= 0:
-                        break
-                    proj_offset = next_proj_offset
+        workload = {}
+        for emp_id in emp_ids:
+            workload[emp_id] = sum(
+                self._extract_time_slice_from_team(teams.get(proj_id, []), emp_id)
+                for proj_id in member_projects.get(emp_id, [])
+            )
+        return workload
 
-            except Exception as e:
-                print(f"  {CLI_YELLOW}⚠ Failed to fetch projects for {emp_id}: {e}{CLI_CLR}")
+    def _fetch_workload_for_candidates(self, ctx: ToolContext, emp_ids: List[str]) -> Dict[str, float]:
+        """
+        Fetch workload (sum of time_slice from projects) for a list of employee IDs.
 
-            workload[emp_id] = total_time_slice
+        AICODE-NOTE: Used for "least/most busy" queries where workload = sum of time_slice.
+
+        Returns:
+            Dict mapping emp_id -> total time_slice (workload)
+        """
+        if not emp_ids:
+            return {}
+
+        print(f"  {CLI_BLUE}🔍 Fetching workload for {len(emp_ids)} tie-breaker candidates...{CLI_CLR}")
+
+        workload = self._compute_workloads(ctx, emp_ids)
 
         print(f"  {CLI_GREEN}✓ Computed workload for {len(workload)} candidates{CLI_CLR}")
         return workload
@@ -617,54 +646,9 @@ class EmployeeSearchHandler(ActionHandler):
 
         print(f"  {CLI_BLUE}🔍 Counting projects for {len(emp_ids)} tie-breaker candidates...{CLI_CLR}")
 
-        project_counts = {}
-
-        for emp_id in emp_ids:
-            total_projects = 0
-
-            try:
-                proj_offset = 0
-                proj_limit = 5
-                seen_offsets = set()
-
-                while True:
-                    if proj_offset in seen_offsets:
-                        break
-                    seen_offsets.add(proj_offset)
-
-                    # AICODE-NOTE: Search ALL projects (not just active) - "project work" means involvement
-                    proj_search = client.Req_SearchProjects(
-                        team=ProjectTeamFilter(employee_id=emp_id),
-                        limit=proj_limit,
-                        offset=proj_offset
-                    )
-
-                    try:
-                        proj_result = ctx.api.dispatch(proj_search)
-                    except ApiException as e:
-                        handled, retry_result = handle_pagination_error(e, proj_search, ctx.api)
-                        if handled:
-                            proj_result = retry_result
-                            if proj_result is None:
-                                break
-                            proj_limit = getattr(proj_search, 'limit', proj_limit) or proj_limit
-                        else:
-                            raise
-
-                    if not proj_result or not getattr(proj_result, 'projects', None):
-                        break
-
-                    total_projects += len(proj_result.projects)
-
-                    next_proj_offset = getattr(proj_result, 'next_offset', -1)
-                    if next_proj_offset is None or next_proj_offset <= 0:
-                        break
-                    proj_offset = next_proj_offset
-
-            except Exception as e:
-                print(f"  {CLI_YELLOW}⚠ Failed to count projects for {emp_id}: {e}{CLI_CLR}")
-
-            project_counts[emp_id] = total_projects
+        # AICODE-NOTE: Search ALL projects (not just active) - "project work" means involvement
+        member_projects = self._fetch_member_project_ids(ctx, emp_ids, include_archived=False)
+        project_counts = {emp_id: len(member_projects.get(emp_id, [])) for emp_id in emp_ids}
 
         print(f"  {CLI_GREEN}✓ Counted projects for {len(project_counts)} candidates{CLI_CLR}")
         return project_counts
@@ -724,13 +708,23 @@ class EmployeeSearchHandler(ActionHandler):
 
         print(f"  {CLI_BLUE}🔍 Enriching results with skill/will levels...{CLI_CLR}")
 
-        # Fetch levels for each employee
+        # Fetch full employee records for all hits concurrently
+        def _fetch_employee(emp_id: str) -> Any:
+            try:
+                return ctx.api.dispatch(client.Req_GetEmployee(id=emp_id))
+            except Exception as e:
+                return e
+
+        details = fan_out(_fetch_employee, [emp.id for emp in employees])
+
+        # Extract levels for each employee (original hit order)
         enriched_data = []
         for emp in employees:
             try:
-                emp_model = client.Req_GetEmployee(id=emp.id)
-                emp_result = ctx.api.dispatch(emp_model)
-                if not emp_result.employee:
+                emp_result = details.get(emp.id)
+                if isinstance(emp_result, Exception):
+                    raise emp_result
+                if not emp_result or not emp_result.employee:
                     continue
 
                 emp_info = {'id': emp.id, 'name': emp.name}
@@ -1175,81 +1169,7 @@ class EmployeeSearchHandler(ActionHandler):
         try:
             # AICODE-NOTE: t076 fix - Calculate workload from projects, not time_summary!
             # For each employee, find their projects and sum time_slice values.
-            workload = {}
-
-            # Cache project teams across employees to avoid repeated projects_get calls.
-            project_team_cache: Dict[str, Sequence[Any]] = {}
-
-            for emp_id in emp_ids:
-                total_time_slice = 0.0
-
-                # Search projects where employee is a team member
-                try:
-                    # AICODE-NOTE: The ERC3 API enforces a very small max `limit` (often 5).
-                    # Using larger defaults (e.g., 50) triggers "page limit exceeded" and makes workload look like 0.
-                    proj_offset = 0
-                    proj_limit = 5
-                    seen_offsets = set()
-
-                    while True:
-                        if proj_offset in seen_offsets:
-                            break
-                        seen_offsets.add(proj_offset)
-
-                        # AICODE-NOTE: t010 FIX - Include ALL projects for workload calculation.
-                        # Benchmark expects workload to include archived projects too.
-                        proj_search = client.Req_SearchProjects(
-                            team=ProjectTeamFilter(employee_id=emp_id),
-                            include_archived=True,
-                            limit=proj_limit,
-                            offset=proj_offset
-                        )
-
-                        try:
-                            proj_result = ctx.api.dispatch(proj_search)
-                        except ApiException as e:
-                            handled, retry_result = handle_pagination_error(e, proj_search, ctx.api)
-                            if handled:
-                                proj_result = retry_result
-                                # If API forbids pagination, treat as "no data available" for workload.
-                                if proj_result is None:
-                                    break
-                                # Keep using the corrected limit for subsequent pages
-                                proj_limit = getattr(proj_search, 'limit', proj_limit) or proj_limit
-                            else:
-                                raise
-
-                        if not proj_result or not getattr(proj_result, 'projects', None):
-                            break
-
-                        # For each project, get details to extract time_slice
-                        for proj_brief in proj_result.projects:
-                            proj_id = getattr(proj_brief, 'id', None)
-                            if not proj_id:
-                                continue
-
-                            team = project_team_cache.get(proj_id)
-                            if team is None:
-                                try:
-                                    proj_detail = ctx.api.dispatch(client.Req_GetProject(id=proj_id))
-                                    team = proj_detail.project.team if (proj_detail and proj_detail.project) else []
-                                    project_team_cache[proj_id] = team or []
-                                except Exception:
-                                    # Skip if can't get project details
-                                    project_team_cache[proj_id] = []
-                                    continue
-
-                            total_time_slice += self._extract_time_slice_from_team(team, emp_id)
-
-                        next_proj_offset = getattr(proj_result, 'next_offset', -1)
-                        if next_proj_offset is None or next_proj_offset <= 0:
-                            break
-                        proj_offset = next_proj_offset
-
-                except Exception as e:
-                    print(f"  {CLI_YELLOW}⚠ Failed to fetch projects for {emp_id}: {e}{CLI_CLR}")
-
-                workload[emp_id] = total_time_slice
+            workload = self._compute_workloads(ctx, emp_ids)
 
             # Build output lines
             lines = ["", "📊 **WORKLOAD** (sum of time_slice from projects):"]
@@ -1564,20 +1484,11 @@ class EmployeeSearchHandler(ActionHandler):
         AICODE-NOTE: Adaptive approach - instead of hardcoded mappings,
         we discover actual will names from the system and let agent choose.
         """
-        try:
-            # Get first employee to see available wills
-            model = client.Req_SearchEmployees(limit=1, offset=0)
-            result = ctx.api.dispatch(model)
-            if result.employees:
-                emp_id = result.employees[0].id
-                # Get full employee details with wills
-                emp_model = client.Req_GetEmployee(id=emp_id)
-                emp_result = ctx.api.dispatch(emp_model)
-                if emp_result.employee and emp_result.employee.wills:
-                    return [w.name for w in emp_result.employee.wills]
-        except Exception:
-            pass
-        return []
+        snapshot = get_org_snapshot(ctx, require_complete=True)
+        if snapshot is not None:
+            return snapshot.will_names()
+        return cached_reference(ctx.api, 'employee', 'will_names',
+                                lambda: self._sample_employee_names(ctx, 'wills'))
 
     def _get_available_skills_from_api(self, ctx: ToolContext) -> List[str]:
         """
@@ -1586,17 +1497,26 @@ class EmployeeSearchHandler(ActionHandler):
         AICODE-NOTE: Same adaptive approach as wills - discover actual skill names
         from the system instead of hardcoded mappings.
         """
+        snapshot = get_org_snapshot(ctx, require_complete=True)
+        if snapshot is not None:
+            return snapshot.skill_names()
+        return cached_reference(ctx.api, 'employee', 'skill_names',
+                                lambda: self._sample_employee_names(ctx, 'skills'))
+
+    def _sample_employee_names(self, ctx: ToolContext, attr: str) -> List[str]:
+        """Skill or will names of the first employee (every employee carries the full catalogue)."""
         try:
-            # Get first employee to see available skills
+            # Get first employee to see available skills/wills
             model = client.Req_SearchEmployees(limit=1, offset=0)
             result = ctx.api.dispatch(model)
             if result.employees:
                 emp_id = result.employees[0].id
-                # Get full employee details with skills
+                # Get full employee details with skills/wills
                 emp_model = client.Req_GetEmployee(id=emp_id)
                 emp_result = ctx.api.dispatch(emp_model)
-                if emp_result.employee and emp_result.employee.skills:
-                    return [s.name for s in emp_result.employee.skills]
+                items = getattr(emp_result.employee, attr, None) if emp_result.employee else None
+                if items:
+                    return [item.name for item in items]
         except Exception:
             pass
         return []
@@ -2047,34 +1967,29 @@ class EmployeeSearchHandler(ActionHandler):
         AICODE-NOTE: t009 FIX #2 - Increased sample size to catch small departments like HR.
         Previous: 10 employees (2 pages of 5)
         Now: up to 50 employees (10 pages of 5) to ensure we find all departments
+        With an org snapshot the list is exact (every employee is indexed).
         """
-        try:
-            departments = set()
-            offset = 0
-            max_pages = 10  # Up to 50 employees
-
-            for _ in range(max_pages):
-                model = client.Req_SearchEmployees(limit=5, offset=offset)
-                result = ctx.api.dispatch(model)
-
-                if result.employees:
-                    for emp in result.employees:
-                        if emp.department:
-                            departments.add(emp.department)
-
-                # Stop if no more pages
-                if result.next_offset <= 0:
-                    break
-                offset = result.next_offset
-
-                # Stop if we have enough departments (likely found all)
-                if len(departments) >= 8:
-                    break
-
-            return list(departments)
-        except Exception:
-            pass
-        return []
+        snapshot = get_org_snapshot(ctx)
+        if snapshot is not None:
+            return snapshot.departments()
+        return cached_reference(ctx.api, 'employee', 'departments',
+                                lambda: self._sample_departments(ctx))
+
+    def _sample_departments(self, ctx: ToolContext) -> List[str]:
+        """Collect department names from the first pages of employees."""
+        def _departments(employees: List[Any]) -> set:
+            return {emp.department for emp in employees if getattr(emp, 'department', None)}
+
+        # Up to 50 employees (10 pages of 5); stop early once we have enough
+        # departments (likely found all)
+        fetched = paginate(
+            ctx.api,
+            lambda offset, limit: client.Req_SearchEmployees(limit=limit, offset=offset),
+            'employees',
+            max_pages=10,
+            stop=lambda employees: len(_departments(employees)) >= 8,
+        )
+        return list(_departments(fetched.items))
 
     def _correct_skill_names(self, ctx: ToolContext) -> None:
         """
@@ -0,0 +1,37 @@
+"""
+ERC3 API access layer.
+
+Provides:
+- CachingErcClient: Task-scoped read-through cache around the dev client
+- request_key: Canonical cache key for a request model
+- is_cacheable_read: Check if a request is a memoized read
+- fan_out: Bounded concurrent fan-out for independent API calls
+- paginate: Speculative concurrent paginator for limit=5 list/search endpoints
+- OrgSnapshot: Indexed whole-company snapshot built after who_am_i
+- get_org_snapshot: Fetch the task's snapshot from a ToolContext
+- ReferenceDataCache: Process-wide cross-task cache for immutable reference data
+- compute_env_fingerprint / cached_reference: Fingerprinting and lookup helpers
+- SpeculativePrefetcher: Background prefetch of predicted follow-up GETs between turns
+"""
+from .cache import CachingErcClient, request_key, is_cacheable_read
+from .fanout import fan_out, bind_thread_output
+from .paginator import paginate, PageFetch
+from .snapshot import OrgSnapshot, get_org_snapshot
+from .shared_cache import ReferenceDataCache, compute_env_fingerprint, cached_reference
+from .speculation import SpeculativePrefetcher
+
+__all__ = [
+    'CachingErcClient',
+    'request_key',
+    'is_cacheable_read',
+    'fan_out',
+    'bind_thread_output',
+    'paginate',
+    'PageFetch',
+    'OrgSnapshot',
+    'get_org_snapshot',
+    'ReferenceDataCache',
+    'compute_env_fingerprint',
+    'cached_reference',
+    'SpeculativePrefetcher',
+]
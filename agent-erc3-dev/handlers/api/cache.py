@@ -0,0 +1,444 @@
+"""
+Task-scoped read-through cache for the ERC3 dev client.
+
+Wraps the client returned by ERC3.get_erc_dev_client() so that repeated
+GET/search/list requests within one task hit memory instead of the API.
+Mutations go straight through and invalidate the affected entries.
+"""
+import copy
+import json
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from erc3.erc3 import client
+
+from utils import CLI_YELLOW, CLI_CLR
+
+from .fanout import fan_out
+from .shared_cache import ReferenceDataCache
+
+
+# Cacheable read requests -> domain they belong to.
+# AICODE-NOTE: Wiki requests and Req_WhoAmI are deliberately NOT cached.
+# wiki_sha1 can change mid-task and WikiManager.sync() relies on fresh data.
+READ_DOMAINS = {
+    client.Req_GetEmployee: 'employee',
+    client.Req_SearchEmployees: 'employee',
+    client.Req_ListEmployees: 'employee',
+    client.Req_GetProject: 'project',
+    client.Req_SearchProjects: 'project',
+    client.Req_ListProjects: 'project',
+    client.Req_GetCustomer: 'customer',
+    client.Req_SearchCustomers: 'customer',
+    client.Req_ListCustomers: 'customer',
+    client.Req_GetTimeEntry: 'time',
+    client.Req_SearchTimeEntries: 'time',
+    client.Req_TimeSummaryByEmployee: 'time',
+    client.Req_TimeSummaryByProject: 'time',
+}
+
+# Single-entity GET requests: only the entry for that ID is dropped on mutation
+GET_TYPES = (
+    client.Req_GetEmployee,
+    client.Req_GetProject,
+    client.Req_GetCustomer,
+    client.Req_GetTimeEntry,
+)
+
+# Mutation request -> (domains to invalidate, attribute holding the entity ID)
+MUTATION_DOMAINS = {
+    client.Req_UpdateEmployeeInfo: (('employee',), 'employee'),
+    client.Req_UpdateProjectTeam: (('project',), 'id'),
+    client.Req_UpdateProjectStatus: (('project',), 'id'),
+    client.Req_LogTimeEntry: (('time',), None),
+    client.Req_UpdateTimeEntry: (('time',), 'id'),
+}
+
+# Reads also served from the process-wide ReferenceDataCache once the client
+# has an environment fingerprint. The API has no customer mutations, so the
+# customer directory is identical for every task in the same environment.
+SHARED_READ_TYPES = (
+    client.Req_GetCustomer,
+    client.Req_SearchCustomers,
+    client.Req_ListCustomers,
+)
+
+# Requests that neither read cacheable data nor change it
+# (wiki content is versioned by sha1 and handled by WikiManager)
+PASSTHROUGH_TYPES = (
+    client.Req_WhoAmI,
+    client.Req_ListWiki,
+    client.Req_LoadWiki,
+    client.Req_SearchWiki,
+    client.Req_UpdateWiki,
+    client.Req_ProvideAgentResponse,
+)
+
+
+def request_key(req: Any) -> str:
+    """
+    Build a canonical cache key from a request model.
+
+    The key is the request type name plus the request payload serialized
+    with sorted keys, so field order and dict ordering don't matter.
+    """
+    if hasattr(req, 'model_dump'):
+        payload = req.model_dump(mode='json')
+    else:
+        payload = dict(getattr(req, '__dict__', {}))
+    return f"{type(req).__name__}:{json.dumps(payload, sort_keys=True, default=str)}"
+
+
+def is_cacheable_read(req: Any) -> bool:
+    """Check if a request is a read that CachingErcClient memoizes."""
+    return _read_domain(req) is not None
+
+
+def _read_domain(req: Any) -> Optional[str]:
+    """Return cache domain for a read request, or None if not cacheable."""
+    for req_type, domain in READ_DOMAINS.items():
+        if isinstance(req, req_type):
+            return domain
+    return None
+
+
+class CachingErcClient:
+    """
+    Read-through cache in front of an ERC3 dev client.
+
+    - Read requests (Req_Get*/Req_Search*/Req_List* for employees, projects,
+      customers and time entries) are memoized by canonical payload.
+    - Mutations invalidate the GET entry of the touched entity plus every
+      search/list entry in the same domain (search results embed entity fields).
+    - Unknown request types invalidate everything (fail-safe).
+    - Customer reads are also shared across tasks via ReferenceDataCache once
+      env_fingerprint is set; mutated domains are excluded from sharing.
+    - Responses are deep-copied on store and on hit, because handlers and
+      enrichers patch response objects in place.
+    - Identical reads in flight at the same time are coalesced (single-flight):
+      one API call, every waiter gets its own deep copy of the response or
+      the same exception.
+
+    All other attributes (list_wiki, load_wiki, ...) are delegated to the
+    wrapped client, so this can be used anywhere the raw client is expected.
+
+    AICODE-NOTE: Thread-safe. Cache bookkeeping is guarded by a lock while the
+    network call itself runs outside of it.
+    """
+
+    def __init__(self, inner: Any):
+        self._inner = inner
+        self._lock = threading.Lock()
+        # key -> (domain, entity_id or None for search/list, response)
+        self._entries: Dict[str, Tuple[str, Optional[str], Any]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.prefetched = 0
+        self.shared_hits = 0
+        # Speculative prefetch (see speculation.py): keys fetched ahead of any
+        # request for them, and how many of those were later read
+        self.speculated = 0
+        self.speculative_hits = 0
+        self._speculative_keys = set()
+        # Bumped on every invalidation; a read that started before an
+        # invalidation must not store its (possibly pre-mutation) response
+        self._generation = 0
+        # Set after who_am_i (see shared_cache.compute_env_fingerprint);
+        # None disables cross-task sharing for this client
+        self.env_fingerprint: Optional[str] = None
+        self.mutated_domains = set()
+        self._mutation_listeners: List[Callable[[Any], None]] = []
+        # key -> (generation, Future) for reads currently on the wire
+        self._inflight: Dict[str, Tuple[int, Future]] = {}
+        self.coalesced = 0
+
+    @property
+    def inner(self) -> Any:
+        """The wrapped (uncached) client."""
+        return self._inner
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes not found on the wrapper itself
+        return getattr(self._inner, name)
+
+    # ------------------------------------------------------------------
+    # Dispatch
+    # ------------------------------------------------------------------
+
+    def dispatch(self, req: Any) -> Any:
+        """Dispatch request, serving reads from cache when possible."""
+        domain = _read_domain(req)
+        if domain is None:
+            if isinstance(req, PASSTHROUGH_TYPES):
+                return self._inner.dispatch(req)
+            # Invalidate even if the mutation failed: a partial write is
+            # cheaper to refetch than to serve stale.
+            try:
+                return self._inner.dispatch(req)
+            finally:
+                self._invalidate_for(req)
+
+        key = request_key(req)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                if key in self._speculative_keys:
+                    self._speculative_keys.discard(key)
+                    self.speculative_hits += 1
+                return copy.deepcopy(entry[2])
+            generation = self._generation
+            # Single-flight: join an identical read already on the wire, unless
+            # it started before the latest invalidation
+            inflight = self._inflight.get(key)
+            if inflight is not None and inflight[0] == generation:
+                self.coalesced += 1
+                leader = inflight[1]
+            else:
+                leader = None
+                future = Future()
+                self._inflight[key] = (generation, future)
+
+        if leader is not None:
+            return copy.deepcopy(leader.result())
+
+        try:
+            response = self._fetch(req, key, domain, generation)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            # Waiters copy from a private snapshot, since the caller may
+            # patch `response` in place while they are still copying
+            future.set_result(copy.deepcopy(response))
+            return response
+        finally:
+            with self._lock:
+                if self._inflight.get(key, (None, None))[1] is future:
+                    del self._inflight[key]
+
+    def _fetch(self, req: Any, key: str, domain: str, generation: int) -> Any:
+        """Cache miss: shared cache, then the API. Stores unless invalidated meanwhile."""
+        entity_id = getattr(req, 'id', None) if isinstance(req, GET_TYPES) else None
+
+        shared = self._shared_fingerprint(req, domain)
+        if shared:
+            response = ReferenceDataCache.get(shared, domain, key)
+            if response is not None:
+                with self._lock:
+                    self.shared_hits += 1
+                    self._entries[key] = (domain, entity_id, copy.deepcopy(response))
+                return response
+
+        response = self._inner.dispatch(req)
+
+        with self._lock:
+            self.misses += 1
+            # AICODE-NOTE: Background/concurrent reads can overlap a mutation.
+            # If anything was invalidated meanwhile, serve but don't store.
+            if generation == self._generation:
+                self._entries[key] = (domain, entity_id, copy.deepcopy(response))
+        if shared:
+            ReferenceDataCache.put(shared, domain, key, response)
+        return response
+
+    def _shared_fingerprint(self, req: Any, domain: str) -> Optional[str]:
+        """Fingerprint to use for a cross-task lookup, or None if not eligible."""
+        if not self.env_fingerprint or not isinstance(req, SHARED_READ_TYPES):
+            return None
+        if domain in self.mutated_domains:
+            return None
+        return self.env_fingerprint
+
+    def record_shared_hit(self) -> None:
+        """Count a ReferenceDataCache hit served outside dispatch()."""
+        with self._lock:
+            self.shared_hits += 1
+
+    def prefetch(self, requests: List[Any], max_workers: int = 8, speculative: bool = False) -> int:
+        """
+        Warm the cache by dispatching read requests concurrently.
+
+        Non-cacheable, already cached and duplicate requests are skipped.
+        Errors are swallowed: they are not cached, so the caller's own
+        sequential dispatch hits the API again and surfaces the error normally.
+
+        AICODE-NOTE: Worker threads share the inner client's HTTP session.
+        urllib3's connection pool is thread-safe; the ERC3 API is stateless
+        (no cookies), so the non-thread-safe parts of requests.Session are unused.
+
+        Args:
+            requests: Request models to fetch
+            max_workers: Upper bound on concurrent API calls
+            speculative: Requests are guesses (SpeculativePrefetcher); count
+                them and track which ones are read later
+
+        Returns:
+            Number of requests fetched successfully
+        """
+        pending = []
+        seen = set()
+        with self._lock:
+            for req in requests:
+                if _read_domain(req) is None:
+                    continue
+                key = request_key(req)
+                if key in self._entries or key in seen:
+                    continue
+                seen.add(key)
+                pending.append(req)
+
+        if not pending:
+            return 0
+
+        def _fetch(idx: int) -> bool:
+            try:
+                self.dispatch(pending[idx])
+                return True
+            except Exception:
+                return False
+
+        outcomes = fan_out(_fetch, range(len(pending)), max_workers=max_workers)
+        fetched = sum(1 for ok in outcomes.values() if ok)
+
+        with self._lock:
+            if speculative:
+                self.speculated += fetched
+                for idx, ok in outcomes.items():
+                    key = request_key(pending[idx])
+                    if ok and key in self._entries:
+                        self._speculative_keys.add(key)
+            else:
+                self.prefetched += fetched
+        return fetched
+
+    def is_cached(self, req: Any) -> bool:
+        """Check whether a read request would be served from the task cache."""
+        key = request_key(req)
+        with self._lock:
+            return key in self._entries
+
+    # AICODE-NOTE: Convenience getters are re-implemented on top of dispatch().
+    # Delegating them to the inner client would bypass the cache, since the
+    # inner client calls its own dispatch(). Signatures accept both positional
+    # and keyword IDs, matching the call variants used across handlers.
+    def get_employee(self, employee_id: str = None, id: str = None) -> Any:
+        return self.dispatch(client.Req_GetEmployee(id=employee_id or id))
+
+    def get_project(self, project_id: str = None, id: str = None) -> Any:
+        return self.dispatch(client.Req_GetProject(id=project_id or id))
+
+    def get_customer(self, customer_id: str = None, id: str = None) -> Any:
+        return self.dispatch(client.Req_GetCustomer(id=customer_id or id))
+
+    # ------------------------------------------------------------------
+    # Invalidation
+    # ------------------------------------------------------------------
+
+    def add_mutation_listener(self, listener: Callable[[Any], None]) -> None:
+        """
+        Register a callback invoked with every mutation request after the
+        cache dropped the affected entries (e.g. OrgSnapshot.on_mutation).
+        """
+        self._mutation_listeners.append(listener)
+
+    def _invalidate_for(self, req: Any) -> None:
+        """Drop cache entries affected by a mutation request and notify listeners."""
+        self._drop_for(req)
+        for listener in list(self._mutation_listeners):
+            try:
+                listener(req)
+            except Exception as e:
+                print(f"  {CLI_YELLOW}[api-cache] Mutation listener failed: {e}{CLI_CLR}")
+
+    def _drop_for(self, req: Any) -> None:
+        for mut_type, (domains, id_attr) in MUTATION_DOMAINS.items():
+            if isinstance(req, mut_type):
+                entity_id = getattr(req, id_attr, None) if id_attr else None
+                for domain in domains:
+                    self.invalidate(domain, entity_id)
+                    self._mark_mutated(domain)
+                return
+
+        # Unknown request type - be conservative
+        print(f"  {CLI_YELLOW}[api-cache] Unknown request {type(req).__name__}, clearing cache{CLI_CLR}")
+        self.clear()
+        for domain in set(READ_DOMAINS.values()):
+            self._mark_mutated(domain)
+
+    def _mark_mutated(self, domain: str) -> None:
+        """
+        Exclude a domain from cross-task sharing for the rest of the task.
+
+        Also drops the domain from the process-wide cache, in case several
+        tasks share one backend environment.
+        """
+        with self._lock:
+            self.mutated_domains.add(domain)
+        if self.env_fingerprint:
+            ReferenceDataCache.invalidate(self.env_fingerprint, domain)
+
+    def invalidate(self, domain: str, entity_id: Optional[str] = None) -> int:
+        """
+        Invalidate entries of a domain.
+
+        Args:
+            domain: 'employee', 'project', 'customer' or 'time'
+            entity_id: If given, only the GET entry for this ID is dropped
+                       (search/list entries of the domain are always dropped)
+
+        Returns:
+            Number of dropped entries
+        """
+        with self._lock:
+            stale = [
+                key for key, (d, eid, _) in self._entries.items()
+                if d == domain and (eid is None or entity_id is None or eid == entity_id)
+            ]
+            for key in stale:
+                del self._entries[key]
+                self._speculative_keys.discard(key)
+            self.invalidations += len(stale)
+            self._generation += 1
+            return len(stale)
+
+    def clear(self) -> None:
+        """Drop all cache entries."""
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._speculative_keys.clear()
+            self._generation += 1
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return hit/miss counters."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'prefetched': self.prefetched,
+                'shared_hits': self.shared_hits,
+                'speculated': self.speculated,
+                'speculative_hits': self.speculative_hits,
+                'coalesced': self.coalesced,
+                'entries': len(self._entries),
+            }
+
+    def summary(self) -> str:
+        """One-line human-readable summary of cache effectiveness."""
+        s = self.get_stats()
+        total = s['hits'] + s['misses']
+        rate = (s['hits'] / total) if total else 0.0
+        return (f"hits={s['hits']} misses={s['misses']} hit_rate={rate:.0%} "
+                f"shared_hits={s['shared_hits']} prefetched={s['prefetched']} "
+                f"speculated={s['speculated']} speculative_hits={s['speculative_hits']} "
+                f"coalesced={s['coalesced']} "
+                f"invalidated={s['invalidations']} "
+                f"entries={s['entries']}")
@@ -0,0 +1,79 @@
+"""
+Bounded concurrent fan-out for independent API calls.
+
+Used to replace N+1 loops (one GET per search hit, one project search per
+employee) with a single concurrent batch.
+"""
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, TypeVar
+
+import config
+
+
+K = TypeVar('K', bound=Hashable)
+R = TypeVar('R')
+
+
+def bind_thread_output(fn: Callable[..., R]) -> Callable[..., R]:
+    """
+    Wrap fn so that worker threads print into the caller's output capture.
+
+    AICODE-NOTE: In parallel mode sys.stdout is a ThreadLocalStdout that routes
+    print() by thread. Pool threads have no capture registered, so without this
+    their warnings would leak to the console instead of the task log file.
+    """
+    out, err = sys.stdout, sys.stderr
+    out_capture = out.get_capture() if hasattr(out, 'get_capture') else None
+    err_capture = err.get_capture() if hasattr(err, 'get_capture') else None
+    if out_capture is None and err_capture is None:
+        return fn
+
+    def _bound(*args: Any, **kwargs: Any) -> R:
+        if out_capture is not None:
+            out.register(out_capture)
+        if err_capture is not None:
+            err.register(err_capture)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            if out_capture is not None:
+                out.unregister()
+            if err_capture is not None:
+                err.unregister()
+
+    return _bound
+
+
+def fan_out(
+    fn: Callable[[K], R],
+    keys: Iterable[K],
+    max_workers: Optional[int] = None,
+) -> Dict[K, R]:
+    """
+    Call fn for every key concurrently and collect results.
+
+    Duplicate keys are called once. Result dict preserves first-seen key order.
+    Exceptions raised by fn propagate to the caller, so fn should handle
+    per-key failures itself when partial results are acceptable.
+
+    Args:
+        fn: Function taking one key (e.g. an entity ID)
+        keys: Keys to process
+        max_workers: Concurrency width (default: config.API_FANOUT_WORKERS)
+
+    Returns:
+        Dict mapping key -> fn(key)
+    """
+    unique_keys = list(dict.fromkeys(keys))
+    if not unique_keys:
+        return {}
+
+    width = max_workers if max_workers is not None else config.API_FANOUT_WORKERS
+    width = max(1, min(width, len(unique_keys)))
+    if width == 1:
+        return {key: fn(key) for key in unique_keys}
+
+    bound_fn = bind_thread_output(fn)
+    with ThreadPoolExecutor(max_workers=width, thread_name_prefix="ApiFanOut") as pool:
+        return dict(zip(unique_keys, pool.map(bound_fn, unique_keys)))
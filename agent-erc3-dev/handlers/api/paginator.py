@@ -0,0 +1,171 @@
+"""
+Bulk paginator for the ERC3 list/search endpoints.
+
+The server caps page size at 5, so listing 100 projects is 20 requests.
+Issued one after another that is 20 round-trips. paginate() fetches the
+first page, then speculatively requests the following offsets in parallel
+windows that start small and double while pages keep coming back full, so
+long listings take a few round-trips and short ones waste almost nothing.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional
+
+from erc3 import ApiException
+
+import config
+
+from ..execution.pagination import handle_pagination_error
+from .fanout import fan_out
+
+
+@dataclass
+class PageFetch:
+    """Result of paginate()."""
+    items: List[Any] = field(default_factory=list)
+    pages: int = 0
+    # True when a page reported next_offset <= 0 (or came back empty)
+    complete: bool = False
+    # Set when a page failed; items then hold everything fetched before it
+    error: Optional[Exception] = None
+    # Page size actually used (may be lowered by "page limit exceeded")
+    limit: int = 5
+
+
+def _dispatch_page(api: Any, req: Any) -> Any:
+    """
+    Dispatch one page, recovering from "page limit exceeded".
+
+    Returns:
+        Response, or None if the API forbids pagination altogether
+
+    Raises:
+        ApiException: Any other API error
+    """
+    try:
+        return api.dispatch(req)
+    except ApiException as e:
+        handled, result = handle_pagination_error(e, req, api)
+        if not handled:
+            raise
+        return result
+
+
+def paginate(
+    api: Any,
+    make_request: Callable[[int, int], Any],
+    items_attr: str,
+    limit: int = 5,
+    start_offset: int = 0,
+    max_pages: Optional[int] = None,
+    window: Optional[int] = None,
+    stop: Optional[Callable[[List[Any]], bool]] = None,
+) -> PageFetch:
+    """
+    Fetch all pages of a list/search endpoint.
+
+    The first page is fetched alone (it fixes the effective page size and
+    tells whether there is more). Then windows of offsets next, next+limit,
+    next+2*limit, ... are fetched concurrently and consumed in order. The
+    first window is config.PAGINATION_WINDOW_START pages and doubles (up to
+    the maximum) after every round whose pages all came back full. If the
+    server's next_offset disagrees with the expected offset, the rest of the
+    window is discarded and fetching resumes from the server's offset.
+    With a stop predicate, pages are fetched one per round so stop is
+    checked before every request.
+
+    Args:
+        api: ERC3 client
+        make_request: Builds a request model for (offset, limit)
+        items_attr: Response attribute holding the page items
+            ('projects', 'employees', 'companies', ...)
+        limit: Page size to ask for
+        start_offset: Offset of the first page
+        max_pages: Upper bound on pages fetched (None = until the end)
+        window: Maximum pages fetched per concurrent round
+            (default config.PAGINATION_WINDOW)
+        stop: Optional predicate on the items collected so far; pagination
+            stops early once it returns True (disables speculative windows)
+
+    Returns:
+        PageFetch with items in server order
+
+    AICODE-NOTE: Speculative pages past the end are wasted reads, never wrong
+    data: consumption stops at the first page with next_offset <= 0. Errors
+    on speculative pages are retried sequentially before being reported.
+    """
+    max_width = max(1, window or config.PAGINATION_WINDOW)
+    width = 1 if stop is not None else min(max_width, max(1, config.PAGINATION_WINDOW_START))
+    result = PageFetch(limit=limit)
+
+    first_req = make_request(start_offset, limit)
+    try:
+        resp = _dispatch_page(api, first_req)
+    except Exception as e:
+        result.error = e
+        return result
+    if resp is None:
+        # API forbids pagination - no data available
+        return result
+    result.limit = getattr(first_req, 'limit', limit) or limit
+
+    offset = _consume(result, resp, items_attr, start_offset, stop)
+    while offset is not None:
+        if max_pages is not None and result.pages >= max_pages:
+            break
+        n = width if max_pages is None else min(width, max_pages - result.pages)
+        offsets = [offset + i * result.limit for i in range(n)]
+
+        def _fetch(off: int) -> Any:
+            try:
+                return _dispatch_page(api, make_request(off, result.limit))
+            except Exception as e:
+                return e
+
+        responses = fan_out(_fetch, offsets, max_workers=n)
+
+        next_offset = None
+        all_full = True
+        for off in offsets:
+            resp = responses[off]
+            if isinstance(resp, Exception):
+                try:
+                    resp = _dispatch_page(api, make_request(off, result.limit))
+                except Exception as e:
+                    result.error = e
+                    return result
+            if resp is None:
+                return result
+            before = len(result.items)
+            next_offset = _consume(result, resp, items_attr, off, stop)
+            if len(result.items) - before < result.limit:
+                all_full = False
+            if next_offset is None:
+                break
+            if next_offset != off + result.limit:
+                # Server paginates differently than predicted - resync
+                all_full = False
+                break
+        offset = next_offset
+        if all_full and stop is None:
+            width = min(max_width, width * 2)
+
+    return result
+
+
+def _consume(result: PageFetch, resp: Any, items_attr: str, offset: int,
+             stop: Optional[Callable[[List[Any]], bool]]) -> Optional[int]:
+    """Append one page; return the next offset to fetch, or None when done."""
+    page_items = getattr(resp, items_attr, None) or []
+    result.items.extend(page_items)
+    result.pages += 1
+
+    next_offset = getattr(resp, 'next_offset', -1)
+    if not page_items or next_offset is None or next_offset <= 0:
+        result.complete = True
+        return None
+    if next_offset <= offset:
+        # Server went backwards - treat as the end rather than loop forever
+        return None
+    if stop is not None and stop(result.items):
+        return None
+    return next_offset
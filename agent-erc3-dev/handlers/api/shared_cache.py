@@ -0,0 +1,139 @@
+"""
+Process-wide cache for immutable reference data across tasks.
+
+In parallel runs most tasks talk to the same simulated company: same wiki
+sha1, same employees, projects and customers. Reference data derived from
+it (customer directory, department list, skill/will catalogues) is then
+identical across tasks and only needs to be fetched once per process.
+
+Entries are keyed by an environment fingerprint (wiki sha1 + hash of the
+first page of each list endpoint), so tasks running against a different
+company never see each other's data.
+"""
+import copy
+import hashlib
+import json
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from erc3.erc3 import client
+
+from .fanout import fan_out
+
+
+# First pages hashed into the fingerprint
+FINGERPRINT_REQUESTS = {
+    'employees': lambda: client.Req_ListEmployees(offset=0, limit=5),
+    'projects': lambda: client.Req_ListProjects(offset=0, limit=5),
+    'customers': lambda: client.Req_ListCustomers(offset=0, limit=5),
+}
+
+
+class ReferenceDataCache:
+    """
+    Thread-safe process-wide store: (fingerprint, domain, key) -> value.
+
+    Uses class-level storage like WikiVersionStore._pages_cache, so every
+    task's CachingErcClient in the process shares it.
+
+    - Values are deep-copied on store and on read.
+    - invalidate(fingerprint, domain) drops a domain after any task mutates
+      it, in case tasks share one backend environment.
+    """
+    _entries: Dict[Tuple[str, str, str], Any] = {}
+    _cache_lock = threading.Lock()
+    hits = 0
+    misses = 0
+
+    @classmethod
+    def clear_cache(cls):
+        """Clear all entries. Use between test runs to ensure fresh data."""
+        with cls._cache_lock:
+            cls._entries.clear()
+            cls.hits = 0
+            cls.misses = 0
+
+    @classmethod
+    def get(cls, fingerprint: str, domain: str, key: str) -> Optional[Any]:
+        """Return a copy of the cached value, or None."""
+        with cls._cache_lock:
+            value = cls._entries.get((fingerprint, domain, key))
+            if value is None:
+                cls.misses += 1
+                return None
+            cls.hits += 1
+        return copy.deepcopy(value)
+
+    @classmethod
+    def put(cls, fingerprint: str, domain: str, key: str, value: Any) -> None:
+        stored = copy.deepcopy(value)
+        with cls._cache_lock:
+            cls._entries[(fingerprint, domain, key)] = stored
+
+    @classmethod
+    def invalidate(cls, fingerprint: str, domain: str) -> None:
+        with cls._cache_lock:
+            for entry_key in [k for k in cls._entries if k[0] == fingerprint and k[1] == domain]:
+                del cls._entries[entry_key]
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, int]:
+        with cls._cache_lock:
+            return {'hits': cls.hits, 'misses': cls.misses, 'entries': len(cls._entries)}
+
+
+def compute_env_fingerprint(api: Any, wiki_sha1: str) -> Optional[str]:
+    """
+    Fingerprint the simulated company behind a task's client.
+
+    Hashes the wiki sha1 plus the first page of employees, projects and
+    customers (fetched concurrently; they land in the task cache, so the
+    agent's own first list calls are free afterwards).
+
+    Returns:
+        Hex digest, or None if any list call fails (e.g. guest user)
+    """
+    if not wiki_sha1:
+        return None
+
+    def _first_page(name: str) -> Any:
+        resp = api.dispatch(FINGERPRINT_REQUESTS[name]())
+        return resp.model_dump(mode='json') if hasattr(resp, 'model_dump') else str(resp)
+
+    try:
+        pages = fan_out(_first_page, list(FINGERPRINT_REQUESTS))
+    except Exception:
+        return None
+
+    digest = hashlib.sha1(wiki_sha1.encode('utf-8'))
+    digest.update(json.dumps(pages, sort_keys=True, default=str).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def cached_reference(api: Any, domain: str, key: str, compute: Callable[[], Any]) -> Any:
+    """
+    Serve a derived reference value from the process-wide cache.
+
+    Falls back to compute() when the client has no fingerprint or the task
+    already mutated the domain. Empty results are not stored, because the
+    callers return [] on API errors.
+
+    Args:
+        api: Task client (CachingErcClient; anything else just computes)
+        domain: 'employee', 'project' or 'customer'
+        key: Name of the reference value (e.g. 'departments')
+        compute: Produces the value from the API
+    """
+    fingerprint = getattr(api, 'env_fingerprint', None)
+    if not fingerprint or domain in getattr(api, 'mutated_domains', ()):
+        return compute()
+
+    value = ReferenceDataCache.get(fingerprint, domain, key)
+    if value is not None:
+        api.record_shared_hit()
+        return value
+
+    value = compute()
+    if value and domain not in api.mutated_domains:
+        ReferenceDataCache.put(fingerprint, domain, key, value)
+    return value
@@ -0,0 +1,380 @@
+"""
+Whole-company snapshot ("org graph") for one task.
+
+Right after who_am_i the agent knows it is talking to an authenticated
+company user. At that point every employee, project and customer can be
+listed once and indexed in memory, so enrichers and guards answer
+"who leads what", "who has skill X", "which departments exist" with dict
+lookups instead of dozens of sequential paginated API calls.
+
+The snapshot is an accelerator, never a source of truth the agent could
+not have seen itself: it is built only through the same (cached) client
+the agent uses, and consumers fall back to the API when it is absent.
+"""
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from erc3.erc3 import client
+
+from utils import CLI_YELLOW, CLI_CLR
+
+from .fanout import fan_out
+from .paginator import paginate
+
+
+# List request -> attribute holding the page items
+LIST_SOURCES = {
+    'employees': (client.Req_ListEmployees, 'employees'),
+    'projects': (client.Req_ListProjects, 'projects'),
+    'customers': (client.Req_ListCustomers, 'companies'),
+}
+
+
+class OrgSnapshot:
+    """
+    Indexed in-memory copy of employees, projects and customers.
+
+    Indexes:
+    - employees by ID, department, location, skill and will (name -> {id: level})
+    - projects by ID, by team member and by lead
+    - customers by ID and location
+
+    Mutations do not rebuild the snapshot. CachingErcClient notifies
+    on_mutation(), which marks the touched employee/project dirty; it is
+    refetched (through the cache, which already dropped the stale entry)
+    on the next lookup. Unknown mutations mark the whole snapshot stale
+    and consumers fall back to the API.
+
+    Returned objects are shared with the index - treat them as read-only.
+
+    AICODE-NOTE: Thread-safe. Lookups may come from fan-out worker threads.
+    """
+
+    def __init__(self, api: Any):
+        self._api = api
+        self._lock = threading.RLock()
+        self.stale = False
+        # False if some employee/project detail (skills, team) could not be fetched
+        self.complete = True
+        self.build_seconds = 0.0
+
+        self._employees: Dict[str, Any] = {}
+        self._projects: Dict[str, Any] = {}
+        self._customers: Dict[str, Any] = {}
+
+        self._by_department: Dict[str, List[str]] = {}
+        self._by_location: Dict[str, List[str]] = {}
+        self._skills: Dict[str, Dict[str, int]] = {}
+        self._wills: Dict[str, Dict[str, int]] = {}
+        self._projects_by_member: Dict[str, Set[str]] = {}
+        self._projects_by_lead: Dict[str, Set[str]] = {}
+        self._customers_by_location: Dict[str, List[str]] = {}
+
+        self._dirty_employees: Set[str] = set()
+        self._dirty_projects: Set[str] = set()
+
+    # ------------------------------------------------------------------
+    # Build
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def build(cls, api: Any, max_workers: Optional[int] = None) -> 'OrgSnapshot':
+        """
+        List everything and fetch employee/project details concurrently.
+
+        Args:
+            api: ERC3 client (ideally the task's CachingErcClient, so the
+                 fetched details also warm the read cache)
+            max_workers: Fan-out width (default: config.API_FANOUT_WORKERS)
+
+        Returns:
+            Populated snapshot
+
+        Raises:
+            ApiException: If one of the list endpoints fails
+        """
+        started = time.time()
+        snapshot = cls(api)
+
+        lists = fan_out(snapshot._list_all, list(LIST_SOURCES), max_workers=max_workers)
+
+        emp_ids = [e.id for e in lists['employees'] if getattr(e, 'id', None)]
+        proj_ids = [p.id for p in lists['projects'] if getattr(p, 'id', None)]
+
+        # Brief records first, so a failed detail fetch still leaves something usable
+        snapshot._employees = {e.id: e for e in lists['employees'] if getattr(e, 'id', None)}
+        snapshot._projects = {p.id: p for p in lists['projects'] if getattr(p, 'id', None)}
+        snapshot._customers = {c.id: c for c in lists['customers'] if getattr(c, 'id', None)}
+
+        employees = fan_out(snapshot._fetch_employee, emp_ids, max_workers=max_workers)
+        projects = fan_out(snapshot._fetch_project, proj_ids, max_workers=max_workers)
+        for emp_id, emp in employees.items():
+            if emp is not None:
+                snapshot._employees[emp_id] = emp
+            else:
+                snapshot.complete = False
+        for proj_id, proj in projects.items():
+            if proj is not None:
+                snapshot._projects[proj_id] = proj
+            else:
+                snapshot.complete = False
+
+        with snapshot._lock:
+            snapshot._reindex()
+        snapshot.build_seconds = time.time() - started
+        return snapshot
+
+    def _list_all(self, kind: str) -> List[Any]:
+        """Paginate one Req_List* endpoint to the end."""
+        req_cls, attr = LIST_SOURCES[kind]
+        fetched = paginate(self._api, lambda offset, limit: req_cls(offset=offset, limit=limit), attr)
+        if fetched.error is not None:
+            raise fetched.error
+        return fetched.items
+
+    def _fetch_employee(self, emp_id: str) -> Optional[Any]:
+        try:
+            return getattr(self._api.dispatch(client.Req_GetEmployee(id=emp_id)), 'employee', None)
+        except Exception:
+            return None
+
+    def _fetch_project(self, proj_id: str) -> Optional[Any]:
+        try:
+            return getattr(self._api.dispatch(client.Req_GetProject(id=proj_id)), 'project', None)
+        except Exception:
+            return None
+
+    # ------------------------------------------------------------------
+    # Indexing
+    # ------------------------------------------------------------------
+
+    def _reindex(self) -> None:
+        """Rebuild derived indexes from the entity maps. Caller holds the lock."""
+        self._by_department = {}
+        self._by_location = {}
+        self._skills = {}
+        self._wills = {}
+        for emp_id, emp in self._employees.items():
+            dept = getattr(emp, 'department', None)
+            if dept:
+                self._by_department.setdefault(dept, []).append(emp_id)
+            loc = getattr(emp, 'location', None)
+            if loc:
+                self._by_location.setdefault(loc.lower(), []).append(emp_id)
+            for attr, index in (('skills', self._skills), ('wills', self._wills)):
+                for item in getattr(emp, attr, None) or []:
+                    name = getattr(item, 'name', None)
+                    if name:
+                        index.setdefault(name, {})[emp_id] = getattr(item, 'level', 0) or 0
+
+        self._projects_by_member = {}
+        self._projects_by_lead = {}
+        for proj_id, proj in self._projects.items():
+            for member in getattr(proj, 'team', None) or []:
+                member_id = getattr(member, 'employee', None)
+                if not member_id:
+                    continue
+                self._projects_by_member.setdefault(member_id, set()).add(proj_id)
+                if getattr(member, 'role', '') == 'Lead':
+                    self._projects_by_lead.setdefault(member_id, set()).add(proj_id)
+
+        self._customers_by_location = {}
+        for cust_id, cust in self._customers.items():
+            loc = getattr(cust, 'location', None)
+            if loc:
+                self._customers_by_location.setdefault(loc.lower(), []).append(cust_id)
+
+    def _refresh_dirty(self) -> None:
+        """Refetch entities touched by mutations since the last lookup."""
+        with self._lock:
+            if not self._dirty_employees and not self._dirty_projects:
+                return
+            emp_ids = list(self._dirty_employees)
+            proj_ids = list(self._dirty_projects)
+            self._dirty_employees.clear()
+            self._dirty_projects.clear()
+
+        employees = fan_out(self._fetch_employee, emp_ids) if emp_ids else {}
+        projects = fan_out(self._fetch_project, proj_ids) if proj_ids else {}
+
+        with self._lock:
+            # A failed refetch leaves a possibly outdated record behind
+            for emp_id, emp in employees.items():
+                if emp is not None:
+                    self._employees[emp_id] = emp
+                else:
+                    self.stale = True
+            for proj_id, proj in projects.items():
+                if proj is not None:
+                    self._projects[proj_id] = proj
+                else:
+                    self.stale = True
+            self._reindex()
+
+    def on_mutation(self, req: Any) -> None:
+        """Mark entities touched by a mutation request as dirty."""
+        with self._lock:
+            if isinstance(req, client.Req_UpdateEmployeeInfo):
+                if getattr(req, 'employee', None):
+                    self._dirty_employees.add(req.employee)
+            elif isinstance(req, (client.Req_UpdateProjectTeam, client.Req_UpdateProjectStatus)):
+                if getattr(req, 'id', None):
+                    self._dirty_projects.add(req.id)
+            elif isinstance(req, (client.Req_LogTimeEntry, client.Req_UpdateTimeEntry)):
+                pass  # Time entries are not part of the snapshot
+            else:
+                print(f"  {CLI_YELLOW}[org-snapshot] Unknown mutation {type(req).__name__}, "
+                      f"marking snapshot stale{CLI_CLR}")
+                self.stale = True
+
+    # ------------------------------------------------------------------
+    # Employees
+    # ------------------------------------------------------------------
+
+    def employee(self, emp_id: str) -> Optional[Any]:
+        """Employee record (EmployeeView when the detail fetch succeeded)."""
+        self._refresh_dirty()
+        with self._lock:
+            return self._employees.get(emp_id)
+
+    def employees(self) -> List[Any]:
+        self._refresh_dirty()
+        with self._lock:
+            return list(self._employees.values())
+
+    def employees_in_department(self, department: str) -> List[Any]:
+        self._refresh_dirty()
+        with self._lock:
+            return [self._employees[i] for i in self._by_department.get(department, [])]
+
+    def employees_in_location(self, location: str) -> List[Any]:
+        self._refresh_dirty()
+        with self._lock:
+            return [self._employees[i] for i in self._by_location.get((location or '').lower(), [])]
+
+    def employees_with_skill(self, name: str, min_level: int = 1) -> List[Tuple[str, int]]:
+        """(employee_id, level) pairs for a skill, highest level first."""
+        return self._with_level(self._skills, name, min_level)
+
+    def employees_with_will(self, name: str, min_level: int = 1) -> List[Tuple[str, int]]:
+        """(employee_id, level) pairs for a will, highest level first."""
+        return self._with_level(self._wills, name, min_level)
+
+    def _with_level(self, index: Dict[str, Dict[str, int]], name: str,
+                    min_level: int) -> List[Tuple[str, int]]:
+        self._refresh_dirty()
+        with self._lock:
+            pairs = [(i, lvl) for i, lvl in index.get(name, {}).items() if lvl >= min_level]
+        return sorted(pairs, key=lambda p: (-p[1], p[0]))
+
+    def departments(self) -> List[str]:
+        self._refresh_dirty()
+        with self._lock:
+            return sorted(self._by_department)
+
+    def locations(self) -> List[str]:
+        """Distinct employee locations, original casing."""
+        self._refresh_dirty()
+        with self._lock:
+            return sorted({e.location for e in self._employees.values()
+                           if getattr(e, 'location', None)})
+
+    def skill_names(self) -> List[str]:
+        self._refresh_dirty()
+        with self._lock:
+            return sorted(self._skills)
+
+    def will_names(self) -> List[str]:
+        self._refresh_dirty()
+        with self._lock:
+            return sorted(self._wills)
+
+    # ------------------------------------------------------------------
+    # Projects
+    # ------------------------------------------------------------------
+
+    def project(self, proj_id: str) -> Optional[Any]:
+        """Project record (ProjectDetail when the detail fetch succeeded)."""
+        self._refresh_dirty()
+        with self._lock:
+            return self._projects.get(proj_id)
+
+    def projects(self) -> List[Any]:
+        self._refresh_dirty()
+        with self._lock:
+            return list(self._projects.values())
+
+    def project_team(self, proj_id: str) -> Optional[List[Any]]:
+        """Team (list of Workload) or None if the project detail is unknown."""
+        proj = self.project(proj_id)
+        if proj is None or not hasattr(proj, 'team'):
+            return None
+        return list(proj.team or [])
+
+    def projects_for_member(self, emp_id: str, include_archived: bool = True) -> List[Any]:
+        self._refresh_dirty()
+        with self._lock:
+            projects = [self._projects[p] for p in sorted(self._projects_by_member.get(emp_id, ()))]
+        if not include_archived:
+            projects = [p for p in projects if getattr(p, 'status', '') != 'archived']
+        return projects
+
+    def projects_led_by(self, emp_id: str) -> List[Any]:
+        self._refresh_dirty()
+        with self._lock:
+            return [self._projects[p] for p in sorted(self._projects_by_lead.get(emp_id, ()))]
+
+    def project_lead_ids(self) -> List[str]:
+        """Employees that lead at least one project (any status)."""
+        self._refresh_dirty()
+        with self._lock:
+            return sorted(self._projects_by_lead)
+
+    # ------------------------------------------------------------------
+    # Customers
+    # ------------------------------------------------------------------
+
+    def customer(self, cust_id: str) -> Optional[Any]:
+        with self._lock:
+            return self._customers.get(cust_id)
+
+    def customers(self) -> List[Any]:
+        with self._lock:
+            return list(self._customers.values())
+
+    def customers_in_location(self, location: str) -> List[Any]:
+        with self._lock:
+            return [self._customers[i] for i in self._customers_by_location.get((location or '').lower(), [])]
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def summary(self) -> str:
+        """One-line description of snapshot size."""
+        with self._lock:
+            return (f"employees={len(self._employees)} projects={len(self._projects)} "
+                    f"customers={len(self._customers)} departments={len(self._by_department)} "
+                    f"skills={len(self._skills)} complete={self.complete} "
+                    f"built_in={self.build_seconds:.1f}s")
+
+
+def get_org_snapshot(ctx: Any, require_complete: bool = False) -> Optional[OrgSnapshot]:
+    """
+    Return the task's snapshot from a ToolContext, or None if unavailable.
+
+    Stale snapshots (after an unknown or failed mutation refresh) are treated
+    as unavailable. Callers that enumerate the whole company (all leads, all
+    skills) pass require_complete=True so a partial build never yields a
+    partial answer.
+    """
+    shared = getattr(ctx, 'shared', None)
+    if shared is None:
+        return None
+    snapshot = shared.get('_org_snapshot')
+    if snapshot is None or getattr(snapshot, 'stale', False):
+        return None
+    if require_complete and not getattr(snapshot, 'complete', False):
+        return None
+    return snapshot
@@ -0,0 +1,113 @@
+"""
+Speculative prefetch of likely follow-up reads.
+
+Between two turns the API side idles while the LLM thinks (tens of
+seconds). The agent's next move after a search is very predictable:
+projects_search -> projects_get for the hits, employees_search ->
+employees_get, customers_search -> customers_get. SpeculativePrefetcher
+watches each action's API result and, once the turn is over, warms the
+task cache with those GETs on a background thread.
+"""
+import threading
+from typing import Any, List
+
+from erc3.erc3 import client
+
+import config
+
+from .cache import is_cacheable_read
+from .fanout import bind_thread_output
+
+
+# Search request -> (response attribute with hits, GET request for one hit)
+FOLLOW_UPS = (
+    (client.Req_SearchProjects, 'projects', client.Req_GetProject),
+    (client.Req_SearchEmployees, 'employees', client.Req_GetEmployee),
+    (client.Req_SearchCustomers, 'companies', client.Req_GetCustomer),
+)
+
+
+class SpeculativePrefetcher:
+    """
+    Predicts follow-up GETs from a turn's search results and prefetches them.
+
+    - Only GET requests built from IDs the API itself returned; never
+      mutations (every prediction must pass is_cacheable_read)
+    - Per-task budget (config.SPECULATIVE_PREFETCH_BUDGET) and per-turn cap
+      (config.SPECULATIVE_PREFETCH_PER_TURN)
+    - Hit rate is tracked by the client: speculated / speculative_hits
+
+    AICODE-NOTE: A prefetch still in flight when the agent mutates is safe:
+    CachingErcClient does not store reads that overlap an invalidation.
+    """
+
+    def __init__(self, api: Any, budget: int = None, per_turn: int = None):
+        self._api = api
+        self._budget = config.SPECULATIVE_PREFETCH_BUDGET if budget is None else budget
+        self._per_turn = config.SPECULATIVE_PREFETCH_PER_TURN if per_turn is None else per_turn
+        self._predicted: List[Any] = []
+        # (GET type, entity ID) already handed to a background round
+        self._seen = set()
+        self._thread = None
+        self.issued = 0
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self._budget - self.issued)
+
+    def observe(self, req: Any, response: Any) -> None:
+        """Record follow-up GETs predicted from one action's API result."""
+        pending = {(type(r), r.id) for r in self._predicted}
+        for search_type, attr, get_type in FOLLOW_UPS:
+            if not isinstance(req, search_type):
+                continue
+            for item in getattr(response, attr, None) or []:
+                entity_id = getattr(item, 'id', None)
+                key = (get_type, entity_id)
+                if not entity_id or key in self._seen or key in pending:
+                    continue
+                follow_up = get_type(id=entity_id)
+                if not is_cacheable_read(follow_up):
+                    continue
+                pending.add(key)
+                self._predicted.append(follow_up)
+            return
+
+    def launch(self) -> int:
+        """
+        Start prefetching this turn's predictions in the background.
+
+        Only requests actually handed off are remembered as seen; predictions
+        dropped here (previous round still running, per-turn cap, budget) can
+        be predicted again from a later search.
+
+        Returns:
+            Number of requests handed to the background thread
+        """
+        predicted, self._predicted = self._predicted, []
+        if self._thread is not None and self._thread.is_alive():
+            return 0  # Previous round still running - skip rather than pile up
+
+        requests = [r for r in predicted if not self._api.is_cached(r)]
+        requests = requests[:min(self._per_turn, self.remaining)]
+        if not requests:
+            return 0
+        self.issued += len(requests)
+        self._seen.update((type(r), r.id) for r in requests)
+
+        def _run() -> None:
+            try:
+                self._api.prefetch(requests, max_workers=config.PARALLEL_READ_WORKERS, speculative=True)
+            except Exception:
+                pass  # Speculation is best-effort
+
+        self._thread = threading.Thread(
+            target=bind_thread_output(_run), name="SpeculativePrefetch", daemon=True
+        )
+        self._thread.start()
+        return len(requests)
+
+    def join(self, timeout: float = None) -> None:
+        """Wait for the background round to finish (used before final stats)."""
+        if self._thread is not None:
+            self._thread.join(timeout)
@@ -8,6 +8,8 @@ from typing import Any, Dict, List, Optional, Set, Tuple, TYPE_CHECKING
 
 from utils import CLI_YELLOW, CLI_CLR
 
+from ..api import get_org_snapshot, paginate
+
 if TYPE_CHECKING:
     from ..base import ToolContext
 
@@ -341,35 +343,34 @@ class ProjectOverlapAnalyzer:
         if not employee_id:
             return []
 
+        # Snapshot results are not copied into _project_cache: the snapshot
+        # tracks mutations itself, the local cache does not.
+        snapshot = get_org_snapshot(ctx, require_complete=True)
+        if snapshot is not None:
+            return snapshot.projects_for_member(employee_id)
+
         if employee_id in self._project_cache:
             return self._project_cache[employee_id]
 
         # Import here to avoid circular imports
         from erc3.erc3 import client, dtos
 
-        projects: List[Any] = []
-        limit = 5  # server hard-limit
-        max_pages = 4  # up to 20 projects
-
-        for page in range(max_pages):
-            offset = page * limit
-            try:
-                req = client.Req_SearchProjects(
-                    limit=limit,
-                    offset=offset,
-                    include_archived=True,
-                    team=dtos.ProjectTeamFilter(employee_id=employee_id)
-                )
-                resp = ctx.api.dispatch(req)
-            except Exception as e:
-                print(f"  {CLI_YELLOW}⚠️ Overlap helper: failed to fetch projects for {employee_id} (page {page}): {e}{CLI_CLR}")
-                break
-
-            page_projects = getattr(resp, "projects", None) or []
-            if page_projects:
-                projects.extend(page_projects)
-            if len(page_projects) < limit:
-                break
+        # Up to 4 pages of 5 (server hard-limit) = 20 projects
+        fetched = paginate(
+            ctx.api,
+            lambda offset, limit: client.Req_SearchProjects(
+                limit=limit,
+                offset=offset,
+                include_archived=True,
+                team=dtos.ProjectTeamFilter(employee_id=employee_id)
+            ),
+            'projects',
+            max_pages=4,
+        )
+        if fetched.error is not None:
+            print(f"  {CLI_YELLOW}⚠️ Overlap helper: failed to fetch projects for {employee_id} "
+                  f"(page {fetched.pages}): {fetched.error}{CLI_CLR}")
+        projects = fetched.items
 
         self._project_cache[employee_id] = projects
         return projects
@@ -379,6 +380,12 @@ class ProjectOverlapAnalyzer:
         if not project_id:
             return None
 
+        snapshot = get_org_snapshot(ctx)
+        if snapshot is not None:
+            project = snapshot.project(project_id)
+            if project is not None and hasattr(project, 'team'):
+                return project
+
         if project_id in self._project_detail_cache:
             return self._project_detail_cache[project_id]
 
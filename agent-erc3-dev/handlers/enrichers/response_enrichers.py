@@ -8,6 +8,8 @@ from erc3.erc3 import client
 
 from utils import CLI_YELLOW, CLI_CLR
 
+from ..api import get_org_snapshot, paginate
+
 
 class RoleEnricher:
     """
@@ -3018,57 +3020,69 @@ class LeadSalaryComparisonHintEnricher:
             return None
 
         try:
-            # Step 1: Get ALL projects (not just active - project lead = lead of ANY project)
-            # AICODE-NOTE: t016 FIX - Benchmark defines "project lead" as lead of any project,
-            # regardless of status (active, exploring, archived, etc.)
-            all_projects = []
-            offset = 0
-            while True:
-                response = api.dispatch(client.Req_ListProjects(
-                    offset=offset,
-                    limit=5  # Required parameter
-                ))
-                projects = getattr(response, 'projects', []) or []
-                all_projects.extend(projects)
-                next_offset = getattr(response, 'next_offset', -1)
-                if next_offset <= 0:
-                    break
-                offset = next_offset
-
-            print(f"  [t016 enricher] Found {len(all_projects)} total projects")
-
-            # Step 2: Get team details for each project and collect leads
-            lead_ids = set()
-            for proj in all_projects:
-                proj_id = getattr(proj, 'id', '')
-                if not proj_id:
-                    continue
-                proj_details = api.dispatch(client.Req_GetProject(id=proj_id))
-                project = getattr(proj_details, 'project', None)
-                if not project:
-                    continue
-                team = getattr(project, 'team', []) or []
-                for member in team:
-                    if getattr(member, 'role', '') == 'Lead':
-                        lead_id = getattr(member, 'employee', '')
-                        if lead_id:
-                            lead_ids.add(lead_id)
-
-            print(f"  [t016 enricher] Found {len(lead_ids)} unique leads from all projects")
-
-            # Step 3: Get salary for each lead
-            leads_with_salary = []
-            for lead_id in lead_ids:
-                emp_response = api.dispatch(client.Req_GetEmployee(id=lead_id))
-                emp_data = getattr(emp_response, 'employee', None)
-                if emp_data:
-                    salary = getattr(emp_data, 'salary', 0)
-                    name = getattr(emp_data, 'name', lead_id)
-                    leads_with_salary.append({
-                        'id': lead_id,
-                        'name': name,
-                        'salary': salary
-                    })
+            snapshot = get_org_snapshot(ctx, require_complete=True)
+            if snapshot is not None:
+                # Indexed lookup: lead roles and salaries are already in memory
+                all_projects = snapshot.projects()
+                lead_ids = set(snapshot.project_lead_ids())
+                leads_with_salary = []
+                for lead_id in lead_ids:
+                    emp_data = snapshot.employee(lead_id)
+                    if emp_data:
+                        leads_with_salary.append({
+                            'id': lead_id,
+                            'name': getattr(emp_data, 'name', lead_id),
+                            'salary': getattr(emp_data, 'salary', 0)
+                        })
+                print(f"  [t016 enricher] Org snapshot: {len(all_projects)} projects, "
+                      f"{len(lead_ids)} unique leads")
+            else:
+                # Step 1: Get ALL projects (not just active - project lead = lead of ANY project)
+                # AICODE-NOTE: t016 FIX - Benchmark defines "project lead" as lead of any project,
+                # regardless of status (active, exploring, archived, etc.)
+                fetched = paginate(
+                    api,
+                    lambda offset, limit: client.Req_ListProjects(offset=offset, limit=limit),
+                    'projects'
+                )
+                if fetched.error is not None:
+                    raise fetched.error
+                all_projects = fetched.items
+
+                print(f"  [t016 enricher] Found {len(all_projects)} total projects")
+
+                # Step 2: Get team details for each project and collect leads
+                lead_ids = set()
+                for proj in all_projects:
+                    proj_id = getattr(proj, 'id', '')
+                    if not proj_id:
+                        continue
+                    proj_details = api.dispatch(client.Req_GetProject(id=proj_id))
+                    project = getattr(proj_details, 'project', None)
+                    if not project:
+                        continue
+                    team = getattr(project, 'team', []) or []
+                    for member in team:
+                        if getattr(member, 'role', '') == 'Lead':
+                            lead_id = getattr(member, 'employee', '')
+                            if lead_id:
+                                lead_ids.add(lead_id)
+
+                print(f"  [t016 enricher] Found {len(lead_ids)} unique leads from all projects")
+
+                # Step 3: Get salary for each lead
+                leads_with_salary = []
+                for lead_id in lead_ids:
+                    emp_response = api.dispatch(client.Req_GetEmployee(id=lead_id))
+                    emp_data = getattr(emp_response, 'employee', None)
+                    if emp_data:
+                        salary = getattr(emp_data, 'salary', 0)
+                        name = getattr(emp_data, 'name', lead_id)
+                        leads_with_salary.append({
+                            'id': lead_id,
+                            'name': name,
+                            'salary': salary
+                        })
 
             # Step 4: Filter leads with salary > baseline
             # Exclude baseline employee itself
@@ -89,6 +89,8 @@ from .pagination_guards import (
     CoachingTimeoutGuard,
     SkillExtremaTimeoutGuard,
     EmployeeSearchOffsetGuard,
+    READ_GUARDED_TOOLS,
+    READ_GUARD_TURNS,
 )
 
 __all__ = [
@@ -107,6 +109,8 @@ __all__ = [
     'CoachingTimeoutGuard',
     'SkillExtremaTimeoutGuard',
     'EmployeeSearchOffsetGuard',
+    'READ_GUARDED_TOOLS',
+    'READ_GUARD_TURNS',
     # Project Guards
     'ProjectSearchReminderMiddleware',
     'ProjectModificationClarificationGuard',
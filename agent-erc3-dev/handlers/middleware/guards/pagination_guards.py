@@ -616,3 +616,15 @@ class EmployeeSearchOffsetGuard(Middleware):
 
         # For first call (offset=0), just let it through
         # The response will set pending_pagination for future calls
+
+
+# AICODE-NOTE: Read tools the guards above can stop (stop_execution). They only
+# block while some pagination is pending or near the end of the turn budget
+# (remaining turns <= READ_GUARD_TURNS), so ActionProcessor does not dispatch
+# these reads ahead of the sequential pass in those situations - otherwise a
+# request the guard would block still reaches the API.
+READ_GUARDED_TOOLS = frozenset(
+    (PaginationEnforcementMiddleware.ANALYSIS_TOOLS - {'respond', 'answer', 'reply'})
+    | {'projects_search', 'employees_search', 'customers_get'}
+)
+READ_GUARD_TURNS = CoachingTimeoutGuard.SOFT_BLOCK_THRESHOLD
@@ -12,6 +12,7 @@ import re
 from erc3.erc3 import client
 from ..base import ResponseGuard, get_task_text
 from ...base import ToolContext
+from ...api import get_org_snapshot, cached_reference
 from tools.links import LinkExtractor
 from utils import CLI_YELLOW, CLI_GREEN, CLI_RED, CLI_BLUE, CLI_CLR
 
@@ -943,18 +944,23 @@ class SkillsIDontHaveGuard(ResponseGuard):
             my_skill_ids = {s.name for s in (getattr(me, 'skills', None) or []) if getattr(s, 'name', None)}
 
             # Discover configured skills via a sample employee (adaptive)
-            sample_ids = []
-            try:
-                sample_res = ctx.api.dispatch(client.Req_SearchEmployees(limit=1, offset=0))
-                if getattr(sample_res, 'employees', None):
-                    sample_ids = [sample_res.employees[0].id]
-            except Exception:
+            def _sample_skill_names():
                 sample_ids = []
-
-            available_skill_ids = set(my_skill_ids)
-            if sample_ids and sample_ids[0]:
+                try:
+                    sample_res = ctx.api.dispatch(client.Req_SearchEmployees(limit=1, offset=0))
+                    if getattr(sample_res, 'employees', None):
+                        sample_ids = [sample_res.employees[0].id]
+                except Exception:
+                    sample_ids = []
+                if not (sample_ids and sample_ids[0]):
+                    return []
                 sample_emp = ctx.api.dispatch(client.Req_GetEmployee(id=sample_ids[0])).employee
-                available_skill_ids = {s.name for s in (getattr(sample_emp, 'skills', None) or []) if getattr(s, 'name', None)}
+                return [s.name for s in (getattr(sample_emp, 'skills', None) or []) if getattr(s, 'name', None)]
+
+            # Shared with EmployeeSearchHandler's catalogue across tasks
+            available_skill_ids = set(cached_reference(ctx.api, 'employee', 'skill_names', _sample_skill_names))
+            if not available_skill_ids:
+                available_skill_ids = set(my_skill_ids)
 
             missing_ids = sorted(list(available_skill_ids - my_skill_ids))
 
@@ -1640,6 +1646,7 @@ class LocationExclusionGuard(ResponseGuard):
 
         # AICODE-NOTE: t013 FIX v2 - Get API reference for fetching location if not cached
         api = ctx.shared.get('_api_ref')
+        snapshot = get_org_snapshot(ctx)
 
         for emp_id in employee_ids:
             # Try to find location
@@ -1652,6 +1659,12 @@ class LocationExclusionGuard(ResponseGuard):
                         loc = getattr(e, 'location', '')
                         break
 
+            if not loc and snapshot is not None:
+                emp = snapshot.employee(emp_id)
+                loc = getattr(emp, 'location', '') if emp else ''
+                if loc:
+                    entity_locations[emp_id] = loc
+
             # AICODE-NOTE: t013 FIX v2 - If still no location, fetch from API
             # This is critical for "send to X" tasks where employee location determines validity
             if not loc and api:
@@ -13,6 +13,11 @@ except ImportError:
     HAS_EMBEDDINGS = False
     SentenceTransformer = None
 
+if HAS_EMBEDDINGS:
+    import numpy as np
+else:
+    np = None
+
 # Global singleton for embedding model (thread-safe initialization)
 _embedding_model = None
 _embedding_model_lock = threading.Lock()
@@ -49,6 +54,20 @@ def get_embedding_model() -> Optional['SentenceTransformer']:
             return None
 
 
+def to_embedding_matrix(vectors) -> 'np.ndarray':
+    """
+    Stored form of corpus embeddings: L2-normalized rows as float16.
+
+    Normalized rows make cosine similarity a plain dot product; float16
+    halves the file and the mapped pages (ranking is unaffected at this
+    precision).
+    """
+    matrix = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float16)
+
+
 def has_embeddings() -> bool:
     """Check if embedding support is available."""
     return HAS_EMBEDDINGS
@@ -1,15 +1,26 @@
 """
 Wiki manager - main coordinator for wiki operations.
 """
-import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Any
 
 from erc3.erc3 import client
 
-from .storage import WikiVersionStore, WIKI_DUMP_DIR
+import config
+
+from ..api.fanout import bind_thread_output
+
+from .storage import WikiVersionStore, WIKI_DUMP_DIR, content_hash
 from .summarizer import WikiSummarizer
-from .embeddings import get_embedding_model
-from .search import HybridSearchEngine
+from .embeddings import get_embedding_model, has_embeddings, to_embedding_matrix
+from .search import HybridSearchEngine, InvertedIndex
+
+if has_embeddings():
+    import numpy as np
+else:
+    np = None
 
 
 class WikiManager:
@@ -23,6 +34,17 @@ class WikiManager:
     - Hybrid search (Regex + Semantic + Keyword)
     """
 
+    # AICODE-NOTE: One lock per new wiki sha1, shared by all instances. When
+    # parallel tasks see the same new version, one downloads it and the
+    # others wait, then load it from the cache it wrote.
+    _download_locks: Dict[str, threading.Lock] = {}
+    _download_locks_guard = threading.Lock()
+
+    @classmethod
+    def _download_lock(cls, sha1: str) -> threading.Lock:
+        with cls._download_locks_guard:
+            return cls._download_locks.setdefault(sha1, threading.Lock())
+
     def __init__(self, api: Optional[client.Erc3Client] = None, base_dir: str = WIKI_DUMP_DIR):
         self.api = api
         self.base_dir = base_dir
@@ -31,6 +53,7 @@ class WikiManager:
         self.summaries: Dict[str, str] = {}
         self.chunks: List[Dict[str, Any]] = []
         self.corpus_embeddings = None
+        self.keyword_index: Optional[InvertedIndex] = None
 
         # Track wiki changes for dynamic injection
         self._last_synced_sha1: Optional[str] = None
@@ -74,8 +97,14 @@ class WikiManager:
                 print(f"   Version found in local cache. Loading...")
                 self._load_from_cache(reported_sha1)
             else:
-                print(f"   New version. Downloading from API...")
-                self._download_and_save(reported_sha1)
+                with self._download_lock(reported_sha1):
+                    self.store.reload_index()
+                    if self.store.version_exists(reported_sha1):
+                        print("   Version downloaded by another task. Loading...")
+                        self._load_from_cache(reported_sha1)
+                    else:
+                        print(f"   New version. Downloading from API...")
+                        self._download_and_save(reported_sha1)
 
             old_sha1 = self.current_sha1
             self.current_sha1 = reported_sha1
@@ -89,6 +118,7 @@ class WikiManager:
         """Load a wiki version from local cache."""
         self.pages = self.store.get_pages(sha1)
         self.chunks, self.corpus_embeddings = self.store.get_chunks(sha1)
+        self.keyword_index = self.store.get_index(sha1)
         self.store.set_current(sha1)
 
         # Load summaries from cache, or generate if not cached
@@ -103,6 +133,8 @@ class WikiManager:
             print(f"Generating chunks (not in cache)...")
             self._reindex()
             self.store.save_chunks(sha1, self.chunks, self.corpus_embeddings)
+            self.store.save_index(sha1, self.keyword_index)
+            self.corpus_embeddings = self.store.get_chunks(sha1)[1]
 
         print(f"Wiki loaded from cache: {len(self.pages)} pages, {len(self.chunks)} chunks, {len(self.summaries)} summaries")
 
@@ -118,14 +150,10 @@ class WikiManager:
             actual_sha1 = list_resp.sha1
 
             # 2. Download all pages
-            self.pages = {}
-            for path in list_resp.paths:
-                print(f"   Downloading {path}...")
-                load_resp = self.api.load_wiki(path)
-                self.pages[path] = load_resp.content
+            self.pages = self._fetch_pages(list_resp.paths)
 
-            # 3. Save to cache
-            self.store.save_version(actual_sha1, list_resp.paths, self.pages)
+            # 3. Save pages to cache (listed in versions.json only in step 7)
+            self.store.save_version(actual_sha1, list_resp.paths, self.pages, publish=False)
 
             # 4. Generate summaries for all pages and save to cache
             self.summaries = WikiSummarizer.generate_all_summaries(self.pages)
@@ -135,8 +163,15 @@ class WikiManager:
             # 5. Index/Chunk pages
             self._reindex()
 
-            # 6. Save chunks to cache
+            # 6. Save chunks and keyword index to cache, then search the
+            #    shared memory-mapped embeddings instead of the fresh copy
             self.store.save_chunks(actual_sha1, self.chunks, self.corpus_embeddings)
+            self.store.save_index(actual_sha1, self.keyword_index)
+            self.chunks, self.corpus_embeddings = self.store.get_chunks(actual_sha1)
+
+            # 7. Publish last: other WikiManagers load listed versions without
+            #    the download lock and must find chunks and embeddings ready
+            self.store.publish_version(actual_sha1)
 
             self.current_sha1 = actual_sha1
             print(f"Wiki Sync Complete: {len(self.pages)} pages saved to wiki_dump/{actual_sha1[:16]}/")
@@ -146,37 +181,104 @@ class WikiManager:
             import traceback
             traceback.print_exc()
 
+    def _fetch_pages(self, paths: List[str]) -> Dict[str, str]:
+        """
+        Download pages concurrently (config.WIKI_DOWNLOAD_WORKERS at a time).
+
+        Each page is retried with exponential backoff; if one still fails,
+        the whole download fails and nothing is saved.
+        """
+        def fetch(path: str) -> str:
+            for attempt in range(config.WIKI_DOWNLOAD_RETRIES):
+                try:
+                    return self.api.load_wiki(path).content
+                except Exception as e:
+                    if attempt + 1 >= config.WIKI_DOWNLOAD_RETRIES:
+                        raise
+                    delay = 0.5 * 2 ** attempt
+                    print(f"   Retrying {path} in {delay:.1f}s: {e}")
+                    time.sleep(delay)
+
+        if not paths:
+            return {}
+        workers = min(config.WIKI_DOWNLOAD_WORKERS, len(paths))
+        print(f"   Downloading {len(paths)} pages ({workers} parallel)...")
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="WikiDownload") as pool:
+            contents = list(pool.map(bind_thread_output(fetch), paths))
+        return dict(zip(paths, contents))
+
+    @staticmethod
+    def _split_page(content: str) -> List[List[Any]]:
+        """Paragraph chunks of a page as [paragraph_index, text] pairs."""
+        chunks = []
+        for i, p in enumerate(content.split('\n\n')):
+            clean_p = p.strip()
+            if clean_p:
+                chunks.append([i, clean_p])
+        return chunks
+
     def _reindex(self):
-        """Split pages into chunks for search and compute embeddings."""
-        self.chunks = []
+        """
+        Split pages into chunks for search, build the keyword index and compute embeddings.
+
+        AICODE-NOTE: Chunks and embeddings are stored per page content hash
+        (WikiVersionStore.get_page_chunks), so when the wiki changes only
+        pages whose text changed are chunked and embedded; the rest is reused
+        from earlier versions and the version's matrix is assembled from
+        the pieces.
+        """
+        with_embeddings = self.model is not None
+        pages = []  # [path, digest, paragraphs, embeddings] per page
+        to_embed = []  # Positions in pages that still need embeddings
         for path, content in self.pages.items():
-            paragraphs = content.split('\n\n')
-            for i, p in enumerate(paragraphs):
-                clean_p = p.strip()
-                if not clean_p:
-                    continue
-                self.chunks.append({
-                    "content": clean_p,
-                    "path": path,
-                    "id": f"{path}#{i}",
-                    "tokens": set(re.findall(r'\w+', clean_p.lower()))
-                })
-
-        # Compute embeddings if model is available
-        if self.model and self.chunks:
-            print(f"Computing embeddings for {len(self.chunks)} chunks...")
-            texts = [c["content"] for c in self.chunks]
+            digest = content_hash(content)
+            paragraphs, embeddings = self.store.get_page_chunks(digest, with_embeddings)
+            if paragraphs is None:
+                paragraphs = self._split_page(content)
+                self.store.save_page_chunks(digest, paragraphs)
+            if with_embeddings and embeddings is None and paragraphs:
+                to_embed.append(len(pages))
+            pages.append([path, digest, paragraphs, embeddings])
+
+        self.chunks = [
+            {"content": text, "path": path, "id": f"{path}#{i}"}
+            for path, _, paragraphs, _ in pages
+            for i, text in paragraphs
+        ]
+        self.keyword_index = InvertedIndex.build(self.chunks)
+        self.corpus_embeddings = None
+
+        if not with_embeddings or not self.chunks:
+            return
+
+        # Embed the changed pages in one batch
+        if to_embed:
+            texts = [text for pos in to_embed for _, text in pages[pos][2]]
+            print(f"Computing embeddings for {len(texts)} chunks "
+                  f"({len(to_embed)}/{len(pages)} pages new or changed)...")
             try:
-                self.corpus_embeddings = self.model.encode(
-                    texts, convert_to_tensor=True, show_progress_bar=False
-                )
+                vectors = to_embedding_matrix(self.model.encode(
+                    texts, convert_to_numpy=True, normalize_embeddings=True, show_progress_bar=False
+                ))
             except Exception as e:
                 print(f"Embedding computation failed: {e}")
-                self.corpus_embeddings = None
+                return
+            offset = 0
+            for pos in to_embed:
+                count = len(pages[pos][2])
+                pages[pos][3] = vectors[offset:offset + count]
+                offset += count
+                self.store.save_page_embeddings(pages[pos][1], pages[pos][3])
+        else:
+            print(f"Reusing embeddings of all {len(pages)} pages")
+
+        self.corpus_embeddings = np.concatenate(
+            [embeddings for _, _, paragraphs, embeddings in pages if paragraphs]
+        )
 
     def search(self, query: str, top_k: int = 5, sha1: Optional[str] = None) -> str:
         """
-        Hybrid Search: Regex + Semantic + Keyword.
+        Hybrid Search: Regex + Semantic + Keyword (BM25).
 
         Args:
             query: Search query
@@ -192,17 +294,19 @@ class WikiManager:
         if sha1 and sha1 != self.current_sha1:
             if self.store.version_exists(sha1):
                 chunks, embeddings = self.store.get_chunks(sha1)
+                keyword_index = self.store.get_index(sha1)
             else:
                 return f"Wiki version {sha1[:8]} not found in cache."
         else:
             chunks = self.chunks
             embeddings = self.corpus_embeddings
+            keyword_index = self.keyword_index
 
         if not chunks:
             return "Wiki not loaded yet or empty."
 
         # Execute hybrid search
-        results = self.search_engine.search(query, chunks, embeddings, top_k)
+        results = self.search_engine.search(query, chunks, embeddings, top_k, keyword_index)
         return self.search_engine.format_results(results, query)
 
     def get_context_summary(self) -> str:
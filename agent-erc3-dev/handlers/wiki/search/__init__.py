@@ -4,5 +4,6 @@ Provides hybrid search combining regex, semantic, and keyword approaches.
 """
 from .hybrid import HybridSearchEngine
 from .result import SearchResult
+from .inverted_index import InvertedIndex
 
-__all__ = ['HybridSearchEngine', 'SearchResult']
+__all__ = ['HybridSearchEngine', 'SearchResult', 'InvertedIndex']
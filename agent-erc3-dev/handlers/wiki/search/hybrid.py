@@ -14,7 +14,7 @@ class HybridSearchEngine:
     Hybrid Search combining three streams:
     1. REGEX: Pattern matching for structured queries
     2. SEMANTIC: Vector similarity using sentence-transformers (if available)
-    3. KEYWORD: Token overlap fallback for broad matching
+    3. KEYWORD: BM25 over an inverted index, fallback for broad matching
 
     Results are merged, deduplicated by chunk ID, and ranked by score.
     """
@@ -37,7 +37,8 @@ class HybridSearchEngine:
         query: str,
         chunks: List[Dict[str, Any]],
         embeddings=None,
-        top_k: int = 5
+        top_k: int = 5,
+        keyword_index=None
     ) -> List[SearchResult]:
         """
         Execute hybrid search across all three engines.
@@ -47,6 +48,7 @@ class HybridSearchEngine:
             chunks: List of chunk dictionaries
             embeddings: Pre-computed corpus embeddings for semantic search
             top_k: Maximum results to return
+            keyword_index: InvertedIndex of the chunks for keyword search
 
         Returns:
             List of SearchResult sorted by score (highest first)
@@ -72,7 +74,7 @@ class HybridSearchEngine:
                 all_results[chunk_id] = result
 
         # Stream 3: Keyword Search (fallback)
-        keyword_results = self.keyword_searcher.search(query, chunks)
+        keyword_results = self.keyword_searcher.search(query, chunks, keyword_index)
         for chunk_id, result in keyword_results.items():
             # Only add if not found by higher-priority searches
             if chunk_id not in all_results:
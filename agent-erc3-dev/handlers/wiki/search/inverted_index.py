@@ -0,0 +1,101 @@
+"""
+Inverted index with BM25 ranking for keyword search.
+"""
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens (same tokenization the wiki has always used)."""
+    return re.findall(r'\w+', text.lower())
+
+
+class InvertedIndex:
+    """
+    Term -> postings (chunk position, term frequency) over a wiki version's chunks.
+
+    Built once per wiki sha1 (WikiManager._reindex) and persisted next to
+    chunks.json, so query time depends on the postings of the query terms,
+    not on the number of chunks. Chunk positions refer to the chunk list the
+    index was built from (storage keeps that order).
+    """
+
+    FORMAT_VERSION = 1
+
+    # Standard BM25 parameters
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, postings: Dict[str, List[int]], doc_lengths: List[int]):
+        """
+        Args:
+            postings: term -> flat [position, tf, position, tf, ...] list
+            doc_lengths: token count per chunk
+        """
+        self.postings = postings
+        self.doc_lengths = doc_lengths
+        self.doc_count = len(doc_lengths)
+        self.avg_len = sum(doc_lengths) / self.doc_count if self.doc_count else 0.0
+
+    @classmethod
+    def build(cls, chunks: List[Dict[str, Any]]) -> 'InvertedIndex':
+        """Index chunk contents."""
+        postings: Dict[str, List[int]] = {}
+        doc_lengths = []
+        for pos, chunk in enumerate(chunks):
+            terms = tokenize(chunk["content"])
+            doc_lengths.append(len(terms))
+            for term, tf in Counter(terms).items():
+                postings.setdefault(term, []).extend((pos, tf))
+        return cls(postings, doc_lengths)
+
+    def idf(self, term: str) -> float:
+        """BM25 idf (always positive); unknown terms count as the rarest."""
+        df = len(self.postings.get(term, ())) // 2 or 1
+        return math.log(1 + (self.doc_count - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str) -> Dict[int, float]:
+        """
+        BM25-rank chunks for a query.
+
+        Returns:
+            chunk position -> score in (0, 1]: relative to a chunk of average
+            length containing every query term once (capped at 1), so a chunk
+            matching only common terms scores low and one matching the rare
+            terms high
+        """
+        terms = set(tokenize(query))
+        if not terms or not self.doc_count:
+            return {}
+
+        scores: Dict[int, float] = {}
+        reference = 0.0
+        for term in terms:
+            idf = self.idf(term)
+            reference += idf  # tf=1 at average length scores exactly idf
+            plist = self.postings.get(term)
+            if not plist:
+                continue
+            for i in range(0, len(plist), 2):
+                pos, tf = plist[i], plist[i + 1]
+                norm = self.K1 * (1 - self.B + self.B * self.doc_lengths[pos] / self.avg_len)
+                scores[pos] = scores.get(pos, 0.0) + idf * tf * (self.K1 + 1) / (tf + norm)
+
+        return {pos: min(1.0, score / reference) for pos, score in scores.items()}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable form (see from_dict)."""
+        return {
+            "version": self.FORMAT_VERSION,
+            "doc_lengths": self.doc_lengths,
+            "postings": self.postings,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> Optional['InvertedIndex']:
+        """Load a persisted index; None if the format is outdated."""
+        if data.get("version") != cls.FORMAT_VERSION:
+            return None
+        return cls(data["postings"], data["doc_lengths"])
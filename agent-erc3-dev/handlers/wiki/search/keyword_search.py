@@ -1,15 +1,15 @@
 """
-Keyword-based search engine using token overlap.
+Keyword-based search engine using BM25 over an inverted index.
 """
-import re
-from typing import Dict, List, Any, Set
+from typing import Dict, List, Any, Optional
 
 from .result import SearchResult
+from .inverted_index import InvertedIndex
 
 
 class KeywordSearcher:
     """
-    Token overlap search for broad matching.
+    BM25 keyword search for broad matching.
     Fallback when semantic search is unavailable or for simple queries.
     """
 
@@ -23,42 +23,36 @@ class KeywordSearcher:
         """
         self.max_score = max_score
 
-    def _tokenize(self, text: str) -> Set[str]:
-        """Extract lowercase word tokens from text."""
-        return set(re.findall(r'\w+', text.lower()))
-
-    def search(self, query: str, chunks: List[Dict[str, Any]]) -> Dict[str, SearchResult]:
+    def search(
+        self,
+        query: str,
+        chunks: List[Dict[str, Any]],
+        index: Optional[InvertedIndex] = None
+    ) -> Dict[str, SearchResult]:
         """
-        Search chunks using keyword token overlap.
+        Search chunks by BM25 keyword relevance.
 
         Args:
             query: Search query
-            chunks: List of chunk dictionaries with 'tokens' key (set of lowercase words)
+            chunks: List of chunk dictionaries
+            index: InvertedIndex built from these chunks (built on the fly
+                if not given - linear in the chunk count, avoid in hot paths)
 
         Returns:
             Dict mapping chunk_id to SearchResult
         """
-        results = {}
-        query_tokens = self._tokenize(query)
-
-        if not query_tokens:
-            return results
+        if index is None:
+            index = InvertedIndex.build(chunks)
 
-        for chunk in chunks:
-            chunk_tokens = chunk.get("tokens", set())
-            if not chunk_tokens:
-                # Tokenize on the fly if not pre-computed
-                chunk_tokens = self._tokenize(chunk["content"])
-
-            overlap = len(query_tokens.intersection(chunk_tokens))
-            if overlap > 0:
-                # Normalize score by query token count
-                normalized_score = (overlap / len(query_tokens)) * self.max_score
-                chunk_id = chunk["id"]
-                results[chunk_id] = SearchResult(
-                    score=normalized_score,
-                    chunk=chunk,
-                    source="keyword"
-                )
+        results = {}
+        for pos, score in index.search(query).items():
+            if pos >= len(chunks):
+                continue
+            chunk = chunks[pos]
+            results[chunk["id"]] = SearchResult(
+                score=score * self.max_score,
+                chunk=chunk,
+                source="keyword"
+            )
 
         return results
@@ -2,21 +2,32 @@
 Semantic search engine using sentence embeddings.
 """
 import re
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any
 
 from .result import SearchResult
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 class SemanticSearcher:
     """
     Vector similarity search using sentence-transformers.
     Best for natural language queries with conceptual matching.
+
+    Corpus embeddings are L2-normalized float16 rows (see
+    storage.WikiVersionStore), so cosine similarity is one NumPy
+    matrix-vector product over the memory-mapped matrix.
     """
 
     # Minimum query length after cleaning
     MIN_QUERY_LENGTH = 3
     # Minimum score threshold to include result
     MIN_SCORE_THRESHOLD = 0.25
+    # Corpus rows upcast to float32 per block when scoring
+    BLOCK_ROWS = 4096
 
     def __init__(self, model=None):
         """
@@ -24,22 +35,11 @@ class SemanticSearcher:
             model: SentenceTransformer model instance (optional, can be set later)
         """
         self.model = model
-        self._util = None
 
     def set_model(self, model):
         """Set the embedding model."""
         self.model = model
 
-    def _get_util(self):
-        """Lazy import of sentence_transformers.util."""
-        if self._util is None:
-            try:
-                from sentence_transformers import util
-                self._util = util
-            except ImportError:
-                return None
-        return self._util
-
     def _clean_query(self, query: str) -> str:
         """Remove regex operators from query for embedding."""
         clean = re.sub(r'[.*+?\[\](){}|^$\\]', ' ', query)
@@ -58,7 +58,7 @@ class SemanticSearcher:
         Args:
             query: Search query (natural language)
             chunks: List of chunk dictionaries
-            embeddings: Pre-computed corpus embeddings tensor
+            embeddings: Normalized corpus embeddings matrix (rows align with chunks)
             top_k: Maximum results to return
 
         Returns:
@@ -66,11 +66,7 @@ class SemanticSearcher:
         """
         results = {}
 
-        if self.model is None or embeddings is None:
-            return results
-
-        util = self._get_util()
-        if util is None:
+        if self.model is None or embeddings is None or np is None:
             return results
 
         # Clean query for embedding
@@ -79,17 +75,29 @@ class SemanticSearcher:
             return results
 
         try:
-            query_emb = self.model.encode(clean_query, convert_to_tensor=True)
-            hits = util.semantic_search(query_emb, embeddings, top_k=top_k * 2)
-
-            for hit in hits[0]:
-                idx = hit['corpus_id']
+            query_emb = self.model.encode(
+                clean_query, convert_to_numpy=True, normalize_embeddings=True
+            ).astype(np.float32)
+            # AICODE-NOTE: float16 @ float32 would make NumPy upcast the whole
+            # memory-mapped matrix per query; scoring in blocks bounds the
+            # temporary float32 copy to BLOCK_ROWS rows
+            scores = np.empty(len(embeddings), dtype=np.float32)
+            for start in range(0, len(embeddings), self.BLOCK_ROWS):
+                block = np.asarray(embeddings[start:start + self.BLOCK_ROWS], dtype=np.float32)
+                scores[start:start + len(block)] = block @ query_emb
+
+            limit = min(top_k * 2, len(scores))
+            if limit <= 0:
+                return results
+            top = np.argpartition(-scores, limit - 1)[:limit]
+
+            for idx in top[np.argsort(-scores[top])]:
                 if idx >= len(chunks):
                     continue
 
                 chunk = chunks[idx]
                 chunk_id = chunk["id"]
-                score = hit['score']
+                score = float(scores[idx])
 
                 if score > self.MIN_SCORE_THRESHOLD:
                     results[chunk_id] = SearchResult(
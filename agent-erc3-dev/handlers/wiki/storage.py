@@ -1,25 +1,60 @@
 """
 File-based storage for wiki versions.
-Each version stored in wiki_dump/{sha1_prefix}/ folder.
+Each version stored in wiki_dump/{sha1_prefix}/ folder; per-page chunks and
+embeddings in wiki_dump/content/, keyed by page content hash and shared by
+all versions.
 """
+import hashlib
 import os
 import json
 import threading
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from datetime import datetime
 
-from .embeddings import has_embeddings
+from .embeddings import has_embeddings, to_embedding_matrix, MODEL_NAME
+from .search import InvertedIndex
 
 if has_embeddings():
     import numpy as np
-    import torch
 else:
     np = None
-    torch = None
 
 
 # Default storage paths
 WIKI_DUMP_DIR = "wiki_dump"
+CONTENT_DIR = "content"
+
+
+def content_hash(text: str) -> str:
+    """Content address of a wiki page."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _atomic_write(path: str, write: Callable[[Any], None], binary: bool = False):
+    """
+    Write a file via a temp file + rename, so readers (other threads or
+    processes sharing wiki_dump/) never see a half-written file.
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        if binary:
+            with open(tmp_path, 'wb') as f:
+                write(f)
+        else:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                write(f)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _write_json(path: str, data: Any, **dump_kwargs):
+    _atomic_write(path, lambda f: json.dump(data, f, **dump_kwargs))
+
+
+def _save_npy(path: str, array: Any):
+    _atomic_write(path, lambda f: np.save(f, array), binary=True)
 
 
 class WikiVersionStore:
@@ -29,12 +64,20 @@ class WikiVersionStore:
 
     Uses class-level cache for pages/chunks to avoid repeated disk I/O
     when multiple WikiManager instances load the same version (parallel mode).
+
+    AICODE-NOTE: Embeddings are opened with np.load(mmap_mode='r'): one
+    read-only view per version, shared by every thread. Pages come from the
+    OS page cache, so resident memory does not grow with the number of
+    cached versions and a cold load is just an mmap.
     """
     # Class-level cache shared across all instances (thread-safe)
     _pages_cache: Dict[str, Dict[str, str]] = {}
     _chunks_cache: Dict[str, Tuple[List[Dict[str, Any]], Optional[Any]]] = {}
     _summaries_cache: Dict[str, Dict[str, str]] = {}
+    _index_cache: Dict[str, InvertedIndex] = {}
     _cache_lock = threading.Lock()
+    # Serializes read-modify-write of versions.json between instances
+    _index_lock = threading.Lock()
 
     @classmethod
     def clear_cache(cls):
@@ -43,11 +86,13 @@ class WikiVersionStore:
             cls._pages_cache.clear()
             cls._chunks_cache.clear()
             cls._summaries_cache.clear()
+            cls._index_cache.clear()
 
     def __init__(self, base_dir: str = WIKI_DUMP_DIR):
         self.base_dir = base_dir
         self.versions_index = os.path.join(base_dir, "versions.json")
-        os.makedirs(base_dir, exist_ok=True)
+        self.content_dir = os.path.join(base_dir, CONTENT_DIR)
+        os.makedirs(self.content_dir, exist_ok=True)
         self._load_index()
 
     def _load_index(self):
@@ -65,11 +110,15 @@ class WikiVersionStore:
     def _save_index(self):
         """Save versions index to JSON file."""
         try:
-            with open(self.versions_index, 'w', encoding='utf-8') as f:
-                json.dump(self.index, f, indent=2)
+            _write_json(self.versions_index, self.index, indent=2)
         except Exception as e:
             print(f"Failed to save wiki index: {e}")
 
+    def reload_index(self):
+        """Re-read versions.json (another WikiManager may have added a version)."""
+        with WikiVersionStore._index_lock:
+            self._load_index()
+
     def _get_version_dir(self, sha1: str) -> str:
         """Get directory path for a wiki version (uses first 16 chars of hash)."""
         return os.path.join(self.base_dir, sha1[:16])
@@ -78,19 +127,25 @@ class WikiVersionStore:
         """Check if a wiki version already exists."""
         return sha1 in self.index["versions"]
 
-    def save_version(self, sha1: str, paths: List[str], pages: Dict[str, str]):
-        """Save a new wiki version to files."""
+    def save_version(self, sha1: str, paths: List[str], pages: Dict[str, str], publish: bool = True):
+        """
+        Save a new wiki version to files.
+
+        Args:
+            publish: Also list it in versions.json. Pass False when chunks and
+                embeddings are still to be saved, and call publish_version()
+                once they are - other instances load listed versions without
+                taking the download lock.
+        """
         version_dir = self._get_version_dir(sha1)
         os.makedirs(version_dir, exist_ok=True)
 
-        # Save metadata
+        # Metadata (written after the pages, see below)
         metadata = {
             "sha1": sha1,
             "paths": paths,
             "created_at": datetime.now().isoformat()
         }
-        with open(os.path.join(version_dir, "metadata.json"), 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=2)
 
         # Save pages as individual files
         for path, content in pages.items():
@@ -98,27 +153,37 @@ class WikiVersionStore:
             if not safe_name.endswith(".md"):
                 safe_name += ".md"
 
-            with open(os.path.join(version_dir, safe_name), 'w', encoding='utf-8') as f:
-                f.write(f"<!-- PATH: {path} -->\n")
-                f.write(f"<!-- SHA1: {sha1} -->\n\n")
-                f.write(content)
+            header = f"<!-- PATH: {path} -->\n<!-- SHA1: {sha1} -->\n\n"
+            _atomic_write(os.path.join(version_dir, safe_name),
+                          lambda f, text=header + content: f.write(text))
 
-        # Update index
-        self.index["versions"][sha1] = {
-            "dir": sha1[:16],
-            "created_at": metadata["created_at"],
-            "paths": paths
-        }
-        self.index["current"] = sha1
-        self._save_index()
+        # Metadata and index last: the version only becomes visible once complete
+        _write_json(os.path.join(version_dir, "metadata.json"), metadata, indent=2)
+
+        if publish:
+            self.publish_version(sha1)
+
+    def publish_version(self, sha1: str):
+        """List a saved version (see save_version) in versions.json and make it current."""
+        with open(os.path.join(self._get_version_dir(sha1), "metadata.json"), encoding='utf-8') as f:
+            metadata = json.load(f)
+
+        with WikiVersionStore._index_lock:
+            self._load_index()  # Keep versions other instances added meanwhile
+            self.index["versions"][sha1] = {
+                "dir": sha1[:16],
+                "created_at": metadata["created_at"],
+                "paths": metadata["paths"]
+            }
+            self.index["current"] = sha1
+            self._save_index()
 
     def save_summaries(self, sha1: str, summaries: Dict[str, str]):
         """Save page summaries for a wiki version."""
         version_dir = self._get_version_dir(sha1)
         summaries_path = os.path.join(version_dir, "summaries.json")
         try:
-            with open(summaries_path, 'w', encoding='utf-8') as f:
-                json.dump(summaries, f, indent=2, ensure_ascii=False)
+            _write_json(summaries_path, summaries, indent=2, ensure_ascii=False)
         except Exception as e:
             print(f"Failed to save summaries: {e}")
 
@@ -149,30 +214,120 @@ class WikiVersionStore:
         """Save indexed chunks for a wiki version."""
         version_dir = self._get_version_dir(sha1)
 
-        # Save chunks (without tokens set - convert to list for JSON)
+        # Save chunks (keyword search terms live in index.json)
         chunks_data = []
         for chunk in chunks:
             chunks_data.append({
                 "content": chunk["content"],
                 "path": chunk["path"],
-                "id": chunk["id"],
-                "tokens": list(chunk.get("tokens", []))
+                "id": chunk["id"]
             })
 
-        with open(os.path.join(version_dir, "chunks.json"), 'w', encoding='utf-8') as f:
-            json.dump(chunks_data, f, indent=2)
+        _write_json(os.path.join(version_dir, "chunks.json"), chunks_data, indent=2)
 
-        # Save embeddings as numpy file
+        # Save embeddings as normalized float16 (see to_embedding_matrix)
         if embeddings is not None and has_embeddings():
             try:
-                if hasattr(embeddings, 'cpu'):
-                    emb_array = embeddings.cpu().numpy()
-                else:
-                    emb_array = embeddings
-                np.save(os.path.join(version_dir, "embeddings.npy"), emb_array)
+                _save_npy(os.path.join(version_dir, "embeddings.npy"), to_embedding_matrix(embeddings))
             except Exception as e:
                 print(f"Failed to save embeddings: {e}")
 
+        # Drop a cached (possibly empty) load of this version
+        with WikiVersionStore._cache_lock:
+            WikiVersionStore._chunks_cache.pop(f"{self.base_dir}:{sha1}", None)
+
+    def get_page_chunks(
+        self, digest: str, with_embeddings: bool = True
+    ) -> Tuple[Optional[List[List[Any]]], Optional[Any]]:
+        """
+        Load the chunks (and embeddings) of a page by content hash.
+
+        Returns:
+            ([[paragraph_index, text], ...] or None, embeddings or None) -
+            None where that page content was never chunked / embedded
+        """
+        chunks_path = os.path.join(self.content_dir, f"{digest}.json")
+        if not os.path.exists(chunks_path):
+            return None, None
+        try:
+            with open(chunks_path, 'r', encoding='utf-8') as f:
+                paragraphs = json.load(f)
+        except Exception as e:
+            print(f"Failed to load page chunks {digest[:12]}: {e}")
+            return None, None
+
+        embeddings = None
+        embeddings_path = os.path.join(self.content_dir, f"{digest}.{MODEL_NAME}.npy")
+        if with_embeddings and has_embeddings() and os.path.exists(embeddings_path):
+            try:
+                embeddings = np.load(embeddings_path)
+                if len(embeddings) != len(paragraphs):
+                    embeddings = None
+            except Exception as e:
+                print(f"Failed to load page embeddings {digest[:12]}: {e}")
+        return paragraphs, embeddings
+
+    def save_page_chunks(self, digest: str, paragraphs: List[List[Any]]):
+        """Save the chunks of a page under its content hash."""
+        try:
+            _write_json(os.path.join(self.content_dir, f"{digest}.json"), paragraphs, ensure_ascii=False)
+        except Exception as e:
+            print(f"Failed to save page chunks {digest[:12]}: {e}")
+
+    def save_page_embeddings(self, digest: str, embeddings):
+        """Save the chunk embeddings of a page (normalized float16) under its content hash."""
+        if not has_embeddings():
+            return
+        try:
+            _save_npy(os.path.join(self.content_dir, f"{digest}.{MODEL_NAME}.npy"),
+                      to_embedding_matrix(embeddings))
+        except Exception as e:
+            print(f"Failed to save page embeddings {digest[:12]}: {e}")
+
+    def save_index(self, sha1: str, index: InvertedIndex):
+        """Save the keyword search index of a wiki version (built from its chunks)."""
+        version_dir = self._get_version_dir(sha1)
+        try:
+            _write_json(os.path.join(version_dir, "index.json"), index.to_dict(), separators=(',', ':'))
+        except Exception as e:
+            print(f"Failed to save keyword index: {e}")
+
+        with WikiVersionStore._cache_lock:
+            WikiVersionStore._index_cache[f"{self.base_dir}:{sha1}"] = index
+
+    def get_index(self, sha1: str) -> Optional[InvertedIndex]:
+        """
+        Load the keyword search index of a wiki version. Uses class-level cache.
+
+        Versions saved before the index existed get one built from their
+        chunks and saved on first use.
+        """
+        cache_key = f"{self.base_dir}:{sha1}"
+        if cache_key in WikiVersionStore._index_cache:
+            # Read-only after build, so shared without copying
+            return WikiVersionStore._index_cache[cache_key]
+
+        index = None
+        index_path = os.path.join(self._get_version_dir(sha1), "index.json")
+        if os.path.exists(index_path):
+            try:
+                with open(index_path, 'r', encoding='utf-8') as f:
+                    index = InvertedIndex.from_dict(json.load(f))
+            except Exception as e:
+                print(f"Failed to load keyword index: {e}")
+
+        if index is None:
+            chunks, _ = self.get_chunks(sha1)
+            if not chunks:
+                return None
+            index = InvertedIndex.build(chunks)
+            self.save_index(sha1, index)
+
+        with WikiVersionStore._cache_lock:
+            WikiVersionStore._index_cache[cache_key] = index
+
+        return index
+
     def get_pages(self, sha1: str) -> Dict[str, str]:
         """Load pages for a specific wiki version. Uses class-level cache."""
         # Check cache first (thread-safe)
@@ -222,7 +377,7 @@ class WikiVersionStore:
         cache_key = f"{self.base_dir}:{sha1}"
         if cache_key in WikiVersionStore._chunks_cache:
             cached = WikiVersionStore._chunks_cache[cache_key]
-            # Return deep copy of chunks (they have mutable sets), embeddings can be shared
+            # Return copies of the chunk dicts, embeddings can be shared
             return [dict(c) for c in cached[0]], cached[1]
 
         version_dir = self._get_version_dir(sha1)
@@ -239,18 +394,30 @@ class WikiVersionStore:
                 chunks.append({
                     "content": chunk["content"],
                     "path": chunk["path"],
-                    "id": chunk["id"],
-                    "tokens": set(chunk.get("tokens", []))
+                    "id": chunk["id"]
                 })
 
-        # Load embeddings
+        # Load embeddings (memory-mapped, read-only)
         embeddings_path = os.path.join(version_dir, "embeddings.npy")
         if os.path.exists(embeddings_path) and has_embeddings():
             try:
-                emb_array = np.load(embeddings_path)
-                embeddings = torch.tensor(emb_array)
+                embeddings = np.load(embeddings_path, mmap_mode='r')
+                if embeddings.dtype != np.float16:
+                    # Saved before embeddings were normalized float16 - convert once.
+                    # Under the lock (one converter per process), written to a temp
+                    # file and renamed: other threads may have the old file mapped,
+                    # and truncating it in place would SIGBUS them.
+                    del embeddings
+                    with WikiVersionStore._cache_lock:
+                        embeddings = np.load(embeddings_path, mmap_mode='r')
+                        if embeddings.dtype != np.float16:
+                            matrix = to_embedding_matrix(embeddings)
+                            del embeddings
+                            _save_npy(embeddings_path, matrix)
+                            embeddings = np.load(embeddings_path, mmap_mode='r')
             except Exception as e:
                 print(f"Failed to load embeddings: {e}")
+                embeddings = None
 
         # Store in cache (thread-safe)
         with WikiVersionStore._cache_lock:
@@ -271,6 +438,8 @@ class WikiVersionStore:
 
     def set_current(self, sha1: str):
         """Mark a version as current."""
-        if sha1 in self.index["versions"]:
-            self.index["current"] = sha1
-            self._save_index()
+        with WikiVersionStore._index_lock:
+            self._load_index()
+            if sha1 in self.index["versions"]:
+                self.index["current"] = sha1
+                self._save_index()
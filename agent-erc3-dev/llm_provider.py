@@ -11,8 +11,12 @@ AICODE-NOTE: Gonka Network optimization for parallel execution:
 - NodePool with performance tracking for smart node selection
 - Jitter between requests to reduce contention
 - Periodic NTP time sync to prevent "signature is too old" errors
+- Node health, clock offsets and topology persisted across restarts
 """
 
+import asyncio
+import atexit
+import json
 import os
 import time
 import random
@@ -20,9 +24,15 @@ import threading
 import socket
 import struct
 import contextvars
+import hashlib
+import heapq
+import itertools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout, wait, FIRST_COMPLETED
 from email.utils import parsedate_to_datetime
 from datetime import timezone
-from typing import Any, List, Optional, Dict
+from types import SimpleNamespace
+from typing import Any, Callable, List, Optional, Dict, Tuple
 from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.messages import BaseMessage, AIMessage, SystemMessage, HumanMessage, ToolMessage
 from langchain_core.outputs import ChatResult, ChatGeneration
@@ -30,6 +40,8 @@ from pydantic import Field, PrivateAttr
 
 from gonka_openai import GonkaOpenAI
 import gonka_openai.utils as gonka_utils
+from transport import get_shared_session
+import config
 from utils import get_available_nodes, fetch_active_nodes, GENESIS_NODES, CLI_RED, CLI_YELLOW, CLI_CYAN, CLI_CLR, NoAvailableNodesError
 
 
@@ -37,6 +49,16 @@ from utils import get_available_nodes, fetch_active_nodes, GENESIS_NODES, CLI_RE
 # Each Gonka node has different clock drift. We learn and apply per-node offsets.
 _current_node_offset = contextvars.ContextVar('node_offset', default=0.0)
 
+# Seconds the current generation spent queued for a GonkaGate token or a node
+# slot (one-element list, set fresh by each GonkaChatModel._generate)
+_queue_wait = contextvars.ContextVar('queue_wait', default=None)
+
+
+def _note_queue_wait(seconds: float):
+    holder = _queue_wait.get()
+    if holder is not None:
+        holder[0] += seconds
+
 
 # AICODE-NOTE: NTP time synchronization to prevent "signature is too old" errors
 # Gonka requires accurate timestamps; system clock drift causes request rejection
@@ -85,22 +107,32 @@ class NTPTimeSync:
         for server in self.NTP_SERVERS:
             offset = self._query_ntp(server)
             if offset is not None:
+                self.apply_offset(offset)
                 with self._lock:
-                    self._offset_ns = int(offset * 1_000_000_000)
                     self._last_sync = time.time()
 
-                    # AICODE-NOTE: Safe patching with hasattr check to survive SDK updates
-                    if hasattr(gonka_utils, "_wall_base") and hasattr(gonka_utils, "_perf_base"):
-                        gonka_utils._wall_base = time.time_ns() + self._offset_ns
-                        gonka_utils._perf_base = time.perf_counter_ns()
-                    else:
-                        print(f"{CLI_YELLOW}⚠ WARNING: gonka_utils structure changed, NTP patch skipped{CLI_CLR}")
-
                 if abs(offset) > 0.5:  # Only log if significant drift
                     print(f"{CLI_YELLOW}⏱ NTP sync: clock offset {offset:+.2f}s (corrected){CLI_CLR}")
                 return True
         return False
 
+    def apply_offset(self, offset: float):
+        """Correct the SDK's signing clock by offset seconds."""
+        with self._lock:
+            self._offset_ns = int(offset * 1_000_000_000)
+
+            # AICODE-NOTE: Safe patching with hasattr check to survive SDK updates
+            if hasattr(gonka_utils, "_wall_base") and hasattr(gonka_utils, "_perf_base"):
+                gonka_utils._wall_base = time.time_ns() + self._offset_ns
+                gonka_utils._perf_base = time.perf_counter_ns()
+            else:
+                print(f"{CLI_YELLOW}⚠ WARNING: gonka_utils structure changed, NTP patch skipped{CLI_CLR}")
+
+    @property
+    def offset(self) -> float:
+        with self._lock:
+            return self._offset_ns / 1_000_000_000
+
     def _sync_loop(self):
         """Background sync loop."""
         while self._running:
@@ -114,13 +146,18 @@ class NTPTimeSync:
                     break
                 time.sleep(1)
 
-    def start(self):
-        """Start periodic sync in background thread."""
+    def start(self, background: bool = False):
+        """
+        Start periodic sync in background thread.
+
+        Args:
+            background: Skip the blocking initial sync (the loop syncs first thing)
+        """
         if self._sync_thread and self._sync_thread.is_alive():
             return
 
         # Initial sync
-        if self.sync_once():
+        if not background and self.sync_once():
             print(f"{CLI_CYAN}⏱ NTP time sync enabled (every {self.SYNC_INTERVAL}s){CLI_CLR}")
 
         self._running = True
@@ -206,6 +243,16 @@ class NodeOffsetManager:
 
             return current
 
+    def export_state(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._offsets)
+
+    def import_state(self, offsets: Dict[str, float]):
+        """Seed offsets saved by a previous run (learned offsets win)."""
+        with self._lock:
+            for node_url, offset in offsets.items():
+                self._offsets.setdefault(node_url, float(offset))
+
     def get_offset(self, node_url: str) -> float:
         """Get known offset for a node (0 if unknown)."""
         with self._lock:
@@ -264,10 +311,132 @@ def _patch_gonka_sdk():
     print(f"{CLI_CYAN}💉 Gonka SDK patched for ACSC (per-node clock compensation){CLI_CLR}")
 
 
+class FairWaitQueue:
+    """
+    Waiters for a shared resource, served by priority-adjusted arrival time.
+
+    Only the head of the queue is awake: it calls try_acquire(), which
+    returns None on success or the seconds until it is worth trying again
+    (float('inf') = until someone calls wake_head()). Everyone else sleeps
+    until they become the head, so a freed token or slot wakes exactly one
+    waiter instead of every polling thread.
+
+    priority is a head start in seconds: a waiter with priority 30 is
+    ordered as if it had arrived 30s earlier, 0 is plain FIFO. The head
+    start is bounded, so a low-priority waiter is overtaken for at most
+    that long (no starvation).
+
+    Threads use wait(), coroutines wait_async(); both share one queue.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._heap: List[list] = []  # [arrival - priority, seq, waker]
+        self._seq = itertools.count()
+
+    @property
+    def waiting(self) -> int:
+        with self._lock:
+            return len(self._heap)
+
+    def _enter(self, priority: float, waker: Callable[[], None]) -> list:
+        entry = [time.time() - priority, next(self._seq), waker]
+        with self._lock:
+            heapq.heappush(self._heap, entry)
+        self.wake_head()
+        return entry
+
+    def _is_head(self, entry: list) -> bool:
+        with self._lock:
+            return bool(self._heap) and self._heap[0] is entry
+
+    def _leave(self, entry: list):
+        with self._lock:
+            self._heap.remove(entry)
+            heapq.heapify(self._heap)
+        self.wake_head()
+
+    def wake_head(self):
+        """Let the current head re-check the resource (after a release)."""
+        with self._lock:
+            head = self._heap[0] if self._heap else None
+        if head is not None:
+            head[2]()
+
+    def wait(self, try_acquire: Callable[[], Optional[float]], timeout: float,
+             priority: float = 0) -> bool:
+        """Block until try_acquire() succeeds as head. False on timeout."""
+        event = threading.Event()
+        entry = self._enter(priority, event.set)
+        deadline = time.time() + timeout
+        try:
+            while True:
+                event.clear()
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                sleep_for = remaining
+                if self._is_head(entry):
+                    retry_in = try_acquire()
+                    if retry_in is None:
+                        return True
+                    sleep_for = min(retry_in, remaining)
+                event.wait(sleep_for)
+        finally:
+            self._leave(entry)
+
+    async def wait_async(self, try_acquire: Callable[[], Optional[float]], timeout: float,
+                         priority: float = 0) -> bool:
+        """wait() for the event loop."""
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+
+        def waker():
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass  # Loop already closed
+
+        entry = self._enter(priority, waker)
+        deadline = time.time() + timeout
+        try:
+            while True:
+                event.clear()
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                sleep_for = remaining
+                if self._is_head(entry):
+                    retry_in = try_acquire()
+                    if retry_in is None:
+                        return True
+                    sleep_for = min(retry_in, remaining)
+                try:
+                    await asyncio.wait_for(event.wait(), sleep_for)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._leave(entry)
+
+
 # AICODE-NOTE: Global rate limiter for Gonka nodes
 # Optimization B: Adaptive min_interval based on available nodes count
 class NodeRateLimiter:
-    """Thread-safe rate limiter for Gonka nodes with adaptive intervals."""
+    """
+    Thread-safe rate limiter for Gonka nodes with adaptive intervals.
+
+    AICODE-NOTE: Per-node concurrency limits are learned with AIMD. Every node
+    starts at max_concurrent_per_node. A success while the node was using at
+    least half its limit adds 1/limit (about +1 per limit's worth of calls).
+    A failure (502/503/504, timeout) halves the limit, and a completion much
+    slower than the node's usual latency cuts it by 20%. Limits stay within
+    [MIN_LIMIT, MAX_LIMIT], so a node that keeps up with more work gets more,
+    and a node whose vLLM queue fills up gets less.
+    """
+
+    MIN_LIMIT = 1.0
+    MAX_LIMIT = 8.0
+    LATENCY_SPIKE_FACTOR = 3.0  # Completion slower than this x node baseline = overload signal
 
     def __init__(self, min_interval: float = 0.2, max_concurrent_per_node: int = 3):
         self._lock = threading.Lock()
@@ -275,8 +444,69 @@ class NodeRateLimiter:
         self._active_requests: Dict[str, int] = {}
         self._base_min_interval = min_interval
         self._max_concurrent = max_concurrent_per_node
+        self._limits: Dict[str, float] = {}     # node -> learned concurrency limit
+        self._baselines: Dict[str, float] = {}  # node -> slow EWMA of completion time
+        self._queues: Dict[str, FairWaitQueue] = {}
         self._available_nodes_count = 0
 
+    def _queue(self, node: str) -> FairWaitQueue:
+        with self._lock:
+            queue = self._queues.get(node)
+            if queue is None:
+                queue = self._queues[node] = FairWaitQueue()
+            return queue
+
+    def _limit(self, node: str) -> float:
+        """Current limit for a node. Caller holds the lock."""
+        return self._limits.get(node, float(self._max_concurrent))
+
+    def on_success(self, node: str, response_time: float):
+        """
+        AIMD feedback: a completion on node took response_time seconds.
+
+        Call after the request released its slot (main path, hedge and
+        detached primary alike): active then counts the other requests in
+        flight, and +1 adds the one that just finished.
+        """
+        with self._lock:
+            limit = self._limit(node)
+            baseline = self._baselines.get(node)
+            if baseline is not None and response_time > baseline * self.LATENCY_SPIKE_FACTOR:
+                self._limits[node] = max(self.MIN_LIMIT, limit * 0.8)
+            elif self._active_requests.get(node, 0) + 1 >= limit / 2:
+                # Only grow a limit that is actually being used
+                self._limits[node] = min(self.MAX_LIMIT, limit + 1.0 / limit)
+            self._baselines[node] = response_time if baseline is None else baseline * 0.9 + response_time * 0.1
+
+    def on_overload(self, node: str):
+        """AIMD feedback: node failed in a way that suggests it is saturated."""
+        with self._lock:
+            limit = self._limit(node)
+            self._limits[node] = max(self.MIN_LIMIT, limit / 2)
+        if limit >= 2:
+            print(f"{CLI_YELLOW}📉 Concurrency limit for {node.split('//')[-1]}: "
+                  f"{limit:.1f} -> {self._limits[node]:.1f}{CLI_CLR}")
+
+    def is_overloaded(self, node: str) -> bool:
+        """Node is at its concurrency limit and requests are already queued for it."""
+        with self._lock:
+            full = self._active_requests.get(node, 0) >= int(self._limit(node))
+            queue = self._queues.get(node)
+        return full and queue is not None and queue.waiting > 0
+
+    def get_limits(self) -> Dict[str, Dict[str, float]]:
+        """Live per-node metrics: learned limit, in-flight requests, latency baseline."""
+        with self._lock:
+            nodes = set(self._limits) | {n for n, a in self._active_requests.items() if a}
+            return {
+                node: {
+                    "limit": self._limit(node),
+                    "active": self._active_requests.get(node, 0),
+                    "baseline_sec": self._baselines.get(node),
+                }
+                for node in nodes
+            }
+
     def set_available_nodes_count(self, count: int):
         """Update node count for adaptive interval calculation."""
         with self._lock:
@@ -291,33 +521,54 @@ class NodeRateLimiter:
             return 0.15
         return self._base_min_interval
 
-    def acquire(self, node: str) -> bool:
+    def _try_acquire(self, node: str) -> Optional[float]:
+        """
+        Take a slot on node if the limit and min interval allow.
+
+        Returns:
+            None if taken, else seconds until a retry makes sense
+            (inf when the node is full: wait for a release)
+        """
         with self._lock:
             now = time.time()
             active = self._active_requests.get(node, 0)
-            if active >= self._max_concurrent:
-                return False
+            if active >= int(self._limit(node)):
+                return float('inf')
             last_time = self._last_request_time.get(node, 0)
             min_interval = self._get_adaptive_interval()
             if now - last_time < min_interval:
-                return False
+                return min_interval - (now - last_time)
             self._active_requests[node] = active + 1
             self._last_request_time[node] = now
-            return True
+            return None
+
+    def acquire(self, node: str) -> bool:
+        """Take a slot without waiting (never ahead of queued waiters)."""
+        if self._queue(node).waiting:
+            return False
+        return self._try_acquire(node) is None
 
     def release(self, node: str):
         with self._lock:
             active = self._active_requests.get(node, 0)
             if active > 0:
                 self._active_requests[node] = active - 1
+            queue = self._queues.get(node)
+        if queue is not None:
+            queue.wake_head()
 
-    def wait_for_slot(self, node: str, timeout: float = 5.0) -> bool:
-        start = time.time()
-        while time.time() - start < timeout:
-            if self.acquire(node):
-                return True
-            time.sleep(0.05 + random.random() * 0.1)
-        return False
+    def wait_for_slot(self, node: str, timeout: float = 5.0, priority: float = 0) -> bool:
+        started = time.time()
+        acquired = self._queue(node).wait(lambda: self._try_acquire(node), timeout, priority)
+        _note_queue_wait(time.time() - started)
+        return acquired
+
+    async def wait_for_slot_async(self, node: str, timeout: float = 5.0, priority: float = 0) -> bool:
+        """wait_for_slot() for the event loop (same per-node queue)."""
+        started = time.time()
+        acquired = await self._queue(node).wait_async(lambda: self._try_acquire(node), timeout, priority)
+        _note_queue_wait(time.time() - started)
+        return acquired
 
 
 _node_rate_limiter = NodeRateLimiter()
@@ -331,57 +582,107 @@ class TrafficController:
     """
     Central traffic controller. Manages global RPM (100).
     Uses Token Bucket algorithm with smooth refill to prevent bursting.
+
+    The refill rate adapts (AIMD): a 429 cuts rpm_limit by 30% (not below
+    min_rpm), each success adds 0.5 RPM back up to max_rpm.
     """
 
-    def __init__(self, max_rpm: int = 90):  # 90 to leave safety margin
-        self.rpm_limit = max_rpm
+    def __init__(self, max_rpm: int = 90, min_rpm: int = 20):  # 90 to leave safety margin
+        self.max_rpm = max_rpm
+        self.min_rpm = min_rpm
+        self.rpm_limit = float(max_rpm)
         self.tokens_bucket = float(max_rpm)  # Start full
         self.last_refill = time.time()
         self._lock = threading.RLock()
-        self._wait_count = 0  # Stats: how many times we had to wait
+        self._wait_count = 0  # Stats: how many wait_for_token calls had to wait
+        self._queue = FairWaitQueue()
 
-    def wait_for_token(self, timeout: float = 120.0) -> bool:
+    def _try_take(self) -> Optional[float]:
         """
-        Token Bucket algorithm for respecting 100 RPM.
-
-        Refills tokens continuously (rpm_limit tokens per 60 seconds).
-        If no tokens available, waits until one is available.
+        Refill the bucket and take one token if available.
 
         Returns:
-            True if token acquired, False if timeout exceeded.
+            None if a token was taken, else seconds until one will be available
         """
-        start_wait = time.time()
+        with self._lock:
+            now = time.time()
+            # Refill tokens: add (elapsed_time / 60) * rpm_limit tokens
+            elapsed = now - self.last_refill
+            refill_amount = (elapsed / 60.0) * self.rpm_limit
+            self.tokens_bucket = min(self.rpm_limit, self.tokens_bucket + refill_amount)
+            self.last_refill = now
+
+            if self.tokens_bucket >= 1.0:
+                self.tokens_bucket -= 1.0
+                return None
 
-        while True:
-            with self._lock:
-                now = time.time()
-                # Refill tokens: add (elapsed_time / 60) * rpm_limit tokens
-                elapsed = now - self.last_refill
-                refill_amount = (elapsed / 60.0) * self.rpm_limit
-                self.tokens_bucket = min(self.rpm_limit, self.tokens_bucket + refill_amount)
-                self.last_refill = now
-
-                if self.tokens_bucket >= 1.0:
-                    self.tokens_bucket -= 1.0
-                    return True
+            # Calculate wait time for 1 token
+            tokens_needed = 1.0 - self.tokens_bucket
+            return (tokens_needed / self.rpm_limit) * 60.0
 
-                # Calculate wait time for 1 token
-                tokens_needed = 1.0 - self.tokens_bucket
-                wait_time = (tokens_needed / self.rpm_limit) * 60.0
+    def _note_wait(self, wait_time: float):
+        """Count a wait; log the first one and every 10th."""
+        with self._lock:
+            self._wait_count += 1
+            if self._wait_count == 1 or self._wait_count % 10 == 0:
+                print(f"{CLI_CYAN}⏳ TrafficController: rate limit reached, waiting {wait_time:.1f}s...{CLI_CLR}")
 
-            # Check timeout
-            if time.time() - start_wait + wait_time > timeout:
-                print(f"{CLI_YELLOW}⚠ TrafficController: timeout waiting for token{CLI_CLR}")
-                return False
+    def _take_or_wait(self) -> Callable[[], Optional[float]]:
+        """
+        try_acquire for one wait_for_token call.
 
-            # First time waiting? Log it
-            with self._lock:
-                self._wait_count += 1
-                if self._wait_count == 1 or self._wait_count % 10 == 0:
-                    print(f"{CLI_CYAN}⏳ TrafficController: rate limit reached, waiting {wait_time:.1f}s...{CLI_CLR}")
+        The queue calls it again on every head retry; only the first miss
+        is counted, so wait_count is the number of calls that had to wait.
+        """
+        noted = False
+
+        def take() -> Optional[float]:
+            nonlocal noted
+            wait_time = self._try_take()
+            if wait_time is not None and not noted:
+                noted = True
+                self._note_wait(wait_time)
+            return wait_time
+
+        return take
+
+    def wait_for_token(self, timeout: float = 120.0, priority: float = 0) -> bool:
+        """
+        Token Bucket algorithm for respecting 100 RPM.
+
+        Refills tokens continuously (rpm_limit tokens per 60 seconds).
+        If no tokens available, queues (FairWaitQueue) until one is.
+
+        Returns:
+            True if token acquired, False if timeout exceeded.
+        """
+        started = time.time()
+        acquired = self._queue.wait(self._take_or_wait(), timeout, priority)
+        _note_queue_wait(time.time() - started)
+        if not acquired:
+            print(f"{CLI_YELLOW}⚠ TrafficController: timeout waiting for token{CLI_CLR}")
+        return acquired
+
+    async def wait_for_token_async(self, timeout: float = 120.0, priority: float = 0) -> bool:
+        """
+        Same token bucket as wait_for_token(), but waits on the event loop.
 
-            # Wait with small random jitter to prevent thundering herd
-            time.sleep(wait_time + random.random() * 0.1)
+        AICODE-NOTE: Shares bucket state and wait queue with the sync path, so
+        threaded and async callers in one process stay under the same
+        GonkaGate RPM and are served in one order.
+        """
+        started = time.time()
+        acquired = await self._queue.wait_async(self._take_or_wait(), timeout, priority)
+        _note_queue_wait(time.time() - started)
+        if not acquired:
+            print(f"{CLI_YELLOW}⚠ TrafficController: timeout waiting for token{CLI_CLR}")
+        return acquired
+
+    def try_acquire(self) -> bool:
+        """Take a token only if one is available right now and nobody is queued."""
+        if self._queue.waiting:
+            return False
+        return self._try_take() is None
 
     def record_429_error(self):
         """
@@ -389,9 +690,16 @@ class TrafficController:
         Reduce tokens to slow down further.
         """
         with self._lock:
-            # Halve remaining tokens to back off
+            # Halve remaining tokens to back off, and refill slower from now on
             self.tokens_bucket = max(0, self.tokens_bucket / 2)
-            print(f"{CLI_YELLOW}⚡ TrafficController: 429 received, backing off (bucket: {self.tokens_bucket:.1f}){CLI_CLR}")
+            self.rpm_limit = max(self.min_rpm, self.rpm_limit * 0.7)
+            print(f"{CLI_YELLOW}⚡ TrafficController: 429 received, backing off "
+                  f"(bucket: {self.tokens_bucket:.1f}, rpm: {self.rpm_limit:.0f}){CLI_CLR}")
+
+    def record_success(self):
+        """Additive increase of the refill rate after a completed request."""
+        with self._lock:
+            self.rpm_limit = min(self.max_rpm, self.rpm_limit + 0.5)
 
     def get_stats(self) -> dict:
         """Return current stats for debugging."""
@@ -399,6 +707,7 @@ class TrafficController:
             return {
                 "tokens": self.tokens_bucket,
                 "rpm_limit": self.rpm_limit,
+                "max_rpm": self.max_rpm,
                 "wait_count": self._wait_count
             }
 
@@ -436,11 +745,14 @@ class TopologyManager:
             return
 
         self._running = True
-        # First refresh is synchronous to have nodes immediately
-        self._refresh_topology()
+        # First refresh is synchronous to have nodes immediately,
+        # unless a restored node list is already there (refresh it in the background)
+        restored = self.get_node_count() > 0
+        if not restored:
+            self._refresh_topology()
 
         # Start background refresh
-        self._update_thread = threading.Thread(target=self._loop, daemon=True)
+        self._update_thread = threading.Thread(target=self._loop, args=(restored,), daemon=True)
         self._update_thread.start()
         print(f"{CLI_CYAN}📡 TopologyManager started (refresh every {self.refresh_interval}s){CLI_CLR}")
 
@@ -462,8 +774,24 @@ class TopologyManager:
         with self._lock:
             return len(self._nodes)
 
-    def _loop(self):
+    def export_state(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"nodes": list(self._nodes), "updated_at": self._last_update}
+
+    def import_state(self, nodes: List[str], updated_at: float):
+        """Seed the node list saved by a previous run."""
+        with self._lock:
+            if not self._nodes and nodes:
+                self._nodes = list(nodes)
+                self._last_update = updated_at
+
+    def _loop(self, refresh_first: bool = False):
         """Background refresh loop."""
+        if refresh_first:
+            try:
+                self._refresh_topology()
+            except Exception as e:
+                print(f"{CLI_YELLOW}⚠ Topology background update failed: {e}{CLI_CLR}")
         while self._running:
             # Sleep in small intervals to allow clean shutdown
             for _ in range(self.refresh_interval):
@@ -486,8 +814,7 @@ class TopologyManager:
         for source in sources[:3]:
             try:
                 url = f"{source}/v1/epochs/current/participants"
-                import requests
-                resp = requests.get(url, timeout=5)  # Short timeout for discovery
+                resp = get_shared_session().get(url, timeout=5)  # Short timeout for discovery
                 if resp.status_code != 200:
                     continue
 
@@ -525,13 +852,30 @@ _topology_manager = TopologyManager()
 
 # AICODE-NOTE: Optimization A - Round-robin node assignment for thread distribution
 # AICODE-NOTE: Optimization C - Preconnect warming at startup
+def _percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list (pct in 0..1)."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(pct * len(ordered)))]
+
+
 class NodePool:
     """
     Thread-safe pool of Gonka nodes with performance tracking.
     Tracks successful nodes and their response times.
     Supports round-robin assignment and preconnect warming.
+
+    AICODE-NOTE: Each node keeps a rolling window of its last WINDOW
+    completion times (p50/p90/p99) and of its last WINDOW outcomes (error
+    rate). Selection ranks nodes by _score(): success ratio over p90 latency,
+    decayed by time since the node last answered. A node with a fat tail
+    ranks below a consistently fast one even if their averages match.
+    avg_response_time (EMA) and success_count are still kept for display.
     """
 
+    WINDOW = 50               # Samples kept per node (latencies and outcomes)
+    SCORE_HALF_LIFE = 300.0   # Seconds for a node's score to halve without a success
+    MAX_IDLE = 600.0          # Nodes silent for longer are not ranked at all
+
     def __init__(self, blacklist_duration: float = 60.0):
         self._lock = threading.Lock()
         self._good_nodes: Dict[str, Dict] = {}
@@ -539,43 +883,72 @@ class NodePool:
         self._blacklist_duration = blacklist_duration
         self._warmed_nodes: List[str] = []  # Optimization C: preconnected nodes
         self._assignment_counter = 0  # Optimization A: for round-robin
+        self._recent_times = deque(maxlen=200)  # Completion times across all nodes (hedging)
+
+    def _new_stats(self, response_time: float, now: float) -> Dict:
+        return {
+            "avg_response_time": response_time,
+            "success_count": 0,
+            "last_success": now,
+            "latencies": deque(maxlen=self.WINDOW),
+            "outcomes": deque(maxlen=self.WINDOW),  # True = success
+            "last_error": "",
+        }
 
     def record_success(self, node: str, response_time: float):
         with self._lock:
             now = time.time()
-            if node in self._good_nodes:
-                stats = self._good_nodes[node]
-                stats["avg_response_time"] = stats["avg_response_time"] * 0.7 + response_time * 0.3
-                stats["success_count"] += 1
-                stats["last_success"] = now
+            self._recent_times.append(response_time)
+            stats = self._good_nodes.get(node)
+            if stats is None:
+                stats = self._good_nodes[node] = self._new_stats(response_time, now)
             else:
-                self._good_nodes[node] = {
-                    "avg_response_time": response_time,
-                    "success_count": 1,
-                    "last_success": now
-                }
+                stats["avg_response_time"] = stats["avg_response_time"] * 0.7 + response_time * 0.3
+            stats["success_count"] += 1
+            stats["last_success"] = now
+            stats["latencies"].append(response_time)
+            stats["outcomes"].append(True)
             self._blacklist.pop(node, None)
 
-    def record_failure(self, node: str):
+    def record_failure(self, node: str, reason: str = ""):
         with self._lock:
             self._blacklist[node] = time.time() + self._blacklist_duration
-            if node in self._good_nodes:
-                self._good_nodes[node]["success_count"] = max(0, self._good_nodes[node]["success_count"] - 5)
+            stats = self._good_nodes.get(node)
+            if stats is not None:
+                stats["success_count"] = max(0, stats["success_count"] - 5)
+                stats["outcomes"].append(False)
+                stats["last_error"] = reason[:80]
+
+    def _tail_latency(self, stats: Dict) -> float:
+        """p90 of the latency window, falling back to the EMA."""
+        if stats["latencies"]:
+            return _percentile(stats["latencies"], 0.9)
+        return stats["avg_response_time"]
+
+    def _score(self, stats: Dict, now: float) -> float:
+        """Higher is better. Caller holds the lock."""
+        outcomes = stats["outcomes"]
+        success_ratio = sum(outcomes) / len(outcomes) if outcomes else 1.0
+        decay = 0.5 ** ((now - stats["last_success"]) / self.SCORE_HALF_LIFE)
+        return success_ratio * decay / max(0.1, self._tail_latency(stats))
+
+    def _ranked(self, now: float, count: int) -> List[str]:
+        """Best non-blacklisted, recently seen nodes. Caller holds the lock."""
+        candidates = []
+        for node, stats in self._good_nodes.items():
+            if now < self._blacklist.get(node, 0):
+                continue
+            if now - stats["last_success"] > self.MAX_IDLE:
+                continue
+            candidates.append((node, self._score(stats, now)))
+        candidates.sort(key=lambda x: x[1], reverse=True)
+        return [node for node, _ in candidates[:count]]
 
     def get_best_nodes(self, count: int = 5) -> List[str]:
         with self._lock:
             now = time.time()
             self._blacklist = {n: t for n, t in self._blacklist.items() if t > now}
-            candidates = []
-            for node, stats in self._good_nodes.items():
-                if node in self._blacklist:
-                    continue
-                if now - stats["last_success"] > 600:
-                    continue
-                score = stats["success_count"] / max(0.1, stats["avg_response_time"])
-                candidates.append((node, score))
-            candidates.sort(key=lambda x: x[1], reverse=True)
-            return [node for node, _ in candidates[:count]]
+            return self._ranked(now, count)
 
     def get_random_good_node(self) -> Optional[str]:
         best = self.get_best_nodes(count=5)
@@ -593,17 +966,8 @@ class NodePool:
                     idx = self._assignment_counter % len(available)
                     self._assignment_counter += 1
                     return available[idx]
-            # Fallback to best nodes (get_best_nodes would cause deadlock, inline logic)
-            candidates = []
-            for node, stats in self._good_nodes.items():
-                if node in self._blacklist and self._blacklist[node] > now:
-                    continue
-                if now - stats["last_success"] > 600:
-                    continue
-                score = stats["success_count"] / max(0.1, stats["avg_response_time"])
-                candidates.append((node, score))
-            candidates.sort(key=lambda x: x[1], reverse=True)
-            best = [node for node, _ in candidates[:10]]
+            # Fallback to best nodes (get_best_nodes would cause deadlock, use _ranked)
+            best = self._ranked(now, 10)
             if best:
                 idx = self._assignment_counter % len(best)
                 self._assignment_counter += 1
@@ -616,7 +980,7 @@ class NodePool:
 
         Pick 2 random nodes from available pool, choose the one with:
         1. Lower current active requests
-        2. If tied, better historical latency
+        2. If tied, better score (tail latency and error rate)
 
         P2C is mathematically proven to work better than round-robin
         for heterogeneous systems (different GPUs, network speeds).
@@ -650,10 +1014,12 @@ class NodePool:
             elif load2 < load1:
                 return n2
             else:
-                # If tied, choose node with better historical latency
-                stats1 = self._good_nodes.get(n1, {"avg_response_time": 10})
-                stats2 = self._good_nodes.get(n2, {"avg_response_time": 10})
-                return n1 if stats1["avg_response_time"] <= stats2["avg_response_time"] else n2
+                # If tied, choose node with better score; unknown nodes score as a 10s node
+                default = 1.0 / 10
+                stats1, stats2 = self._good_nodes.get(n1), self._good_nodes.get(n2)
+                score1 = self._score(stats1, now) if stats1 else default
+                score2 = self._score(stats2, now) if stats2 else default
+                return n1 if score1 >= score2 else n2
 
     def warmup_nodes(self, nodes: List[str], max_nodes: int = 5) -> List[str]:
         """Optimization C: Ping nodes to measure latency, store best ones."""
@@ -662,8 +1028,7 @@ class NodePool:
         def ping_node(node: str) -> tuple:
             try:
                 start = time.time()
-                import requests
-                resp = requests.get(f"{node}/v1/models", timeout=5)
+                resp = get_shared_session().get(f"{node}/v1/models", timeout=5)
                 latency = time.time() - start
                 if resp.status_code == 200:
                     return (node, latency)
@@ -691,11 +1056,10 @@ class NodePool:
             # Pre-populate good_nodes with initial latency
             for node, latency in results[:max_nodes]:
                 if node not in self._good_nodes:
-                    self._good_nodes[node] = {
-                        "avg_response_time": latency,
-                        "success_count": 1,
-                        "last_success": time.time()
-                    }
+                    stats = self._new_stats(latency, time.time())
+                    stats["success_count"] = 1
+                    stats["latencies"].append(latency)
+                    self._good_nodes[node] = stats
 
         return warmed
 
@@ -703,12 +1067,265 @@ class NodePool:
         with self._lock:
             return time.time() < self._blacklist.get(node, 0)
 
+    def export_state(self) -> Dict[str, Any]:
+        """JSON-serializable node stats, blacklist and warmed list."""
+        with self._lock:
+            return {
+                "nodes": {
+                    node: {
+                        "avg_response_time": stats["avg_response_time"],
+                        "success_count": stats["success_count"],
+                        "last_success": stats["last_success"],
+                        "latencies": list(stats["latencies"]),
+                        "outcomes": list(stats["outcomes"]),
+                        "last_error": stats["last_error"],
+                    }
+                    for node, stats in self._good_nodes.items()
+                },
+                "blacklist": dict(self._blacklist),
+                "warmed": list(self._warmed_nodes),
+            }
+
+    def import_state(self, data: Dict[str, Any], max_age: float) -> int:
+        """
+        Seed the pool from export_state() output of a previous run.
+
+        Nodes whose last success is older than max_age and expired
+        blacklist entries are dropped; nodes already known are kept as is.
+
+        Returns:
+            Number of nodes restored
+        """
+        now = time.time()
+        restored = 0
+        with self._lock:
+            for node, saved in data.get("nodes", {}).items():
+                if node in self._good_nodes or now - saved.get("last_success", 0) > max_age:
+                    continue
+                stats = self._new_stats(saved["avg_response_time"], saved["last_success"])
+                stats["success_count"] = saved.get("success_count", 0)
+                stats["latencies"].extend(saved.get("latencies", []))
+                stats["outcomes"].extend(saved.get("outcomes", []))
+                stats["last_error"] = saved.get("last_error", "")
+                self._good_nodes[node] = stats
+                restored += 1
+            for node, until in data.get("blacklist", {}).items():
+                if until > now:
+                    self._blacklist[node] = max(until, self._blacklist.get(node, 0))
+            if not self._warmed_nodes:
+                self._warmed_nodes = [n for n in data.get("warmed", []) if n in self._good_nodes]
+        return restored
+
+    def hedge_deadline(self, node: str, percentile: float, min_delay: float,
+                       min_samples: int = 20) -> Optional[float]:
+        """
+        Seconds to wait on `node` before firing a hedged request.
+
+        The given percentile of the node's own latency window once it has
+        min_samples completions, else of recent completion times across all
+        nodes, else twice the node's avg_response_time. Never below min_delay.
+
+        Returns:
+            Deadline in seconds, or None if nothing is known yet (don't hedge)
+        """
+        with self._lock:
+            stats = self._good_nodes.get(node)
+            own = list(stats["latencies"]) if stats else []
+            pooled = list(self._recent_times)
+            node_avg = stats["avg_response_time"] if stats else None
+        if len(own) >= min_samples:
+            deadline = _percentile(own, percentile)
+        elif len(pooled) >= min_samples:
+            deadline = _percentile(pooled, percentile)
+        elif node_avg:
+            deadline = node_avg * 2
+        else:
+            return None
+        return max(min_delay, deadline)
+
+    def node_table(self) -> List[Dict[str, Any]]:
+        """
+        Snapshot of every known node, best score first.
+
+        One dict per node with latency percentiles, error rate over the
+        window, score, blacklist time left and the last recorded error -
+        enough to see why a node was picked or skipped.
+        """
+        with self._lock:
+            now = time.time()
+            rows = []
+            for node in set(self._good_nodes) | set(self._blacklist):
+                stats = self._good_nodes.get(node)
+                latencies = list(stats["latencies"]) if stats else []
+                outcomes = stats["outcomes"] if stats else ()
+                rows.append({
+                    "node": node,
+                    "samples": len(latencies),
+                    "p50": _percentile(latencies, 0.5) if latencies else None,
+                    "p90": _percentile(latencies, 0.9) if latencies else None,
+                    "p99": _percentile(latencies, 0.99) if latencies else None,
+                    "error_rate": (outcomes.count(False) / len(outcomes)) if outcomes else 0.0,
+                    "score": self._score(stats, now) if stats else 0.0,
+                    "idle_sec": now - stats["last_success"] if stats else None,
+                    "blacklisted_sec": max(0.0, self._blacklist.get(node, 0) - now),
+                    "last_error": stats["last_error"] if stats else "",
+                })
+        rows.sort(key=lambda r: r["score"], reverse=True)
+        return rows
+
+    def format_table(self, top: int = 15) -> List[str]:
+        """node_table() as printable lines."""
+        def fmt(value: Optional[float]) -> str:
+            return f"{value:6.1f}s" if value is not None else "      -"
+
+        limits = _node_rate_limiter.get_limits()
+        lines = []
+        for row in self.node_table()[:top]:
+            limit = limits.get(row["node"])
+            line = (f"{row['node'].split('//')[-1]:<28} n={row['samples']:<3} "
+                    f"p50 {fmt(row['p50'])} p90 {fmt(row['p90'])} p99 {fmt(row['p99'])}  "
+                    f"err {row['error_rate']:.0%}  score {row['score']:.3f}")
+            if limit:
+                line += f"  limit {limit['limit']:.1f}"
+            if row["blacklisted_sec"] > 0:
+                line += f"  BLACKLISTED {row['blacklisted_sec']:.0f}s"
+            if row["last_error"]:
+                line += f"  ({row['last_error']})"
+            lines.append(line)
+        return lines
+
 
 _node_pool = NodePool(blacklist_duration=60.0)
+
+
+class HedgeStats:
+    """Thread-safe counters for hedged Gonka requests."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0          # Calls eligible for hedging (a deadline was known)
+        self.fired = 0          # Hedge requests actually sent
+        self.hedge_wins = 0     # Hedge answered first
+        self.primary_wins = 0   # Primary answered first after the hedge was sent
+        self.skipped = 0        # Deadline passed, but no token/node/slot for a hedge
+
+    def add(self, field_name: str):
+        with self._lock:
+            setattr(self, field_name, getattr(self, field_name) + 1)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "fired": self.fired,
+                "hedge_wins": self.hedge_wins,
+                "primary_wins": self.primary_wins,
+                "skipped": self.skipped,
+            }
+
+
+_hedge_stats = HedgeStats()
+
+
+def get_hedge_stats() -> dict:
+    """Hedged request counters for the session report."""
+    return _hedge_stats.get_stats()
+
+
+def get_concurrency_stats() -> dict:
+    """Live AIMD state: gateway RPM and per-node concurrency limits."""
+    return {
+        "gateway": _traffic_controller.get_stats(),
+        "nodes": _node_rate_limiter.get_limits(),
+    }
+
+
+def get_node_table_lines(top: int = 15) -> List[str]:
+    """Gonka node table for the session report."""
+    return _node_pool.format_table(top)
+
+
 _warmup_done = False
 _warmup_lock = threading.Lock()
 
 
+# AICODE-NOTE: Node state file. Node stats, blacklist, per-node clock offsets
+# and the last topology survive a restart, so a new run skips the blocking
+# topology fetch and warmup pings and signs requests with known offsets from
+# the start. Everything is re-validated in the background; stale parts (older
+# than their TTL) are ignored. Written on exit.
+_NODE_STATE_VERSION = 1
+_state_lock = threading.Lock()
+
+
+def save_node_state():
+    """Write node stats, blacklist, clock offsets and topology to config.NODE_STATE_FILE."""
+    if not config.NODE_STATE_FILE:
+        return
+    state = {
+        "version": _NODE_STATE_VERSION,
+        "saved_at": time.time(),
+        "model": _topology_manager.model_filter,
+        "pool": _node_pool.export_state(),
+        "offsets": _offset_manager.export_state(),
+        "ntp_offset": _ntp_sync.offset,
+        "topology": _topology_manager.export_state(),
+    }
+    tmp_path = f"{config.NODE_STATE_FILE}.tmp"
+    try:
+        with _state_lock:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, config.NODE_STATE_FILE)
+    except OSError as e:
+        print(f"{CLI_YELLOW}⚠ Failed to save node state: {e}{CLI_CLR}")
+
+
+def load_node_state() -> bool:
+    """
+    Seed NodePool, NodeOffsetManager and TopologyManager from the state file.
+
+    Returns:
+        True if a fresh topology with at least one usable node was restored
+        (startup can then skip the blocking refresh and warmup)
+    """
+    if not config.NODE_STATE_FILE or not os.path.exists(config.NODE_STATE_FILE):
+        return False
+    try:
+        with open(config.NODE_STATE_FILE, encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"{CLI_YELLOW}⚠ Ignoring unreadable node state: {e}{CLI_CLR}")
+        return False
+    if state.get("version") != _NODE_STATE_VERSION or state.get("model") != _topology_manager.model_filter:
+        return False
+
+    age = time.time() - state.get("saved_at", 0)
+    if age > config.NODE_STATE_TTL_SEC:
+        return False
+    restored = _node_pool.import_state(state.get("pool", {}), max_age=config.NODE_STATE_TTL_SEC)
+    _offset_manager.import_state(state.get("offsets", {}))
+    # Per-node offsets were learned on the NTP-corrected clock; apply the last
+    # NTP correction until the background sync replaces it
+    if state.get("ntp_offset"):
+        _ntp_sync.apply_offset(state["ntp_offset"])
+
+    topology = state.get("topology", {})
+    if time.time() - topology.get("updated_at", 0) > config.NODE_STATE_TOPOLOGY_TTL_SEC:
+        return False
+    _topology_manager.import_state(topology.get("nodes", []), topology["updated_at"])
+    print(f"{CLI_CYAN}💾 Restored node state from {age:.0f}s ago: {restored} scored nodes, "
+          f"{len(topology.get('nodes', []))} in topology{CLI_CLR}")
+    return restored > 0 and _topology_manager.get_node_count() > 0
+
+
+def _warm_in_background(nodes: List[str]):
+    try:
+        _node_pool.warmup_nodes(nodes, max_nodes=8)
+    except Exception:
+        pass  # Restored stats are still usable
+
+
 def warmup_gonka_nodes():
     """Optimization C: Warmup nodes at startup for faster first requests."""
     global _warmup_done
@@ -720,13 +1337,15 @@ def warmup_gonka_nodes():
     # Patch SDK for ACSC (Adaptive Clock Skew Compensation)
     _patch_gonka_sdk()
 
+    restored = load_node_state()
+    atexit.register(save_node_state)
+
     # Start periodic NTP sync to prevent "signature is too old" errors
-    _ntp_sync.start()
+    _ntp_sync.start(background=restored)
 
     # Start TopologyManager for background node discovery
     _topology_manager.start()
 
-    print(f"{CLI_CYAN}🔥 Warming up Gonka nodes...{CLI_CLR}")
     # Get nodes from TopologyManager (or fallback to direct fetch)
     nodes = _topology_manager.get_nodes()
     if not nodes:
@@ -735,6 +1354,12 @@ def warmup_gonka_nodes():
 
     _node_rate_limiter.set_available_nodes_count(len(nodes))
 
+    if restored:
+        # Known-good nodes are ready; re-measure them without blocking the first request
+        threading.Thread(target=_warm_in_background, args=(nodes,), daemon=True).start()
+        return
+
+    print(f"{CLI_CYAN}🔥 Warming up Gonka nodes...{CLI_CLR}")
     warmed = _node_pool.warmup_nodes(nodes, max_nodes=8)
     if warmed:
         print(f"{CLI_CYAN}✓ Warmed {len(warmed)} nodes: {', '.join(n.split('/')[-1] for n in warmed[:3])}...{CLI_CLR}")
@@ -742,8 +1367,107 @@ def warmup_gonka_nodes():
         print(f"{CLI_YELLOW}⚠ No nodes responded to warmup{CLI_CLR}")
 
 
+def _stream_kwargs() -> dict:
+    """Extra chat.completions.create() arguments for a streamed call."""
+    return {"stream": True, "stream_options": {"include_usage": True}}
+
+
+def _cached_prompt_tokens(usage: Any) -> int:
+    """
+    Prompt tokens served from the backend's prefix cache.
+
+    Reads the OpenAI-style usage.prompt_tokens_details.cached_tokens, which
+    OpenRouter and vLLM (with prompt token details enabled) report. Works on
+    usage objects and plain dicts; 0 when absent.
+    """
+    details = usage.get("prompt_tokens_details") if isinstance(usage, dict) else getattr(usage, "prompt_tokens_details", None)
+    if not details:
+        return 0
+    cached = details.get("cached_tokens") if isinstance(details, dict) else getattr(details, "cached_tokens", None)
+    return cached or 0
+
+
+def _notify(listener: Any, method: str, *args):
+    """Call a stream listener hook; a failing listener must not break generation."""
+    try:
+        getattr(listener, method)(*args)
+    except Exception as e:
+        print(f"{CLI_YELLOW}⚠ Stream listener {method} failed: {e}{CLI_CLR}")
+
+
+class _StreamAccumulator:
+    """
+    Collects streamed chat.completion chunks and forwards text deltas.
+
+    result() returns an object shaped like a non-streamed ChatCompletion
+    (choices[0].message.content, choices[0].finish_reason, usage, model),
+    so the response handling after the call stays the same.
+    """
+
+    def __init__(self, listener: Any):
+        self._listener = listener
+        self._parts: List[str] = []
+        self._usage = None
+        self._model = None
+        self._finish_reason = None
+
+    def add(self, chunk: Any):
+        self._model = getattr(chunk, "model", None) or self._model
+        if getattr(chunk, "usage", None):
+            self._usage = chunk.usage
+        for choice in getattr(chunk, "choices", None) or []:
+            delta = getattr(getattr(choice, "delta", None), "content", None)
+            if delta:
+                self._parts.append(delta)
+                _notify(self._listener, "on_delta", delta)
+            if getattr(choice, "finish_reason", None):
+                self._finish_reason = choice.finish_reason
+
+    def result(self) -> Any:
+        message = SimpleNamespace(content="".join(self._parts))
+        choice = SimpleNamespace(message=message, finish_reason=self._finish_reason)
+        return SimpleNamespace(choices=[choice], usage=self._usage, model=self._model)
+
+
+def _consume_stream(stream: Any, listener: Any) -> Any:
+    """Drain a sync completion stream into a ChatCompletion-shaped object."""
+    acc = _StreamAccumulator(listener)
+    for chunk in stream:
+        acc.add(chunk)
+    return acc.result()
+
+
+async def _aconsume_stream(stream: Any, listener: Any) -> Any:
+    """Drain an async completion stream into a ChatCompletion-shaped object."""
+    acc = _StreamAccumulator(listener)
+    async for chunk in stream:
+        acc.add(chunk)
+    return acc.result()
+
+
 class GonkaChatModel(BaseChatModel):
-    """LangChain ChatModel wrapper for Gonka Network with automatic node failover."""
+    """
+    LangChain ChatModel wrapper for Gonka Network with automatic node failover.
+
+    Passing stream_listener=<obj> to generate()/agenerate() streams the
+    completion: obj.on_delta(text) gets every text delta, obj.on_reset() is
+    called before each retry (text seen so far is void). The returned
+    ChatResult is the same as without streaming.
+
+    llm_priority=<seconds> gives the request a head start in the GonkaGate
+    token and node slot queues (FairWaitQueue); llm_output["queue_wait_sec"]
+    reports how long it actually waited.
+
+    AICODE-NOTE: Node affinity. One model instance serves one task, and each
+    turn resends the previous turn's prompt plus a few messages, so staying
+    on the node that served the last turn lets its vLLM prefix cache skip
+    most of the prompt processing. A turn moves only if that node is
+    blacklisted or overloaded (NodeRateLimiter.is_overloaded); it then goes
+    to the task's rendezvous-hash node among healthy ones (affinity_key),
+    so retries of a task keep landing on the same fallback.
+    llm_output["same_node"] tells whether the turn ran on the previous
+    turn's node (None for the first turn).
+    """
 
     model_name: str = Field(alias="model")
     gonka_private_key: str = Field(default_factory=lambda: os.getenv("GONKA_PRIVATE_KEY"))
@@ -753,9 +1477,18 @@ class GonkaChatModel(BaseChatModel):
     # AICODE-NOTE: Global retry params for network-wide outages (all nodes failing)
     max_global_retries: int = 5  # Retry entire node cycle this many times (increased for unstable network)
     global_retry_base_delay: float = 45.0  # Base delay in seconds (exponential backoff)
+    # AICODE-NOTE: Hedged requests - if the node hasn't answered by the hedge_percentile
+    # of recent completion times, send the same request to a second (P2C) node and take
+    # whichever answers first. Costs one extra GonkaGate token and duplicate inference
+    # for the hedged calls only.
+    hedge_enabled: bool = True
+    hedge_percentile: float = 0.95
+    hedge_min_delay: float = 20.0
+    affinity_key: Optional[str] = None  # Task ID for the consistent-hash fallback node
 
     _client: Optional[GonkaOpenAI] = PrivateAttr(default=None)
     _current_node: Optional[str] = PrivateAttr(default=None)
+    _affinity_node: Optional[str] = PrivateAttr(default=None)  # Node that served the previous turn
     _tried_nodes: set = PrivateAttr(default_factory=set)
     _last_successful_node: Optional[str] = None
 
@@ -784,6 +1517,37 @@ class GonkaChatModel(BaseChatModel):
             timeout=self.request_timeout
         )
 
+    def _affinity_fallback(self, exclude: str) -> Optional[str]:
+        """Rendezvous-hash node for affinity_key among healthy topology nodes."""
+        key = self.affinity_key or str(id(self))
+        candidates = [
+            n for n in _topology_manager.get_nodes()
+            if n != exclude and not _node_pool.is_blacklisted(n) and not _node_rate_limiter.is_overloaded(n)
+        ]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda n: hashlib.sha1(f"{key}|{n}".encode()).digest())
+
+    def _keep_affinity(self):
+        """Stay on the previous turn's node unless it is blacklisted or overloaded."""
+        node = self._affinity_node
+        if not node or self._client is None or self._current_node != node:
+            return
+        if not _node_pool.is_blacklisted(node) and not _node_rate_limiter.is_overloaded(node):
+            return
+        fallback = self._affinity_fallback(exclude=node)
+        if fallback is None:
+            return  # Nothing better; the regular retry/switch logic takes over
+        try:
+            self._client = self._create_gonka_client(fallback)
+        except Exception:
+            _node_pool.record_failure(fallback, "connect")
+            return
+        print(f"{CLI_CYAN}🧲 Leaving {node.split('//')[-1]} (busy/blacklisted), "
+              f"task affinity -> {fallback.split('//')[-1]}{CLI_CLR}")
+        self._current_node = fallback
+        self._tried_nodes.add(fallback)
+
     def _reset_for_global_retry(self):
         """Reset state for global retry after all nodes failed."""
         self._tried_nodes.clear()
@@ -800,6 +1564,15 @@ class GonkaChatModel(BaseChatModel):
         **kwargs: Any,
     ) -> ChatResult:
         openai_messages = self._convert_messages(messages)
+        # Set by _agenerate: token (and maybe a node slot) already taken on the event loop
+        prepaid = {
+            'prepaid_token': kwargs.pop('prepaid_token', False),
+            'prepaid_slot_node': kwargs.pop('prepaid_slot_node', None),
+        }
+        queue_wait = [kwargs.pop('prepaid_queue_wait', 0.0)]
+        _queue_wait.set(queue_wait)
+        self._keep_affinity()
+        previous_node = self._affinity_node
 
         # AICODE-NOTE: Global retry loop for network-wide outages
         for global_retry in range(self.max_global_retries + 1):
@@ -822,10 +1595,12 @@ class GonkaChatModel(BaseChatModel):
             all_nodes_exhausted = True
             for node_attempt in range(self.max_node_switches):
                 try:
-                    response = self._call_with_retry(openai_messages, stop, **kwargs)
+                    call_kwargs, prepaid = {**kwargs, **prepaid}, {}
+                    response = self._call_with_retry(openai_messages, stop, **call_kwargs)
 
                     if self._current_node and isinstance(self._current_node, str):
                         GonkaChatModel._last_successful_node = self._current_node
+                        self._affinity_node = self._current_node
 
                     message_content = response.choices[0].message.content
                     usage = getattr(response, "usage", None)
@@ -844,6 +1619,7 @@ class GonkaChatModel(BaseChatModel):
                                 "completion_tokens": getattr(usage, "completion_tokens", 0),
                                 "total_tokens": getattr(usage, "total_tokens", 0)
                             }
+                        usage_metadata["cached_prompt_tokens"] = _cached_prompt_tokens(usage)
 
                     if not usage_metadata or usage_metadata.get("total_tokens", 0) == 0:
                         est_completion = len(message_content) // 4 if message_content else 0
@@ -857,7 +1633,12 @@ class GonkaChatModel(BaseChatModel):
 
                     return ChatResult(
                         generations=[ChatGeneration(message=AIMessage(content=message_content))],
-                        llm_output={"token_usage": usage_metadata, "model_name": self.model_name}
+                        llm_output={
+                            "token_usage": usage_metadata,
+                            "model_name": self.model_name,
+                            "queue_wait_sec": queue_wait[0],
+                            "same_node": None if previous_node is None else previous_node == self._current_node,
+                        }
                     )
 
                 except Exception as e:
@@ -885,19 +1666,30 @@ class GonkaChatModel(BaseChatModel):
 
         raise Exception("All Gonka nodes failed after global retries.")
 
-    def _call_with_retry(self, messages, stop, **kwargs):
+    def _call_with_retry(self, messages, stop, prepaid_token: bool = False,
+                         prepaid_slot_node: Optional[str] = None,
+                         stream_listener: Any = None, llm_priority: float = 0, **kwargs):
         """
         Call LLM with retry logic and ACSC (Adaptive Clock Skew Compensation).
 
         ACSC allows us to handle nodes with different clock drifts by learning
         and applying per-node time offsets based on error responses.
+
+        prepaid_token / prepaid_slot_node: the rate-limit token and a slot on
+        that node were already acquired by _agenerate.
+        stream_listener: stream the completion into this listener (see class doc).
+        llm_priority: head start in the rate-limit queues (see FairWaitQueue).
         """
         # AICODE-NOTE: TrafficController - respect global 100 RPM limit (GonkaGate)
-        if not _traffic_controller.wait_for_token(timeout=120.0):
+        if not prepaid_token and not _traffic_controller.wait_for_token(timeout=120.0, priority=llm_priority):
             raise Exception("TrafficController: timeout waiting for rate limit token")
 
         last_error = None
         node = self._current_node
+        if prepaid_slot_node and prepaid_slot_node != node:
+            # Slot was taken for a node we are no longer on
+            _node_rate_limiter.release(prepaid_slot_node)
+            prepaid_slot_node = None
 
         # ACSC: Get known offset for this node and set in context
         offset = _offset_manager.get_offset(node) if node else 0.0
@@ -906,26 +1698,43 @@ class GonkaChatModel(BaseChatModel):
         try:
             for attempt in range(self.max_retries_per_node):
                 try:
-                    if node and not _node_rate_limiter.wait_for_slot(node, timeout=10.0):
+                    slot_held = attempt == 0 and prepaid_slot_node is not None
+                    if node and not slot_held and not _node_rate_limiter.wait_for_slot(
+                            node, timeout=10.0, priority=llm_priority):
                         print(f"{CLI_YELLOW}⚠ Rate limit timeout for {node}{CLI_CLR}")
                         raise Exception("Rate limit timeout")
 
                     start_time = time.time()
+                    primary_detached = False
+                    response_time = None
                     try:
-                        result = self._client.chat.completions.create(
-                            model=self.model_name,
-                            messages=messages,
-                            stop=stop,
-                            temperature=kwargs.get("temperature", 0.0),
-                            timeout=self.request_timeout
-                        )
+                        if stream_listener is not None:
+                            _notify(stream_listener, "on_reset")
+                            result = self._client.chat.completions.create(
+                                model=self.model_name,
+                                messages=messages,
+                                stop=stop,
+                                temperature=kwargs.get("temperature", 0.0),
+                                timeout=self.request_timeout,
+                                **_stream_kwargs()
+                            )
+                            result = _consume_stream(result, stream_listener)
+                        elif node and self.hedge_enabled:
+                            result, primary_detached = self._hedged_create(node, messages, stop, kwargs)
+                            if primary_detached:
+                                return result  # Hedge node won; bookkeeping done there
+                        else:
+                            result = self._create_completion(self._client, node, messages, stop, kwargs)
                         response_time = time.time() - start_time
+                        _traffic_controller.record_success()
                         if node:
                             _node_pool.record_success(node, response_time)
                         return result
                     finally:
-                        if node:
+                        if node and not primary_detached:
                             _node_rate_limiter.release(node)
+                            if response_time is not None:
+                                _node_rate_limiter.on_success(node, response_time)
 
                 except Exception as e:
                     error_str = str(e).lower()
@@ -968,7 +1777,8 @@ class GonkaChatModel(BaseChatModel):
                     ])
                     if is_node_failure and node:
                         print(f"{CLI_YELLOW}📉 Node {node.split('//')[-1]} failed. Blacklisting...{CLI_CLR}")
-                        _node_pool.record_failure(node)
+                        _node_pool.record_failure(node, str(e))
+                        _node_rate_limiter.on_overload(node)
 
                     # Other critical errors - fail fast to switch nodes
                     critical_errors = [
@@ -981,7 +1791,7 @@ class GonkaChatModel(BaseChatModel):
 
                     # Record failure for any critical error (if not already done above)
                     if node and not is_node_failure:
-                        _node_pool.record_failure(node)
+                        _node_pool.record_failure(node, str(e))
 
                     if any(ce in error_str for ce in critical_errors):
                         print(f"{CLI_YELLOW}⚠ Critical error on {self._current_node}: {e}{CLI_CLR}")
@@ -998,6 +1808,159 @@ class GonkaChatModel(BaseChatModel):
             # ACSC: Reset context to avoid polluting other threads
             _current_node_offset.reset(token)
 
+    def _create_completion(self, gonka_client: GonkaOpenAI, node: Optional[str],
+                           messages, stop, kwargs) -> Any:
+        """
+        One non-streamed completion on a given client.
+
+        Sets the node's ACSC offset in the current context first, so it can
+        run on a hedging worker thread (which starts with an empty context).
+        """
+        token = _current_node_offset.set(_offset_manager.get_offset(node) if node else 0.0)
+        try:
+            return gonka_client.chat.completions.create(
+                model=self.model_name,
+                messages=messages,
+                stop=stop,
+                temperature=kwargs.get("temperature", 0.0),
+                timeout=self.request_timeout
+            )
+        finally:
+            _current_node_offset.reset(token)
+
+    def _pick_hedge_node(self, primary: str) -> Optional[str]:
+        """P2C-pick a second node and take a slot on it without waiting."""
+        for _ in range(3):
+            node = _node_pool.get_node_p2c(_node_rate_limiter)
+            if node and node != primary and _node_rate_limiter.acquire(node):
+                return node
+        for node in _node_pool.get_best_nodes(count=5):
+            if node != primary and _node_rate_limiter.acquire(node):
+                return node
+        return None
+
+    def _hedged_create(self, node: str, messages, stop, kwargs) -> Tuple[Any, bool]:
+        """
+        Completion on the current node, hedged on a second node after a deadline.
+
+        The primary runs on a worker thread. If it has not answered within
+        NodePool.hedge_deadline(), the same request goes to a P2C-picked node,
+        provided a GonkaGate token and a slot there are free right now
+        (hedges never wait for rate limits). The first success wins; an
+        exception is raised only when every request sent has failed.
+
+        Returns:
+            (result, primary_detached). primary_detached=True means the hedge
+            won: the model switched to the hedge node, and the still-running
+            primary releases its own slot and records its time when done.
+        """
+        deadline = _node_pool.hedge_deadline(node, self.hedge_percentile, self.hedge_min_delay)
+        if deadline is None:
+            return self._create_completion(self._client, node, messages, stop, kwargs), False
+
+        _hedge_stats.add("calls")
+        started = time.time()
+        pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="GonkaHedge")
+        try:
+            primary = pool.submit(self._create_completion, self._client, node, messages, stop, kwargs)
+            try:
+                return primary.result(timeout=deadline), False
+            except FutureTimeout:
+                pass
+
+            hedge_node = self._pick_hedge_node(node)
+            if hedge_node is None or not _traffic_controller.try_acquire():
+                if hedge_node is not None:
+                    _node_rate_limiter.release(hedge_node)
+                _hedge_stats.add("skipped")
+                return primary.result(), False
+
+            print(f"{CLI_CYAN}🪁 No answer from {node.split('//')[-1]} after {deadline:.0f}s, "
+                  f"hedging on {hedge_node.split('//')[-1]}{CLI_CLR}")
+            _hedge_stats.add("fired")
+            hedge_started = time.time()
+            try:
+                hedge_client = self._create_gonka_client(hedge_node)
+            except Exception:
+                _node_rate_limiter.release(hedge_node)
+                _node_pool.record_failure(hedge_node)
+                return primary.result(), False
+            hedge = pool.submit(self._create_completion, hedge_client, hedge_node, messages, stop, kwargs)
+            hedge.add_done_callback(lambda f: _node_rate_limiter.release(hedge_node))
+
+            pending = {primary, hedge}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                # Prefer the primary if both finished together
+                for future in sorted(done, key=lambda f: f is not primary):
+                    if future.exception() is not None:
+                        if future is hedge:
+                            _node_pool.record_failure(hedge_node, f"hedge: {future.exception()}")
+                        continue
+                    if future is primary:
+                        _hedge_stats.add("primary_wins")
+                        return future.result(), False
+                    _hedge_stats.add("hedge_wins")
+                    _traffic_controller.record_success()
+                    _node_pool.record_success(hedge_node, time.time() - hedge_started)
+                    _node_rate_limiter.on_success(hedge_node, time.time() - hedge_started)
+                    self._client = hedge_client
+                    self._current_node = hedge_node
+                    self._tried_nodes.add(hedge_node)
+                    primary.add_done_callback(lambda f: self._finish_detached(f, node, started))
+                    return future.result(), True
+            # Both failed - surface the primary's error to the usual failover logic
+            return primary.result(), False
+        finally:
+            pool.shutdown(wait=False)
+
+    @staticmethod
+    def _finish_detached(future: Any, node: str, started: float):
+        """Bookkeeping for a primary request that lost to its hedge."""
+        _node_rate_limiter.release(node)
+        if future.exception() is None:
+            _node_pool.record_success(node, time.time() - started)
+            _node_rate_limiter.on_success(node, time.time() - started)
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[Any] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        """
+        Async generation for run_agent_async.
+
+        Waits for the GonkaGate token and a node slot on the event loop, then
+        runs the signed GonkaOpenAI call in a worker thread. Retries, node
+        switches and global retries reuse the sync path unchanged.
+
+        AICODE-NOTE: GonkaOpenAI signs requests through the patched sync SDK
+        and the ACSC offset lives in a contextvar (asyncio.to_thread copies
+        the context), so the HTTP call itself stays blocking. Rate-limit waits
+        no longer hold a thread.
+        """
+        if self._client is None:
+            await asyncio.to_thread(self._connect_initial)
+        self._keep_affinity()  # Before taking a slot, so the slot is on the node we'll use
+        queue_wait = [0.0]
+        _queue_wait.set(queue_wait)
+        priority = kwargs.get('llm_priority', 0)
+        if not await _traffic_controller.wait_for_token_async(timeout=120.0, priority=priority):
+            raise Exception("TrafficController: timeout waiting for rate limit token")
+
+        node = self._current_node
+        slot_node = None
+        if node and await _node_rate_limiter.wait_for_slot_async(node, timeout=10.0, priority=priority):
+            slot_node = node
+
+        return await asyncio.to_thread(
+            self._generate, messages, stop, None,
+            prepaid_token=True, prepaid_slot_node=slot_node,
+            prepaid_queue_wait=queue_wait[0], **kwargs
+        )
+
     def _connect_initial(self):
         # Optimization C: Run warmup on first connection
         warmup_gonka_nodes()
@@ -1155,15 +2118,21 @@ class GonkaChatModel(BaseChatModel):
 
 
 class OpenRouterChatModel(BaseChatModel):
-    """LangChain ChatModel wrapper for OpenRouter API."""
+    """
+    LangChain ChatModel wrapper for OpenRouter API.
+
+    Supports stream_listener=<obj> like GonkaChatModel.
+    """
 
     model_name: str = Field(alias="model")
     api_key: str = Field(default_factory=lambda: os.getenv("OPENAI_API_KEY"))
     base_url: str = Field(default_factory=lambda: os.getenv("OPENAI_BASE_URL", "https://openrouter.ai/api/v1"))
     max_retries: int = 3
     request_timeout: int = 120
+    prompt_cache_hints: bool = True  # cache_control breakpoint on the system prompt
 
     _client: Any = PrivateAttr(default=None)
+    _async_client: Any = PrivateAttr(default=None)
     _http_referer: str = PrivateAttr(default=None)
     _x_title: str = PrivateAttr(default=None)
 
@@ -1191,10 +2160,13 @@ class OpenRouterChatModel(BaseChatModel):
         **kwargs
     ) -> ChatResult:
         openai_messages = self._convert_messages(messages)
+        listener = kwargs.get("stream_listener")
 
         last_error = None
         for attempt in range(self.max_retries):
             try:
+                if listener is not None:
+                    _notify(listener, "on_reset")
                 response = self._client.chat.completions.create(
                     model=self.model_name,
                     messages=openai_messages,
@@ -1204,30 +2176,72 @@ class OpenRouterChatModel(BaseChatModel):
                     extra_headers={
                         "HTTP-Referer": self._http_referer,
                         "X-Title": self._x_title
-                    }
+                    },
+                    # Detailed usage, including prompt_tokens_details.cached_tokens
+                    extra_body={"usage": {"include": True}},
+                    **(_stream_kwargs() if listener is not None else {})
                 )
+                if listener is not None:
+                    response = _consume_stream(response, listener)
 
-                content = response.choices[0].message.content or ""
-                generation = ChatGeneration(
-                    message=AIMessage(content=content),
-                    generation_info={
-                        "model": response.model,
-                        "finish_reason": response.choices[0].finish_reason
-                    }
-                )
+                return self._to_chat_result(response)
 
-                usage = {}
-                if response.usage:
-                    usage = {
-                        "prompt_tokens": response.usage.prompt_tokens,
-                        "completion_tokens": response.usage.completion_tokens,
-                        "total_tokens": response.usage.total_tokens
-                    }
+            except Exception as e:
+                last_error = e
+                error_str = str(e).lower()
+
+                if "rate" in error_str or "429" in error_str:
+                    wait_time = (attempt + 1) * 5
+                    print(f"{CLI_YELLOW}⚠ Rate limited. Waiting {wait_time}s...{CLI_CLR}")
+                    time.sleep(wait_time)
+                    continue
+
+                print(f"{CLI_YELLOW}⚠ OpenRouter error (attempt {attempt+1}/{self.max_retries}): {e}{CLI_CLR}")
+                if attempt < self.max_retries - 1:
+                    time.sleep(2)
 
-                return ChatResult(
-                    generations=[generation],
-                    llm_output={"token_usage": usage, "model_name": response.model}
+        raise last_error or Exception("OpenRouter API call failed")
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs
+    ) -> ChatResult:
+        """Native async variant of _generate (openai.AsyncOpenAI)."""
+        if self._async_client is None:
+            from openai import AsyncOpenAI
+            self._async_client = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                timeout=self.request_timeout
+            )
+        openai_messages = self._convert_messages(messages)
+        listener = kwargs.get("stream_listener")
+
+        last_error = None
+        for attempt in range(self.max_retries):
+            try:
+                if listener is not None:
+                    _notify(listener, "on_reset")
+                response = await self._async_client.chat.completions.create(
+                    model=self.model_name,
+                    messages=openai_messages,
+                    stop=stop,
+                    temperature=kwargs.get("temperature", 0.0),
+                    max_tokens=kwargs.get("max_tokens", 4096),
+                    extra_headers={
+                        "HTTP-Referer": self._http_referer,
+                        "X-Title": self._x_title
+                    },
+                    # Detailed usage, including prompt_tokens_details.cached_tokens
+                    extra_body={"usage": {"include": True}},
+                    **(_stream_kwargs() if listener is not None else {})
                 )
+                if listener is not None:
+                    response = await _aconsume_stream(response, listener)
+                return self._to_chat_result(response)
 
             except Exception as e:
                 last_error = e
@@ -1236,20 +2250,45 @@ class OpenRouterChatModel(BaseChatModel):
                 if "rate" in error_str or "429" in error_str:
                     wait_time = (attempt + 1) * 5
                     print(f"{CLI_YELLOW}⚠ Rate limited. Waiting {wait_time}s...{CLI_CLR}")
-                    time.sleep(wait_time)
+                    await asyncio.sleep(wait_time)
                     continue
 
                 print(f"{CLI_YELLOW}⚠ OpenRouter error (attempt {attempt+1}/{self.max_retries}): {e}{CLI_CLR}")
                 if attempt < self.max_retries - 1:
-                    time.sleep(2)
+                    await asyncio.sleep(2)
 
         raise last_error or Exception("OpenRouter API call failed")
 
+    def _to_chat_result(self, response: Any) -> ChatResult:
+        """Convert an OpenAI chat completion into a LangChain ChatResult."""
+        content = response.choices[0].message.content or ""
+        generation = ChatGeneration(
+            message=AIMessage(content=content),
+            generation_info={
+                "model": response.model,
+                "finish_reason": response.choices[0].finish_reason
+            }
+        )
+
+        usage = {}
+        if response.usage:
+            usage = {
+                "prompt_tokens": response.usage.prompt_tokens,
+                "completion_tokens": response.usage.completion_tokens,
+                "total_tokens": response.usage.total_tokens,
+                "cached_prompt_tokens": _cached_prompt_tokens(response.usage)
+            }
+
+        return ChatResult(
+            generations=[generation],
+            llm_output={"token_usage": usage, "model_name": response.model}
+        )
+
     def _convert_messages(self, messages: List[BaseMessage]) -> List[Dict]:
         openai_msgs = []
         for m in messages:
             if isinstance(m, SystemMessage):
-                openai_msgs.append({"role": "system", "content": m.content})
+                openai_msgs.append({"role": "system", "content": self._system_content(m.content)})
             elif isinstance(m, HumanMessage):
                 openai_msgs.append({"role": "user", "content": m.content})
             elif isinstance(m, AIMessage):
@@ -1260,14 +2299,32 @@ class OpenRouterChatModel(BaseChatModel):
                 openai_msgs.append({"role": "user", "content": m.content})
         return openai_msgs
 
+    def _system_content(self, content: Any) -> Any:
+        """
+        System prompt, marked as a cache breakpoint when prompt_cache_hints is on.
+
+        AICODE-NOTE: Providers with explicit prompt caching (Anthropic, Gemini)
+        only cache up to a cache_control breakpoint; OpenAI-style providers
+        cache prefixes automatically and ignore the hint. The system prompt
+        is identical for every turn and task, so it is the breakpoint.
+        """
+        if not self.prompt_cache_hints or not isinstance(content, str):
+            return content
+        return [{"type": "text", "text": content, "cache_control": {"type": "ephemeral"}}]
+
     @property
     def _llm_type(self) -> str:
         return "openrouter-chat-model"
 
 
-def get_llm(model_name: str, backend: str = "gonka") -> BaseChatModel:
-    """Factory function to get the appropriate LLM based on backend."""
+def get_llm(model_name: str, backend: str = "gonka", affinity_key: Optional[str] = None) -> BaseChatModel:
+    """
+    Factory function to get the appropriate LLM based on backend.
+
+    affinity_key (e.g. the task ID) pins a Gonka model's fallback node
+    choice; see GonkaChatModel node affinity.
+    """
     if backend == "openrouter":
         return OpenRouterChatModel(model=model_name)
     else:
-        return GonkaChatModel(model=model_name)
+        return GonkaChatModel(model=model_name, affinity_key=affinity_key)
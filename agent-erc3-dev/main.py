@@ -36,6 +36,8 @@ def parse_args():
                         help='Filter to run only specific task spec_id (comma-separated)')
     parser.add_argument('-threads', '--threads', type=int, default=1,
                         help='Number of parallel threads (default: 1 = sequential)')
+    parser.add_argument('-async', '--async', dest='use_async', action='store_true',
+                        help='Run parallel tasks on one asyncio event loop; -threads is then max concurrent tasks')
     parser.add_argument('-verbose', '--verbose', action='store_true',
                         help='Show all output in console (for parallel: interleaved but real-time)')
     parser.add_argument('-tests_on', '--tests_on', action='store_true',
@@ -195,7 +197,10 @@ def main():
 
     # Run tasks
     if args.threads > 1:
-        runner.run_parallel(tasks, args.threads, verbose=args.verbose)
+        runner.run_parallel(
+            tasks, args.threads, verbose=args.verbose,
+            use_async=args.use_async or config.ASYNC_AGENT_LOOP,
+        )
     else:
         runner.run_sequential(tasks)
 
@@ -16,6 +16,7 @@ from .output import (
     THREAD_COLORS,
 )
 from .executor import run_parallel, run_task_worker
+from .async_executor import run_parallel_async, run_task_async
 from .resources import get_thread_wiki_manager, get_thread_session
 
 __all__ = [
@@ -32,6 +33,9 @@ __all__ = [
     # executor.py
     "run_parallel",
     "run_task_worker",
+    # async_executor.py
+    "run_parallel_async",
+    "run_task_async",
     # resources.py
     "get_thread_wiki_manager",
     "get_thread_session",
@@ -0,0 +1,259 @@
+"""
+Asyncio task executor.
+
+Alternative to executor.run_parallel for high task concurrency: every task
+is a coroutine on one event loop (agent.run_agent_async). Blocking work
+(ERC3 SDK calls, action processing) runs in a bounded thread pool of
+config.ASYNC_BLOCKING_WORKERS threads.
+
+AICODE-NOTE: How many tasks can wait on the LLM at once depends on the
+backend. OpenRouter (AsyncOpenAI) is natively async: a waiting task holds
+no thread. Gonka waits for its rate-limit token and node slot on the loop,
+but the signed GonkaOpenAI call itself is blocking and runs in that pool,
+so each task in a 30-180s Gonka call holds one worker: at most
+ASYNC_BLOCKING_WORKERS Gonka calls (minus concurrent SDK/action work) are
+in flight, whatever -threads says.
+"""
+
+import asyncio
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Dict, Any
+
+from erc3 import ERC3
+from erc3.core import TaskInfo
+
+from agent.runner import run_agent_async
+from agent.token_counter import get_token_counter
+from stats import SessionStats, failure_logger
+from handlers.wiki import WikiManager, get_embedding_model
+from transport import build_session
+
+import config
+
+from .output import (
+    ThreadLogCapture,
+    thread_status,
+    get_thread_stdout,
+    get_thread_stderr,
+)
+from .executor import _write_context_results, _print_parallel_summary
+
+
+async def run_task_async(
+    task: TaskInfo,
+    stats: SessionStats,
+    base_url: str,
+    model_id: str,
+    pricing_model: str,
+    backend: str,
+    slot_id: int,
+    api_key: str,
+    logs_dir: Path,
+    verbose: bool = False,
+) -> Dict[str, Any]:
+    """
+    Run a single task as a coroutine.
+
+    Resource isolation differs from run_task_worker:
+    - HTTP Session and WikiManager: per task (there is no owning thread)
+    - Output capture: bound to the task's context, not to a thread
+
+    Args:
+        task: Task to execute
+        stats: Shared session statistics
+        base_url: ERC3 API base URL
+        model_id: LLM model identifier
+        pricing_model: Model ID for pricing
+        backend: LLM backend name
+        slot_id: Concurrency slot index for color coding
+        api_key: ERC3 API key
+        logs_dir: Directory for task log files
+        verbose: Whether to show output in console
+
+    Returns:
+        Dict with task_id, spec_id, score, error, thread_id
+    """
+    spec_id = task.spec_id
+    result = {
+        'task_id': task.task_id,
+        'spec_id': spec_id,
+        'score': None,
+        'error': None,
+        'thread_id': slot_id
+    }
+
+    log_capture = ThreadLogCapture(
+        spec_id=spec_id,
+        thread_id=slot_id,
+        log_dir=logs_dir,
+        verbose=verbose,
+        task_id=task.task_id,
+        task_text=task.task_text,
+    )
+    _thread_stdout = get_thread_stdout()
+    _thread_stderr = get_thread_stderr()
+    session = build_session()
+
+    try:
+        thread_status(slot_id, spec_id, "Starting...")
+
+        core = ERC3(key=api_key, base_url=base_url, session=session)
+        wiki_manager = WikiManager()
+
+        stats.start_task(task.task_id, spec_id)
+        failure_logger.start_task(task.task_id, task.task_text, spec_id)
+
+        await asyncio.to_thread(core.start_task, task)
+
+        thread_status(slot_id, spec_id, "Running agent...")
+
+        # Each asyncio task runs in its own context copy, so this binding
+        # is invisible to the other tasks on the loop
+        out_token = _thread_stdout.register_context(log_capture)
+        err_token = _thread_stderr.register_context(log_capture)
+        try:
+            await run_agent_async(
+                model_name=model_id,
+                api=core,
+                task=task,
+                stats=stats,
+                pricing_model=pricing_model,
+                failure_logger=failure_logger,
+                wiki_manager=wiki_manager,
+                backend=backend
+            )
+        finally:
+            _thread_stdout.unregister_context(out_token)
+            _thread_stderr.unregister_context(err_token)
+
+        task_result = await asyncio.to_thread(core.complete_task, task)
+
+        if task_result.eval:
+            result['score'] = task_result.eval.score
+            failure_logger.save_failure(task.task_id, task_result.eval.score, task_result.eval.logs)
+
+            log_capture.write(f"\n{'='*60}\n")
+            log_capture.write(f"SCORE: {task_result.eval.score}\n")
+            log_capture.write(f"{task_result.eval.logs}\n")
+
+            score_icon = "" if task_result.eval.score == 1.0 else "" if task_result.eval.score > 0 else ""
+            thread_status(slot_id, spec_id, f"{score_icon} Done! Score: {task_result.eval.score}")
+        else:
+            thread_status(slot_id, spec_id, "Done (no eval)")
+
+        _write_context_results(log_capture, task.task_id, failure_logger)
+
+        stats.finish_task(task.task_id, result['score'])
+
+    except Exception as e:
+        result['error'] = str(e)
+        thread_status(slot_id, spec_id, f"ERROR: {str(e)[:50]}")
+
+        import traceback
+        try:
+            log_capture.write(f"\n{'='*60}\n")
+            log_capture.write(f"ERROR: {e}\n")
+            log_capture.write(traceback.format_exc())
+        except (ValueError, AttributeError):
+            pass
+
+    finally:
+        try:
+            log_capture.close()
+            session.close()
+        except Exception:
+            pass
+
+    return result
+
+
+async def _run_all(
+    tasks_to_run: List[TaskInfo],
+    max_concurrent: int,
+    **task_kwargs: Any,
+) -> List[Dict[str, Any]]:
+    """Run all tasks on the current loop, at most max_concurrent at a time."""
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(
+        max_workers=config.ASYNC_BLOCKING_WORKERS,
+        thread_name_prefix="AsyncBlocking",
+    ))
+    semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def _bounded(idx: int, task: TaskInfo) -> Dict[str, Any]:
+        async with semaphore:
+            return await run_task_async(task, slot_id=idx % max_concurrent, **task_kwargs)
+
+    outcomes = await asyncio.gather(
+        *(_bounded(idx, task) for idx, task in enumerate(tasks_to_run)),
+        return_exceptions=True,
+    )
+
+    results = []
+    for task, outcome in zip(tasks_to_run, outcomes):
+        if isinstance(outcome, BaseException):
+            print(f"Task {task.spec_id} raised exception: {outcome}")
+            results.append({
+                'task_id': task.task_id,
+                'spec_id': task.spec_id,
+                'score': None,
+                'error': str(outcome)
+            })
+        else:
+            results.append(outcome)
+    return results
+
+
+def run_parallel_async(
+    base_url: str,
+    tasks_to_run: List[TaskInfo],
+    stats: SessionStats,
+    max_concurrent: int,
+    model_id: str,
+    pricing_model: str,
+    backend: str,
+    api_key: str,
+    logs_dir: Path,
+    verbose: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Run tasks concurrently on a single asyncio event loop.
+
+    Same interface and summary as run_parallel; max_concurrent bounds the
+    number of tasks in flight (an asyncio.Semaphore, not a thread count).
+
+    Returns:
+        List of result dicts with task_id, spec_id, score, error
+    """
+    # Install dispatchers: context-bound captures route each task's output
+    _thread_stdout = get_thread_stdout()
+    _thread_stderr = get_thread_stderr()
+    sys.stdout = _thread_stdout
+    sys.stderr = _thread_stderr
+
+    # Pre-initialize embedding model before any worker thread needs it
+    get_embedding_model()
+    # Same for the tokenizer: token counts run on the event loop (compaction)
+    get_token_counter().preload()
+
+    print(f"\n Running {len(tasks_to_run)} tasks on asyncio loop "
+          f"(max {max_concurrent} concurrent, {config.ASYNC_BLOCKING_WORKERS} blocking workers)...\n")
+
+    results = asyncio.run(_run_all(
+        tasks_to_run,
+        max_concurrent,
+        stats=stats,
+        base_url=base_url,
+        model_id=model_id,
+        pricing_model=pricing_model,
+        backend=backend,
+        api_key=api_key,
+        logs_dir=logs_dir,
+        verbose=verbose,
+    ))
+
+    _print_parallel_summary(results, stats, logs_dir)
+
+    return results
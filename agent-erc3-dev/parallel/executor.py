@@ -14,6 +14,7 @@ from erc3 import ERC3
 from erc3.core import TaskInfo
 
 from agent.runner import run_agent
+from agent.token_counter import get_token_counter
 from stats import SessionStats, failure_logger
 from handlers.wiki import get_embedding_model
 
@@ -253,6 +254,8 @@ def run_parallel(
 
     # Pre-initialize embedding model in main thread (avoids race condition on GPU)
     get_embedding_model()
+    # Same for the tokenizer, so the first token count doesn't stall a worker
+    get_token_counter().preload()
 
     print(f"\n Running {len(tasks_to_run)} tasks with {num_threads} threads...\n")
 
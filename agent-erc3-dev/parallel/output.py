@@ -5,6 +5,7 @@ Provides utilities for capturing and routing stdout/stderr to
 per-task log files in parallel mode.
 """
 
+import contextvars
 import sys
 import threading
 from pathlib import Path
@@ -129,6 +130,11 @@ class ThreadLocalStdout:
     When no capture is registered (main thread), output goes to original stdout.
 
     Thread-safety: Each thread has its own capture via threading.local().
+
+    Async mode: many tasks share the event loop thread, so a capture can
+    also be bound to the current context (register_context). Thread
+    registration wins; the context capture is the fallback and follows a
+    task into asyncio.to_thread workers, which copy the context.
     """
 
     def __init__(self, original_stdout):
@@ -140,6 +146,9 @@ class ThreadLocalStdout:
         """
         self._original = original_stdout
         self._local = threading.local()
+        self._context_capture = contextvars.ContextVar(
+            f'log_capture_{id(self)}', default=None
+        )
 
     def register(self, log_capture: ThreadLogCapture):
         """Register a log capture for the current thread."""
@@ -149,9 +158,24 @@ class ThreadLocalStdout:
         """Unregister log capture for the current thread."""
         self._local.capture = None
 
+    def register_context(self, log_capture: ThreadLogCapture) -> contextvars.Token:
+        """Bind a log capture to the current context (asyncio task). Returns reset token."""
+        return self._context_capture.set(log_capture)
+
+    def unregister_context(self, token: contextvars.Token):
+        """Undo register_context()."""
+        self._context_capture.reset(token)
+
+    def get_capture(self) -> Optional[ThreadLogCapture]:
+        """Get log capture for the current thread or context (None if not registered)."""
+        capture = getattr(self._local, 'capture', None)
+        if capture is None:
+            capture = self._context_capture.get()
+        return capture
+
     def write(self, text: str):
         """Write to the appropriate destination."""
-        capture = getattr(self._local, 'capture', None)
+        capture = self.get_capture()
         if capture and not capture._closed:
             capture.write(text)
         else:
@@ -159,7 +183,7 @@ class ThreadLocalStdout:
 
     def flush(self):
         """Flush the appropriate destination."""
-        capture = getattr(self._local, 'capture', None)
+        capture = self.get_capture()
         if capture and not capture._closed:
             capture.flush()
         else:
@@ -6,9 +6,10 @@ per-thread to avoid race conditions.
 """
 
 import threading
-import requests
+from typing import Any
 
 from handlers.wiki import WikiManager
+from transport import build_session
 
 
 # Thread-local storage
@@ -34,13 +35,15 @@ def get_thread_wiki_manager() -> WikiManager:
     return _thread_local.wiki_manager
 
 
-def get_thread_session() -> requests.Session:
+def get_thread_session() -> Any:
     """
-    Get or create a requests.Session for the current thread.
+    Get or create an HTTP session for the current thread.
 
     requests.Session is NOT thread-safe, so each thread needs its own.
-    The session handles connection pooling efficiently within the thread.
+    The session (see transport.build_session) has a sized connection pool
+    and lives as long as the thread, so keep-alive connections are reused
+    across all tasks the worker runs.
     """
     if not hasattr(_thread_local, 'session'):
-        _thread_local.session = requests.Session()
+        _thread_local.session = build_session()
     return _thread_local.session
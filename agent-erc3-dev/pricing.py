@@ -1,4 +1,5 @@
 import requests
+from transport import get_shared_session
 from decimal import Decimal, getcontext
 
 # Set precision for financial calculations
@@ -23,7 +24,7 @@ class CostCalculator:
             
         print("⏳ Fetching model prices from OpenRouter...", end=" ", flush=True)
         try:
-            response = requests.get(self.OPENROUTER_API_URL, timeout=10)
+            response = get_shared_session().get(self.OPENROUTER_API_URL, timeout=10)
             if response.status_code == 200:
                 data = response.json().get("data", [])
                 count = 0
@@ -34,11 +35,14 @@ class CostCalculator:
                     # OpenRouter returns price per token as string
                     p_prompt = Decimal(str(pricing.get("prompt", "0")))
                     p_completion = Decimal(str(pricing.get("completion", "0")))
+                    # Price of prompt tokens read from the provider's prompt cache (if it has one)
+                    p_cache_read = Decimal(str(pricing.get("input_cache_read") or pricing.get("prompt", "0")))
                     
                     if p_prompt > 0 or p_completion > 0:
                         self.prices[model_id] = {
                             "prompt": p_prompt,
-                            "completion": p_completion
+                            "completion": p_completion,
+                            "cache_read": p_cache_read
                         }
                         count += 1
                         
@@ -55,14 +59,17 @@ class CostCalculator:
             print(f"❌ Error: {e}")
             return False
 
-    def calculate_cost(self, model_id: str, prompt_tokens: int, completion_tokens: int) -> float:
+    def calculate_cost(self, model_id: str, prompt_tokens: int, completion_tokens: int,
+                       cached_prompt_tokens: int = 0) -> float:
         """
         Calculate cost in USD for given token counts.
         
         Args:
             model_id: Model identifier (e.g., "openai/gpt-4o", "qwen/qwen3-235b-a22b-2507")
-            prompt_tokens: Number of input tokens
+            prompt_tokens: Number of input tokens (including cached ones)
             completion_tokens: Number of output tokens
+            cached_prompt_tokens: Part of prompt_tokens read from the prompt cache,
+                billed at the model's cache-read price
             
         Returns:
             Cost in USD
@@ -77,7 +84,9 @@ class CostCalculator:
             # Model not found - return 0 (free/unknown)
             return 0.0
 
-        cost = (Decimal(prompt_tokens) * price_data["prompt"]) + \
+        cached = min(cached_prompt_tokens, prompt_tokens)
+        cost = (Decimal(prompt_tokens - cached) * price_data["prompt"]) + \
+               (Decimal(cached) * price_data.get("cache_read", price_data["prompt"])) + \
                (Decimal(completion_tokens) * price_data["completion"])
         
         return float(cost)
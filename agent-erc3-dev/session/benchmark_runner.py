@@ -16,6 +16,7 @@ from erc3.core import TaskInfo
 from agent.runner import run_agent
 from stats import SessionStats, failure_logger
 from handlers.wiki import WikiManager
+from transport import build_session
 
 
 class BenchmarkRunner:
@@ -79,7 +80,7 @@ class BenchmarkRunner:
         Returns:
             List of tasks in the session
         """
-        self.core = ERC3(key=self.api_key, base_url=self.base_url)
+        self.core = ERC3(key=self.api_key, base_url=self.base_url, session=build_session())
 
         # Build session description
         parallel_suffix = f" (Parallel x{num_threads})" if num_threads > 1 else ""
@@ -153,20 +154,37 @@ class BenchmarkRunner:
         self,
         tasks: List[TaskInfo],
         num_threads: int,
-        verbose: bool = False
+        verbose: bool = False,
+        use_async: bool = False
     ):
         """
         Run tasks in parallel.
 
         Args:
             tasks: Tasks to execute
-            num_threads: Number of threads
+            num_threads: Number of threads (async mode: max concurrent tasks)
             verbose: Whether to show real-time output
+            use_async: Run all tasks on one asyncio event loop instead of a thread pool
         """
-        from parallel import run_parallel
+        from parallel import run_parallel, run_parallel_async
 
         logs_dir = Path(__file__).parent.parent / "logs" / f"parallel_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
 
+        if use_async:
+            run_parallel_async(
+                base_url=self.base_url,
+                tasks_to_run=tasks,
+                stats=self.stats,
+                max_concurrent=num_threads,
+                model_id=self.model_id,
+                pricing_model=self.pricing_model,
+                backend=self.backend,
+                api_key=self.api_key,
+                logs_dir=logs_dir,
+                verbose=verbose,
+            )
+            return
+
         run_parallel(
             base_url=self.base_url,
             tasks_to_run=tasks,
@@ -3,9 +3,10 @@ import time
 import threading
 from datetime import datetime
 from pathlib import Path
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from typing import Dict, List, Optional
 from pricing import calculator
+import transport
 
 # === Task Statistics (for parallel-safe per-task tracking) ===
 @dataclass
@@ -20,9 +21,17 @@ class TaskStats:
     api_requests: int = 0
     prompt_tokens: int = 0
     completion_tokens: int = 0
+    cached_prompt_tokens: int = 0
     cost_usd: float = 0.0
     score: Optional[float] = None
     turns: int = 0
+    api_cache_hits: int = 0
+    api_cache_misses: int = 0
+    api_shared_hits: int = 0
+    api_speculated: int = 0
+    api_speculative_hits: int = 0
+    api_coalesced: int = 0
+    llm_queue_wait_sec: float = 0.0
 
     def start(self):
         self.started_at = time.time()
@@ -45,8 +54,20 @@ class SessionStats:
         # Global counters (aggregated from all tasks)
         self.total_prompt_tokens = 0
         self.total_completion_tokens = 0
+        self.total_cached_prompt_tokens = 0  # Part of prompt tokens served from a prefix cache
         self.llm_requests = 0
         self.api_requests = 0
+        self.api_cache_hits = 0
+        self.api_cache_misses = 0
+        self.api_shared_hits = 0
+        self.api_speculated = 0
+        self.api_speculative_hits = 0
+        self.api_coalesced = 0
+        self.llm_queue_wait_sec = 0.0  # Time LLM calls spent queued for a rate-limit token/node slot
+        # Gonka node affinity: turn 2+ calls on the previous turn's node vs moved
+        # ([calls, latency_sec, prompt_tokens] each), to compare latency per prompt token
+        self.llm_affinity = {"same_node": [0, 0.0, 0], "moved": [0, 0.0, 0]}
+        self.prompt_token_mix = {}  # Prompt tokens by category, counted before sending
         self.total_cost_usd = 0.0
 
         # Timing
@@ -82,40 +103,64 @@ class SessionStats:
                 self.tasks[task_id].finish(score)
             self._active_tasks = max(0, self._active_tasks - 1)
 
-    def add_llm_usage(self, model: str, usage, task_id: Optional[str] = None):
-        """Add LLM usage. Thread-safe. Optionally associate with a specific task."""
+    def add_llm_usage(self, model: str, usage, task_id: Optional[str] = None,
+                      queue_wait_sec: float = 0.0, latency_sec: Optional[float] = None,
+                      same_node: Optional[bool] = None, prompt_mix: Optional[dict] = None):
+        """
+        Add LLM usage. Thread-safe. Optionally associate with a specific task.
+
+        queue_wait_sec: time the request spent queued for a rate-limit token
+        or node slot before it was sent (Gonka only).
+        latency_sec / same_node: call duration without queueing and whether
+        it ran on the node that served the task's previous turn (Gonka only).
+        prompt_mix: prompt tokens per category counted before sending
+        (system, task, api_results, hints, assistant, digest).
+        """
         if not usage:
             return
 
         # Extract tokens from usage object
         p_tokens = getattr(usage, 'prompt_tokens', 0)
         c_tokens = getattr(usage, 'completion_tokens', 0)
+        cached_tokens = getattr(usage, 'cached_prompt_tokens', 0)
 
         if p_tokens == 0 and c_tokens == 0:
             if isinstance(usage, dict):
                 p_tokens = usage.get('prompt_tokens', 0)
                 c_tokens = usage.get('completion_tokens', 0)
+                cached_tokens = usage.get('cached_prompt_tokens', 0)
             elif hasattr(usage, '__dict__'):
                 p_tokens = usage.__dict__.get('prompt_tokens', 0)
                 c_tokens = usage.__dict__.get('completion_tokens', 0)
 
-        cost = calculator.calculate_cost(model, p_tokens, c_tokens)
+        cost = calculator.calculate_cost(model, p_tokens, c_tokens, cached_prompt_tokens=cached_tokens)
 
         with self._lock:
             # Update global counters
             self.total_prompt_tokens += p_tokens
             self.total_completion_tokens += c_tokens
+            self.total_cached_prompt_tokens += cached_tokens
             self.llm_requests += 1
             self.total_cost_usd += cost
+            self.llm_queue_wait_sec += queue_wait_sec
+            for category, tokens in (prompt_mix or {}).items():
+                self.prompt_token_mix[category] = self.prompt_token_mix.get(category, 0) + tokens
+            if same_node is not None and latency_sec is not None:
+                row = self.llm_affinity["same_node" if same_node else "moved"]
+                row[0] += 1
+                row[1] += latency_sec
+                row[2] += p_tokens
 
             # Update task-specific counters
             tid = task_id or self._current_task_id
             if tid and tid in self.tasks:
                 self.tasks[tid].prompt_tokens += p_tokens
                 self.tasks[tid].completion_tokens += c_tokens
+                self.tasks[tid].cached_prompt_tokens += cached_tokens
                 self.tasks[tid].llm_requests += 1
                 self.tasks[tid].cost_usd += cost
                 self.tasks[tid].turns += 1
+                self.tasks[tid].llm_queue_wait_sec += queue_wait_sec
 
     def add_api_call(self, task_id: Optional[str] = None):
         """Add API call. Thread-safe."""
@@ -126,6 +171,33 @@ class SessionStats:
             if tid and tid in self.tasks:
                 self.tasks[tid].api_requests += 1
 
+    def add_api_cache_usage(self, hits: int, misses: int, task_id: Optional[str] = None,
+                            shared_hits: int = 0, speculated: int = 0,
+                            speculative_hits: int = 0, coalesced: int = 0):
+        """Add API read-cache hit/miss counts for a task. Thread-safe.
+
+        shared_hits counts reads served by the cross-task ReferenceDataCache.
+        speculated / speculative_hits: GETs prefetched by SpeculativePrefetcher
+        and how many of them the agent actually read.
+        coalesced counts duplicate in-flight reads that shared one API call.
+        """
+        with self._lock:
+            self.api_cache_hits += hits
+            self.api_cache_misses += misses
+            self.api_shared_hits += shared_hits
+            self.api_speculated += speculated
+            self.api_speculative_hits += speculative_hits
+            self.api_coalesced += coalesced
+
+            tid = task_id or self._current_task_id
+            if tid and tid in self.tasks:
+                self.tasks[tid].api_cache_hits += hits
+                self.tasks[tid].api_cache_misses += misses
+                self.tasks[tid].api_shared_hits += shared_hits
+                self.tasks[tid].api_speculated += speculated
+                self.tasks[tid].api_speculative_hits += speculative_hits
+                self.tasks[tid].api_coalesced += coalesced
+
     def finish_session(self):
         """Mark session as finished."""
         self.session_finished_at = time.time()
@@ -190,13 +262,66 @@ class SessionStats:
         print(f"\n🧠 LLM & API")
         print("-" * 40)
         print(f"  LLM Requests:       {self.llm_requests}")
+        same, moved = self.llm_affinity["same_node"], self.llm_affinity["moved"]
+        if same[0] + moved[0] > 0:
+            def per_1k(row):
+                return f"{row[1] / row[2] * 1000:.2f}s" if row[2] else "-"
+            print(f"  Node Affinity:      {same[0]}/{same[0] + moved[0]} turns on previous node "
+                  f"({per_1k(same)} vs {per_1k(moved)} per 1K prompt tokens, same vs moved)")
+        if self.llm_queue_wait_sec > 0 and self.llm_requests:
+            print(f"  LLM Queue Wait:     {self._format_duration(self.llm_queue_wait_sec)} total, "
+                  f"{self.llm_queue_wait_sec / self.llm_requests:.1f}s avg per request")
         print(f"  API Calls:          {self.api_requests}")
+        cache_lookups = self.api_cache_hits + self.api_cache_misses
+        if cache_lookups > 0:
+            print(f"  API Cache:          {self.api_cache_hits} hits / {self.api_cache_misses} misses "
+                  f"({self.api_cache_hits / cache_lookups:.0%} hit rate)")
+        if self.api_shared_hits > 0:
+            print(f"  Shared Ref Cache:   {self.api_shared_hits} cross-task hits")
+        if self.api_speculated > 0:
+            print(f"  Speculative Reads:  {self.api_speculative_hits}/{self.api_speculated} used "
+                  f"({self.api_speculative_hits / self.api_speculated:.0%} hit rate)")
+        if self.api_coalesced > 0:
+            print(f"  Coalesced Reads:    {self.api_coalesced} duplicate in-flight calls suppressed")
+        hedge = self._hedge_stats()
+        if hedge.get("fired"):
+            print(f"  Hedged LLM Calls:   {hedge['fired']}/{hedge['calls']} hedged, "
+                  f"hedge won {hedge['hedge_wins']} ({hedge['hedge_wins'] / hedge['fired']:.0%}), "
+                  f"{hedge['skipped']} skipped (no token/node)")
         print(f"  Avg Turns/Task:     {self.llm_requests / num_tasks:.1f}" if num_tasks > 0 else "")
 
+        # HTTP latency per endpoint (sessions from transport.py)
+        http_lines = transport.latency.report_lines()
+        if http_lines:
+            print("\n🌐 HTTP (top endpoints by total time)")
+            print("-" * 40)
+            for line in http_lines:
+                print(f"  {line}")
+
+        # Gonka node health (why nodes were picked or skipped)
+        node_lines = self._gonka_node_lines()
+        if node_lines:
+            print("\n🛰 GONKA NODES (best score first)")
+            print("-" * 40)
+            gateway = self._concurrency_stats().get("gateway")
+            if gateway:
+                print(f"  Gateway RPM limit: {gateway['rpm_limit']:.0f}/{gateway['max_rpm']} "
+                      f"({gateway['wait_count']} waits for a token)")
+            for line in node_lines:
+                print(f"  {line}")
+
         # Tokens
         print(f"\n📊 TOKENS")
         print("-" * 40)
         print(f"  Input Tokens:       {self.total_prompt_tokens:,}")
+        if self.total_cached_prompt_tokens > 0:
+            print(f"  Cached Input:       {self.total_cached_prompt_tokens:,} "
+                  f"({self.total_cached_prompt_tokens / self.total_prompt_tokens:.0%} of input)")
+        mix_total = sum(self.prompt_token_mix.values())
+        if mix_total > 0:
+            parts = sorted(self.prompt_token_mix.items(), key=lambda kv: kv[1], reverse=True)
+            print("  Prompt Mix:         " + ", ".join(
+                f"{name} {tokens / mix_total:.0%}" for name, tokens in parts if tokens))
         print(f"  Output Tokens:      {self.total_completion_tokens:,}")
         print(f"  Total Tokens:       {total_tokens:,}")
         print(f"  Avg Tokens/Task:    {avg_tokens_per_task:,.0f}")
@@ -238,6 +363,33 @@ class SessionStats:
             mins = int((seconds % 3600) // 60)
             return f"{hours}h {mins}m"
 
+    @staticmethod
+    def _hedge_stats() -> dict:
+        """Hedged Gonka request counters (empty if the Gonka provider isn't loaded)."""
+        try:
+            from llm_provider import get_hedge_stats
+        except ImportError:
+            return {}
+        return get_hedge_stats()
+
+    @staticmethod
+    def _concurrency_stats() -> dict:
+        """Gonka AIMD limits (empty if the Gonka provider isn't loaded)."""
+        try:
+            from llm_provider import get_concurrency_stats
+        except ImportError:
+            return {}
+        return get_concurrency_stats()
+
+    @staticmethod
+    def _gonka_node_lines() -> List[str]:
+        """Gonka node table (empty if the Gonka provider isn't loaded)."""
+        try:
+            from llm_provider import get_node_table_lines
+        except ImportError:
+            return []
+        return get_node_table_lines()
+
     def to_dict(self) -> dict:
         """Export statistics as dictionary (for JSON serialization)."""
         return {
@@ -251,8 +403,23 @@ class SessionStats:
             "totals": {
                 "tasks": len(self.tasks),
                 "llm_requests": self.llm_requests,
+                "llm_queue_wait_sec": self.llm_queue_wait_sec,
+                "llm_affinity": {
+                    key: {"calls": row[0], "latency_sec": row[1], "prompt_tokens": row[2]}
+                    for key, row in self.llm_affinity.items()
+                },
                 "api_requests": self.api_requests,
+                "api_cache_hits": self.api_cache_hits,
+                "api_cache_misses": self.api_cache_misses,
+                "api_shared_hits": self.api_shared_hits,
+                "api_speculated": self.api_speculated,
+                "api_speculative_hits": self.api_speculative_hits,
+                "api_coalesced": self.api_coalesced,
+                "llm_hedging": self._hedge_stats(),
+                "llm_concurrency": self._concurrency_stats(),
                 "prompt_tokens": self.total_prompt_tokens,
+                "cached_prompt_tokens": self.total_cached_prompt_tokens,
+                "prompt_token_mix": dict(self.prompt_token_mix),
                 "completion_tokens": self.total_completion_tokens,
                 "total_tokens": self.total_prompt_tokens + self.total_completion_tokens,
                 "cost_usd": self.total_cost_usd,
@@ -263,13 +430,21 @@ class SessionStats:
                     "duration_sec": t.duration_sec,
                     "turns": t.turns,
                     "llm_requests": t.llm_requests,
+                    "llm_queue_wait_sec": t.llm_queue_wait_sec,
                     "api_requests": t.api_requests,
+                    "api_cache_hits": t.api_cache_hits,
+                    "api_cache_misses": t.api_cache_misses,
+                    "api_shared_hits": t.api_shared_hits,
+                    "api_speculated": t.api_speculated,
+                    "api_speculative_hits": t.api_speculative_hits,
+                    "api_coalesced": t.api_coalesced,
                     "tokens": t.prompt_tokens + t.completion_tokens,
                     "cost_usd": t.cost_usd,
                     "score": t.score,
                 }
                 for tid, t in self.tasks.items()
-            }
+            },
+            "http_endpoints": transport.latency.get_stats(),
         }
 
 
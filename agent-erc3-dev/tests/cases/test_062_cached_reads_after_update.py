@@ -0,0 +1,85 @@
+"""
+Test 062: Cached Reads Around an Update
+
+Test: CEO updates an employee and then re-checks the profile.
+
+Scenario:
+- Elena Vogel (CEO, Level 1) changes Jonas Weiss's location to Berlin
+- Then asks to confirm the location from his profile
+- Before the update, repeated identical reads (agent lookup, fetch-merge
+  get_employee in the update strategy, enrichers) must be served by the
+  task cache (CachingErcClient), so each reaches the mock API once
+- The profile read after the update must reach the API again and show Berlin
+
+Potential Error: Cache serves the pre-update profile (stale "Munich"), or
+repeated reads bypass the cache.
+
+Category: Complex Multi-Step
+Related Tests: test_045
+"""
+
+from typing import Any, List
+
+from handlers.api import is_cacheable_read, request_key
+from tests.framework.task_builder import (
+    TestScenario, ExpectedResult, AgentLink,
+    identity_ceo
+)
+
+
+def _validate_cache_calls(agent_response: Any, api_calls: List[Any]) -> bool:
+    """
+    Check the mock API call log for cache behaviour.
+
+    - No successful cacheable read reaches the API twice with the same
+      payload unless a mutation happened in between (cache hits).
+    - Jonas's profile is fetched from the API after the update (the
+      mutation invalidated the cached entry).
+    """
+    seen = set()
+    updated = False
+    read_after_update = False
+    for call in api_calls:
+        if call.request_type == "Req_UpdateEmployeeInfo":
+            updated = True
+            seen.clear()
+            continue
+        if call.error is not None or not is_cacheable_read(call.request):
+            continue
+        key = request_key(call.request)
+        if key in seen:
+            return False
+        seen.add(key)
+        if updated and call.request_type == "Req_GetEmployee" and call.request.id == "jonas_weiss":
+            read_after_update = True
+    return read_after_update
+
+
+SCENARIO = TestScenario(
+    spec_id="cached_reads_after_update",
+    description="Update employee location, then re-read the profile",
+    category="Complex Multi-Step",
+
+    task_text=(
+        "Change Jonas Weiss's location to Berlin. "
+        "Then open his profile again and tell me which location it shows now."
+    ),
+
+    identity=identity_ceo(today="2025-07-20"),
+
+    expected=ExpectedResult(
+        outcome="ok_answer",
+        links=[
+            AgentLink.employee("jonas_weiss"),
+        ],
+        message_contains=["Berlin"],
+    ),
+
+    related_tests=["employee_update_location"],
+    potential_error="Stale cached profile after update, or repeated reads hit the API",
+    expected_api_calls=[
+        "Req_WhoAmI", "Req_SearchEmployees", "Req_GetEmployee",
+        "Req_UpdateEmployeeInfo", "Req_GetEmployee",
+    ],
+    custom_validator=_validate_cache_calls,
+)
@@ -0,0 +1,5 @@
+"""
+Unit tests for components that don't need an LLM or the mock API.
+
+Run with: python -m unittest discover -s tests/unit -t .
+"""
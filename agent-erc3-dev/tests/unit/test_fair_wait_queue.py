@@ -0,0 +1,165 @@
+"""
+FairWaitQueue and TrafficController wait accounting.
+
+A small counting resource stands in for rate-limit tokens / node slots:
+try_acquire() takes one unit or asks to sleep until wake_head().
+"""
+
+import threading
+import time
+import unittest
+
+from llm_provider import FairWaitQueue, TrafficController
+
+
+class Resource:
+    """Units handed out by try_acquire(); release() adds one and wakes the head."""
+
+    def __init__(self, queue: FairWaitQueue, units: int = 0):
+        self.queue = queue
+        self.units = units
+        self._lock = threading.Lock()
+
+    def try_acquire(self):
+        with self._lock:
+            if self.units > 0:
+                self.units -= 1
+                return None
+        return float('inf')
+
+    def release(self):
+        with self._lock:
+            self.units += 1
+        self.queue.wake_head()
+
+
+def _wait_until(predicate, timeout: float = 2.0):
+    deadline = time.time() + timeout
+    while not predicate():
+        if time.time() > deadline:
+            raise AssertionError("condition not reached")
+        time.sleep(0.005)
+
+
+class FairWaitQueueTest(unittest.TestCase):
+
+    def _start_waiter(self, queue, try_acquire, timeout, results, name, priority=0):
+        def run():
+            started = time.time()
+            acquired = queue.wait(try_acquire, timeout, priority)
+            results.append((name, acquired, time.time() - started))
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    def test_fifo_order(self):
+        queue = FairWaitQueue()
+        resource = Resource(queue)
+        results = []
+        threads = []
+        for i in range(3):
+            threads.append(self._start_waiter(queue, resource.try_acquire, 5.0, results, i))
+            _wait_until(lambda: queue.waiting == i + 1)
+
+        for i in range(3):
+            resource.release()
+            _wait_until(lambda: len(results) == i + 1)
+        for thread in threads:
+            thread.join(1.0)
+
+        self.assertEqual([name for name, _, _ in results], [0, 1, 2])
+        self.assertTrue(all(acquired for _, acquired, _ in results))
+
+    def test_priority_is_a_head_start(self):
+        queue = FairWaitQueue()
+        resource = Resource(queue)
+        results = []
+        self._start_waiter(queue, resource.try_acquire, 5.0, results, "early")
+        _wait_until(lambda: queue.waiting == 1)
+        self._start_waiter(queue, resource.try_acquire, 5.0, results, "urgent", priority=30)
+        _wait_until(lambda: queue.waiting == 2)
+
+        resource.release()
+        _wait_until(lambda: len(results) == 1)
+        resource.release()
+        _wait_until(lambda: len(results) == 2)
+
+        self.assertEqual([name for name, _, _ in results], ["urgent", "early"])
+
+    def test_release_wakes_the_head(self):
+        queue = FairWaitQueue()
+        resource = Resource(queue)
+        results = []
+        thread = self._start_waiter(queue, resource.try_acquire, 5.0, results, "waiter")
+        _wait_until(lambda: queue.waiting == 1)
+        time.sleep(0.05)
+
+        released = time.time()
+        resource.release()
+        thread.join(1.0)
+
+        self.assertEqual(len(results), 1)
+        self.assertTrue(results[0][1])
+        # Woken by the release, not by the 5s timeout
+        self.assertLess(time.time() - released, 1.0)
+
+    def test_timeout(self):
+        queue = FairWaitQueue()
+        resource = Resource(queue)
+        started = time.time()
+
+        acquired = queue.wait(resource.try_acquire, timeout=0.2)
+
+        self.assertFalse(acquired)
+        self.assertGreaterEqual(time.time() - started, 0.2)
+        self.assertEqual(queue.waiting, 0)
+
+    def test_head_leaving_wakes_the_next_waiter(self):
+        queue = FairWaitQueue()
+        resource = Resource(queue)
+        results = []
+        # The head wants something that never becomes available and gives up
+        self._start_waiter(queue, lambda: float('inf'), 0.3, results, "head")
+        _wait_until(lambda: queue.waiting == 1)
+        self._start_waiter(queue, resource.try_acquire, 5.0, results, "next")
+        _wait_until(lambda: queue.waiting == 2)
+
+        # A unit appears without a wake-up: only the head leaving can wake "next"
+        with resource._lock:
+            resource.units = 1
+        _wait_until(lambda: len(results) == 2)
+
+        by_name = {name: (acquired, elapsed) for name, acquired, elapsed in results}
+        self.assertFalse(by_name["head"][0])
+        self.assertTrue(by_name["next"][0])
+        self.assertLess(by_name["next"][1], 2.0)
+        self.assertEqual(queue.waiting, 0)
+
+
+class TrafficControllerWaitCountTest(unittest.TestCase):
+
+    def test_wait_counted_once_per_call(self):
+        controller = TrafficController(max_rpm=300, min_rpm=300)  # one token per 0.2s
+        controller.tokens_bucket = 0.0
+        stop = threading.Event()
+
+        def poke():
+            # Force many head retries while the caller waits for its token
+            while not stop.is_set():
+                controller._queue.wake_head()
+                time.sleep(0.01)
+
+        poker = threading.Thread(target=poke, daemon=True)
+        poker.start()
+        try:
+            self.assertTrue(controller.wait_for_token(timeout=5.0))
+        finally:
+            stop.set()
+            poker.join(1.0)
+
+        self.assertEqual(controller.get_stats()["wait_count"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,223 @@
+"""
+HTTP transport layer.
+
+One place that decides how the agent talks HTTP:
+- Sessions with explicitly sized urllib3 connection pools and keep-alive
+  (a worker thread reuses its connections across all tasks it runs)
+- Default connect/read timeouts for calls that don't pass their own
+- Optional HTTP/2 client (httpx) behind config.HTTP2_ENABLED, so concurrent
+  fan-out from one thread multiplexes over a single connection
+- Per-endpoint latency counters, reported at the end of a session
+"""
+import io
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+import config
+
+
+class LatencyStats:
+    """
+    Thread-safe per-endpoint latency counters.
+
+    Endpoint key is "METHOD /path" (query string dropped), so e.g. every
+    Gonka node's /v1/chat/completions shares one row.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # endpoint -> [calls, errors, total_sec, max_sec]
+        self._endpoints: Dict[str, List[float]] = {}
+
+    def record(self, method: str, url: str, seconds: float, ok: bool) -> None:
+        endpoint = f"{method.upper()} {urlparse(url).path or '/'}"
+        with self._lock:
+            row = self._endpoints.setdefault(endpoint, [0, 0, 0.0, 0.0])
+            row[0] += 1
+            row[1] += 0 if ok else 1
+            row[2] += seconds
+            row[3] = max(row[3], seconds)
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                endpoint: {
+                    'calls': int(calls),
+                    'errors': int(errors),
+                    'total_sec': total,
+                    'avg_sec': total / calls if calls else 0.0,
+                    'max_sec': max_sec,
+                }
+                for endpoint, (calls, errors, total, max_sec) in self._endpoints.items()
+            }
+
+    def report_lines(self, top: int = 10) -> List[str]:
+        """Top endpoints by total time, one formatted line each."""
+        rows = sorted(self.get_stats().items(), key=lambda kv: kv[1]['total_sec'], reverse=True)
+        return [
+            f"{endpoint:<40} {s['calls']:>5} calls  avg {s['avg_sec']:.2f}s  "
+            f"max {s['max_sec']:.2f}s  total {s['total_sec']:.1f}s"
+            + (f"  ({s['errors']} errors)" if s['errors'] else "")
+            for endpoint, s in rows[:top]
+        ]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+
+
+# Process-wide latency counters for every session built here
+latency = LatencyStats()
+
+
+def default_timeout() -> Tuple[float, float]:
+    """(connect, read) timeout from config."""
+    return (config.HTTP_CONNECT_TIMEOUT, config.HTTP_READ_TIMEOUT)
+
+
+# Connection-specific headers requests adds by default; HTTP/2 forbids them
+HOP_BY_HOP_HEADERS = {'connection', 'keep-alive', 'proxy-connection', 'transfer-encoding', 'upgrade'}
+
+
+class Http2Adapter(BaseAdapter):
+    """
+    requests transport adapter that sends through httpx.Client(http2=True).
+
+    Mounted on a TransportSession, so callers keep getting requests.Response
+    objects (.ok, .json(), raise_for_status()) and requests exceptions, while
+    concurrent requests to one host share a multiplexed HTTP/2 connection.
+
+    AICODE-NOTE: Bodies are read in full (stream=True is not honoured) and
+    redirects are followed by httpx, so requests never sees a 3xx here.
+    Requires `httpx[http2]`; without h2 the constructor raises ImportError.
+    """
+
+    def __init__(self, pool_maxsize: Optional[int] = None):
+        super().__init__()
+        import httpx  # Optional dependency, only needed with HTTP2_ENABLED
+        connect, read = default_timeout()
+        maxsize = pool_maxsize or config.HTTP_POOL_MAXSIZE
+        self._httpx = httpx
+        self._client = httpx.Client(
+            http2=True,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=maxsize, max_keepalive_connections=maxsize),
+            timeout=httpx.Timeout(read, connect=connect),
+        )
+
+    def _timeout(self, timeout: Any) -> Any:
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            return self._httpx.Timeout(read, connect=connect)
+        if timeout is None:
+            return self._httpx.USE_CLIENT_DEFAULT
+        return timeout
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        httpx = self._httpx
+        try:
+            upstream = self._client.request(
+                request.method, request.url,
+                headers={k: v for k, v in request.headers.items() if k.lower() not in HOP_BY_HOP_HEADERS},
+                content=request.body,
+                timeout=self._timeout(timeout),
+            )
+        except httpx.ConnectTimeout as e:
+            raise requests.exceptions.ConnectTimeout(e, request=request)
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.ReadTimeout(e, request=request)
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(e, request=request)
+        except httpx.HTTPError as e:
+            raise requests.exceptions.RequestException(e, request=request)
+
+        response = requests.Response()
+        response.status_code = upstream.status_code
+        response.reason = upstream.reason_phrase
+        response.headers = CaseInsensitiveDict(upstream.headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = upstream.content
+        response._content_consumed = True
+        response.raw = io.BytesIO(upstream.content)
+        response.url = str(upstream.url)
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self) -> None:
+        self._client.close()
+
+
+class TransportSession(requests.Session):
+    """
+    requests.Session with sized pools, default timeouts and latency counters.
+
+    Drop-in replacement wherever a requests.Session is expected
+    (e.g. ERC3(session=...)). With http2=True requests go through
+    Http2Adapter instead of urllib3.
+    """
+
+    def __init__(self, pool_connections: Optional[int] = None, pool_maxsize: Optional[int] = None,
+                 http2: bool = False):
+        super().__init__()
+        if http2:
+            adapter = Http2Adapter(pool_maxsize=pool_maxsize)
+        else:
+            adapter = HTTPAdapter(
+                pool_connections=pool_connections or config.HTTP_POOL_CONNECTIONS,
+                pool_maxsize=pool_maxsize or config.HTTP_POOL_MAXSIZE,
+            )
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+    def request(self, method, url, *args, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = default_timeout()
+        started = time.time()
+        ok = False
+        try:
+            response = super().request(method, url, *args, **kwargs)
+            ok = response.status_code < 500
+            return response
+        finally:
+            latency.record(method, url, time.time() - started, ok)
+
+
+def build_session() -> TransportSession:
+    """
+    Create a session for one thread (or one client).
+
+    Uses HTTP/2 when config.HTTP2_ENABLED and httpx with h2 is installed,
+    else the urllib3 pool.
+    """
+    if config.HTTP2_ENABLED:
+        try:
+            return TransportSession(http2=True)
+        except ImportError as e:
+            print(f"⚠ HTTP/2 transport unavailable ({e}), falling back to HTTP/1.1")
+    return TransportSession()
+
+
+_shared_session: Optional[TransportSession] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_session() -> TransportSession:
+    """
+    Process-wide session for ad-hoc GETs (node discovery, warmup pings, prices).
+
+    AICODE-NOTE: Shared across threads on purpose. These are stateless GETs
+    (no cookies/auth on the session); urllib3's pool itself is thread-safe.
+    """
+    global _shared_session
+    with _shared_lock:
+        if _shared_session is None:
+            _shared_session = TransportSession()
+        return _shared_session
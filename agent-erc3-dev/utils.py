@@ -1,6 +1,6 @@
-import requests
 import random
 from typing import List
+from transport import get_shared_session
 
 # === Public API ===
 __all__ = [
@@ -81,7 +81,7 @@ def fetch_active_nodes(source_node: str = None, model_filter: str = None) -> Lis
             # Handle full URL in source_node (e.g. from error message) or just base URL
             url = source if source.endswith("/participants") else f"{source}/v1/epochs/current/participants"
 
-            response = requests.get(
+            response = get_shared_session().get(
                 url,
                 timeout=10
             )